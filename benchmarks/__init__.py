@@ -0,0 +1 @@
+"""Benchmarks for the generator itself, run against synthetic OpenAPI documents"""
@@ -0,0 +1,39 @@
+"""Compare validating every component up front with `lazy_components` on a document which uses few of its components.
+
+Run with `python -m benchmarks.bench_components`.
+"""
+
+import time
+import tracemalloc
+from pathlib import Path
+
+from openapi_python_client import Config, MetaType
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.parser import GeneratorData
+
+from .specs import mostly_unused_components
+
+COUNTS = (1000, 5000)
+
+
+def main() -> None:
+    print(f"{'components':>10} {'mode':>6} {'seconds':>8} {'peak MB':>8}")
+    for count in COUNTS:
+        data = mostly_unused_components(count)
+        for lazy in (False, True):
+            config = Config.from_sources(
+                ConfigFile(lazy_components=lazy), MetaType.NONE, Path("openapi.json"), "utf-8", False, None
+            )
+            tracemalloc.start()
+            start = time.perf_counter()
+            generator_data = GeneratorData.from_dict(data, config=config)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert isinstance(generator_data, GeneratorData), generator_data
+            mode = "lazy" if lazy else "eager"
+            print(f"{count * 3:>10} {mode:>6} {elapsed:>8.3f} {peak / 1_000_000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Time parsing the end-to-end baseline document with its paths copied many times.
+
+Run with `python -m benchmarks.bench_endpoints`. Time should grow linearly with the number of copies.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from openapi_python_client import Config, MetaType
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.parser import GeneratorData
+
+from .specs import with_copied_paths
+
+BASELINE = Path(__file__).parent.parent / "end_to_end_tests" / "baseline_openapi_3.0.json"
+COPIES = (1, 5, 10, 20)
+
+
+def main() -> None:
+    config = Config.from_sources(ConfigFile(), MetaType.NONE, BASELINE, "utf-8", False, None)
+    baseline = json.loads(BASELINE.read_text())
+    print(f"{'copies':>8} {'endpoints':>10} {'seconds':>8} {'ms/endpoint':>12}")
+    for copies in COPIES:
+        data = with_copied_paths(baseline, copies)
+        start = time.perf_counter()
+        generator_data = GeneratorData.from_dict(data, config=config)
+        elapsed = time.perf_counter() - start
+        assert isinstance(generator_data, GeneratorData), generator_data
+        endpoints = sum(len(collection.endpoints) for collection in generator_data.endpoint_collections_by_tag.values())
+        print(f"{copies:>8} {endpoints:>10} {elapsed:>8.3f} {elapsed / endpoints * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Time loading large JSON and YAML documents, before any parsing of their contents.
+
+Run with `python -m benchmarks.bench_loading`. YAML is loaded with libyaml if `ruamel.yaml.clib` is installed.
+"""
+
+import io
+import json
+import time
+
+from ruamel.yaml import YAML
+
+from openapi_python_client import _load_yaml_or_json
+
+from .specs import independent_models
+
+MODELS = (2500, 10000)
+
+
+def main() -> None:
+    print(f"{'format':>6} {'MB':>6} {'seconds':>8}")
+    for count in MODELS:
+        document = independent_models(count)
+        as_json = json.dumps(document, indent=2).encode()
+        yaml_buffer = io.BytesIO()
+        YAML(typ="safe").dump(document, yaml_buffer)
+        for name, data in (("json", as_json), ("yaml", yaml_buffer.getvalue())):
+            start = time.perf_counter()
+            loaded = _load_yaml_or_json(data, None)
+            elapsed = time.perf_counter() - start
+            assert loaded == document
+            print(f"{name:>6} {len(data) / 1_000_000:>6.1f} {elapsed:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Time parsing a document whose models share property names, and report how often naming results were reused.
+
+Run with `python -m benchmarks.bench_naming`.
+"""
+
+import time
+from pathlib import Path
+
+from openapi_python_client import utils
+from openapi_python_client.config import Config, ConfigFile, MetaType
+from openapi_python_client.parser import GeneratorData
+
+from .specs import wide_models
+
+MODELS = (50, 100, 200)
+PROPERTIES = 100
+
+
+def main() -> None:
+    config = Config.from_sources(ConfigFile(), MetaType.NONE, Path("openapi.json"), "utf-8", False, None)
+    print(f"{'models':>8} {'seconds':>8} {'hit rate':>9}")
+    for models in MODELS:
+        document = wide_models(models, PROPERTIES)
+        utils.clear_naming_caches()
+        start = time.perf_counter()
+        openapi = GeneratorData.from_dict(document, config=config)
+        elapsed = time.perf_counter() - start
+        assert isinstance(openapi, GeneratorData), openapi
+        stats = utils.naming_cache_info().values()
+        hits = sum(info.hits for info in stats)
+        calls = hits + sum(info.misses for info in stats)
+        print(f"{models:>8} {elapsed:>8.3f} {hits / calls:>9.1%}")
+    for name, info in utils.naming_cache_info().items():
+        print(f"{name:>16}: {info.hits} hits, {info.misses} misses, {info.currsize} cached")
+
+
+if __name__ == "__main__":
+    main()
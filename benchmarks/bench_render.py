@@ -0,0 +1,38 @@
+"""Time rendering model modules for models with hundreds of properties.
+
+Run with `python -m benchmarks.bench_render`. Only rendering is timed; nothing is parsed or written during timing.
+"""
+
+import time
+from pathlib import Path
+
+from openapi_python_client import Project
+from openapi_python_client.config import Config, ConfigFile, MetaType
+from openapi_python_client.parser import GeneratorData
+
+from .specs import wide_models
+
+MODELS = 20
+PROPERTIES = (100, 200, 400)
+REPEAT = 3
+
+
+def main() -> None:
+    config = Config.from_sources(ConfigFile(), MetaType.NONE, Path("openapi.json"), "utf-8", False, None)
+    print(f"{'properties':>10} {'seconds':>8} {'ms/model':>9}")
+    for properties in PROPERTIES:
+        openapi = GeneratorData.from_dict(wide_models(MODELS, properties), config=config)
+        assert isinstance(openapi, GeneratorData), openapi
+        project = Project(openapi=openapi, config=config)
+        model_template = project.env.get_template("model.py.jinja")
+        best = float("inf")
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            for model in openapi.models:
+                model_template.render(model=model)
+            best = min(best, time.perf_counter() - start)
+        print(f"{properties:>10} {best:>8.3f} {best / len(openapi.models) * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
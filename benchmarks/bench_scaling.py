@@ -0,0 +1,193 @@
+"""Time each phase of generation separately on synthetic documents of increasing size.
+
+Run with `python -m benchmarks.bench_scaling`. Every size option is multiplied by each `--scale` to see how each
+phase grows with the size of the document, for example:
+
+    python -m benchmarks.bench_scaling --schemas 200 --operations 400 --scale 1 2 4 8
+
+Use `--save results.jsonl` to append the results to a file, and `--compare results.jsonl` to compare against the
+most recent results saved for the same sizes, which exits with an error if any phase got slower than `--tolerance`.
+"""
+
+import argparse
+import io
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from openapi_python_client import Config, MetaType, Project, _get_document
+from openapi_python_client import schema as oai
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.openapi import EndpointCollection
+from openapi_python_client.parser.properties import Parameters, Schemas, build_parameters, build_schemas
+
+from .specs import scaled_api
+
+PHASES = ("_get_document", "GeneratorData.from_dict", "build_schemas", "EndpointCollection.from_data", "Project.build")
+# Phases faster than this are too noisy to report as regressions
+MIN_COMPARED_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class Sizes:
+    schemas: int
+    allof_depth: int
+    union_width: int
+    operations: int
+    parameters: int
+    tags: int
+
+    def scaled(self, scale: int) -> "Sizes":
+        """These sizes with every count (but not the shape of each schema or operation) multiplied by `scale`"""
+        return Sizes(
+            schemas=self.schemas * scale,
+            allof_depth=self.allof_depth,
+            union_width=self.union_width,
+            operations=self.operations * scale,
+            parameters=self.parameters,
+            tags=self.tags * scale,
+        )
+
+
+def _best_of(repeat: int, run: Callable[[], Any], setup: Callable[[], None] = lambda: None) -> tuple[float, Any]:
+    """The fastest time of `repeat` runs of `run`, along with what it returned"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def time_phases(sizes: Sizes, *, repeat: int, directory: Path) -> dict[str, float]:
+    """Generate a client for a document of `sizes`, timing each phase separately"""
+    document_path = directory / "openapi.json"
+    document_path.write_text(json.dumps(scaled_api(**asdict(sizes))))
+    output_path = directory / "client"
+    config = Config.from_sources(
+        ConfigFile(post_hooks=[]), MetaType.NONE, document_path, "utf-8", overwrite=True, output_path=output_path
+    )
+    seconds: dict[str, float] = {}
+
+    seconds["_get_document"], data = _best_of(repeat, lambda: _get_document(source=document_path, timeout=5))
+    seconds["GeneratorData.from_dict"], openapi = _best_of(repeat, lambda: GeneratorData.from_dict(data, config=config))
+    assert isinstance(openapi, GeneratorData), openapi
+
+    validated = oai.OpenAPI.model_validate(data)
+    assert validated.components is not None and validated.components.schemas is not None
+    components = validated.components
+    seconds["build_schemas"], schemas = _best_of(
+        repeat, lambda: build_schemas(components=components.schemas or {}, schemas=Schemas(), config=config)
+    )
+    parameters = build_parameters(components=components.parameters or {}, parameters=Parameters(), config=config)
+    seconds["EndpointCollection.from_data"], _ = _best_of(
+        repeat,
+        lambda: EndpointCollection.from_data(
+            data=validated.paths,
+            schemas=schemas,
+            parameters=parameters,
+            request_bodies=components.requestBodies or {},
+            responses=components.responses or {},
+            config=config,
+        ),
+    )
+
+    # Everything is written every time, rather than only what changed since the previous repeat
+    seconds["Project.build"], errors = _best_of(
+        repeat,
+        lambda: _quietly(Project(openapi=openapi, config=config).build),
+        setup=lambda: shutil.rmtree(output_path, ignore_errors=True),
+    )
+    assert not errors, errors
+    return seconds
+
+
+def _quietly(run: Callable[[], Any]) -> Any:
+    with redirect_stdout(io.StringIO()):
+        return run()
+
+
+def _commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _latest_results(path: Path) -> dict[str, dict[str, float]]:
+    """The most recent seconds per phase saved in `path` for each set of sizes"""
+    latest: dict[str, dict[str, float]] = {}
+    if not path.exists():
+        return latest
+    for line in path.read_text().splitlines():
+        if line.strip():
+            record = json.loads(line)
+            latest[json.dumps(record["sizes"], sort_keys=True)] = record["seconds"]
+    return latest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schemas", type=int, default=100)
+    parser.add_argument("--allof-depth", type=int, default=4)
+    parser.add_argument("--union-width", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=100)
+    parser.add_argument("--parameters", type=int, default=6)
+    parser.add_argument("--tags", type=int, default=5)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="Append results to this JSON lines file")
+    parser.add_argument("--compare", type=Path, help="Compare against the latest results in this JSON lines file")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="How many times slower counts as a regression")
+    args = parser.parse_args()
+    base = Sizes(args.schemas, args.allof_depth, args.union_width, args.operations, args.parameters, args.tags)
+    baseline = _latest_results(args.compare) if args.compare else {}
+
+    regressions: list[str] = []
+    print(f"{'scale':>5} " + " ".join(f"{phase:>{max(len(phase), 8)}}" for phase in PHASES))
+    for scale in args.scale:
+        sizes = base.scaled(scale)
+        with tempfile.TemporaryDirectory() as directory:
+            seconds = time_phases(sizes, repeat=args.repeat, directory=Path(directory))
+        print(f"{scale:>5} " + " ".join(f"{seconds[phase]:>{max(len(phase), 8)}.3f}" for phase in PHASES))
+
+        previous = baseline.get(json.dumps(asdict(sizes), sort_keys=True), {})
+        for phase, elapsed in seconds.items():
+            before = previous.get(phase)
+            if before is not None and elapsed >= MIN_COMPARED_SECONDS and elapsed > before * args.tolerance:
+                regressions.append(f"{phase} at scale {scale}: {before:.3f}s → {elapsed:.3f}s")
+
+        if args.save:
+            record = {
+                "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "sizes": asdict(sizes),
+                "seconds": seconds,
+            }
+            with args.save.open("a") as results:
+                results.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print("Slower than the saved results:", *regressions, sep="\n  ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10_000)
+    sys.exit(main())
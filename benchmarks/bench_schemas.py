@@ -0,0 +1,44 @@
+"""Time `build_schemas` on large documents, including ones where schemas depend on schemas declared after them.
+
+Run with `python -m benchmarks.bench_schemas`. Time should grow linearly with the number of schemas.
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from openapi_python_client import Config, MetaType
+from openapi_python_client import schema as oai
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.parser.properties import Schemas, build_schemas
+
+from .specs import independent_models, inheritance_chains, reference_chain
+
+CASES: list[tuple[str, Callable[[int], dict[str, Any]], tuple[int, ...]]] = [
+    ("reference chain", reference_chain, (250, 500, 1000, 2000, 4000)),
+    ("12-level allOf hierarchies", inheritance_chains, (25, 50, 100, 200)),
+    ("independent models", independent_models, (1250, 2500, 5000, 10000)),
+]
+
+
+def main() -> None:
+    config = Config.from_sources(ConfigFile(), MetaType.NONE, Path("openapi.json"), "utf-8", False, None)
+    for title, make_document, sizes in CASES:
+        print(title)
+        print(f"{'size':>8} {'schemas':>8} {'seconds':>8} {'µs/schema':>10}")
+        for size in sizes:
+            openapi = oai.OpenAPI.model_validate(make_document(size))
+            assert openapi.components is not None and openapi.components.schemas is not None
+            count = len(openapi.components.schemas)
+            start = time.perf_counter()
+            schemas = build_schemas(components=openapi.components.schemas, schemas=Schemas(), config=config)
+            elapsed = time.perf_counter() - start
+            assert not schemas.errors, schemas.errors
+            print(f"{size:>8} {count:>8} {elapsed:>8.3f} {elapsed / count * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10_000)
+    main()
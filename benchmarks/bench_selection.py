@@ -0,0 +1,35 @@
+"""Compare generating every operation with generating only one tag's operations (and the models they use).
+
+Run with `python -m benchmarks.bench_selection`.
+"""
+
+import time
+from pathlib import Path
+
+from openapi_python_client import Config, MetaType
+from openapi_python_client.config import ConfigFile, OperationFilter
+from openapi_python_client.parser import GeneratorData
+
+from .specs import scaled_api
+
+SCHEMAS = (500, 2000)
+TAGS = 20
+
+
+def main() -> None:
+    print(f"{'schemas':>8} {'mode':>8} {'seconds':>8} {'models':>7}")
+    for schemas in SCHEMAS:
+        data = scaled_api(schemas=schemas, allof_depth=2, union_width=2, operations=schemas, parameters=2, tags=TAGS)
+        for mode, include in (("all", None), ("one tag", OperationFilter(tags=["tag0"]))):
+            config = Config.from_sources(
+                ConfigFile(include=include), MetaType.NONE, Path("openapi.json"), "utf-8", False, None
+            )
+            start = time.perf_counter()
+            generator_data = GeneratorData.from_dict(data, config=config)
+            elapsed = time.perf_counter() - start
+            assert isinstance(generator_data, GeneratorData), generator_data
+            print(f"{schemas:>8} {mode:>8} {elapsed:>8.3f} {len(generator_data.models):>7}")
+
+
+if __name__ == "__main__":
+    main()
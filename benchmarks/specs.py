@@ -0,0 +1,206 @@
+"""Builders for synthetic OpenAPI documents used by the benchmarks"""
+
+from typing import Any
+
+
+def document(*, schemas: dict[str, Any] | None = None, paths: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Wrap `schemas` and `paths` in a minimal, valid OpenAPI document"""
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Benchmark API", "version": "1.0.0"},
+        "paths": paths or {},
+        "components": {"schemas": schemas or {}},
+    }
+
+
+def reference_chain(length: int) -> dict[str, Any]:
+    """A document where every schema is an array of the next one, declared before the schema it refers to.
+
+    Every schema is a forward reference, which is the worst case for resolving schemas in document order.
+    """
+    schemas: dict[str, Any] = {
+        f"Link{i}": {"type": "array", "items": {"$ref": f"#/components/schemas/Link{i + 1}"}} for i in range(length)
+    }
+    schemas[f"Link{length}"] = {"type": "object", "properties": {"value": {"type": "string"}}}
+    return document(schemas=schemas)
+
+
+def inheritance_chains(count: int, depth: int = 12) -> dict[str, Any]:
+    """A document with `count` separate hierarchies of models, each `depth` levels of allOf deep.
+
+    Every model is declared before the model it inherits from, which is the worst case for processing models in
+    document order.
+    """
+    schemas: dict[str, Any] = {}
+    for chain in range(count):
+        for level in range(depth):
+            schemas[f"Chain{chain}Level{level}"] = {
+                "allOf": [
+                    {"$ref": f"#/components/schemas/Chain{chain}Level{level + 1}"},
+                    {"type": "object", "properties": {f"field{level}": {"type": "string"}}},
+                ]
+            }
+        schemas[f"Chain{chain}Level{depth}"] = {"type": "object", "properties": {"base": {"type": "string"}}}
+    return document(schemas=schemas)
+
+
+def independent_models(count: int) -> dict[str, Any]:
+    """A document with `count` unrelated models, each with a few properties and an enum"""
+    schemas: dict[str, Any] = {}
+    for i in range(count):
+        schemas[f"Model{i}"] = {
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string"},
+                "status": {"type": "string", "enum": ["active", "inactive"], "title": f"Model{i}Status"},
+            },
+        }
+    return document(schemas=schemas)
+
+
+def with_copied_paths(openapi: dict[str, Any], copies: int) -> dict[str, Any]:
+    """`openapi` with every path repeated `copies` times under different prefixes and operation IDs"""
+    paths: dict[str, Any] = {}
+    for copy in range(copies):
+        for path, path_item in openapi["paths"].items():
+            paths[f"/copy{copy}{path}"] = {
+                method: {**operation, "operationId": f"{operation['operationId']}_copy{copy}"}
+                if isinstance(operation, dict) and "operationId" in operation
+                else operation
+                for method, operation in path_item.items()
+            }
+    return {**openapi, "paths": paths}
+
+
+def wide_models(count: int, properties: int) -> dict[str, Any]:
+    """A document with `count` models, each with `properties` properties of a mix of types"""
+    property_types: list[dict[str, Any]] = [
+        {"type": "string"},
+        {"type": "integer"},
+        {"type": "string", "format": "date-time"},
+        {"type": "array", "items": {"type": "string"}},
+        {"anyOf": [{"type": "string"}, {"type": "integer"}, {"$ref": "#/components/schemas/Shared"}]},
+        {"$ref": "#/components/schemas/Shared"},
+        {"type": "array", "items": {"$ref": "#/components/schemas/Shared"}},
+        {"type": "string", "enum": ["a", "b"], "title": "SharedEnum"},
+    ]
+    schemas: dict[str, Any] = {
+        "Shared": {"type": "object", "properties": {"value": {"type": "string"}}},
+    }
+    for i in range(count):
+        schemas[f"Wide{i}"] = {
+            "type": "object",
+            "required": [f"prop{j}" for j in range(0, properties, 2)],
+            "properties": {f"prop{j}": property_types[j % len(property_types)] for j in range(properties)},
+        }
+    return document(schemas=schemas)
+
+
+def mostly_unused_components(count: int) -> dict[str, Any]:
+    """A document with one endpoint and `count` each of responses, request bodies and examples which it doesn't use"""
+    body_schema = {
+        "type": "object",
+        "properties": {f"field{i}": {"type": "string", "description": f"Field {i}"} for i in range(10)},
+    }
+    components: dict[str, Any] = {
+        "responses": {
+            f"Response{i}": {"description": "A response", "content": {"application/json": {"schema": body_schema}}}
+            for i in range(count)
+        },
+        "requestBodies": {f"Body{i}": {"content": {"application/json": {"schema": body_schema}}} for i in range(count)},
+        "examples": {f"Example{i}": {"value": {f"field{j}": "value" for j in range(10)}} for i in range(count)},
+    }
+    paths = {
+        "/used": {
+            "post": {
+                "operationId": "used",
+                "requestBody": {"$ref": "#/components/requestBodies/Body0"},
+                "responses": {"200": {"$ref": "#/components/responses/Response0"}},
+            }
+        }
+    }
+    return {**document(paths=paths), "components": components}
+
+
+def scaled_api(
+    *,
+    schemas: int,
+    allof_depth: int,
+    union_width: int,
+    operations: int,
+    parameters: int,
+    tags: int,
+) -> dict[str, Any]:
+    """A document resembling a real API, with every dimension that affects how long generation takes configurable.
+
+    Args:
+        schemas: How many resource models there are, each with a handful of properties.
+        allof_depth: How many levels of allOf every resource model inherits from.
+        union_width: How many models a union property of every resource model can be one of.
+        operations: How many operations there are, spread evenly across resources.
+        parameters: How many query parameters each operation has, in addition to a path parameter.
+        tags: How many tags operations are spread across.
+    """
+    components: dict[str, Any] = {}
+    for level in range(allof_depth):
+        own = {"type": "object", "properties": {f"base{level}": {"type": "string"}}}
+        components[f"Base{level}"] = (
+            {"allOf": [{"$ref": f"#/components/schemas/Base{level + 1}"}, own]} if level + 1 < allof_depth else own
+        )
+    for variant in range(union_width):
+        components[f"Variant{variant}"] = {
+            "type": "object",
+            "required": ["kind"],
+            "properties": {"kind": {"type": "string", "const": f"variant{variant}"}, "value": {"type": "integer"}},
+        }
+    for i in range(schemas):
+        own = {
+            "type": "object",
+            "required": ["id", "name"],
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string"},
+                "created": {"type": "string", "format": "date-time"},
+                "status": {"type": "string", "enum": ["active", "inactive"]},
+                "labels": {"type": "array", "items": {"type": "string"}},
+                "variant": {"anyOf": [{"$ref": f"#/components/schemas/Variant{v}"} for v in range(union_width)]},
+            },
+        }
+        if not union_width:
+            del own["properties"]["variant"]
+        components[f"Resource{i}"] = {"allOf": [{"$ref": "#/components/schemas/Base0"}, own]} if allof_depth else own
+
+    parameter_types: list[dict[str, Any]] = [
+        {"type": "string"},
+        {"type": "integer"},
+        {"type": "boolean"},
+        {"type": "array", "items": {"type": "string"}},
+        {"type": "string", "format": "date"},
+    ]
+    paths: dict[str, Any] = {}
+    for i in range(operations):
+        resource = f"#/components/schemas/Resource{i % schemas}" if schemas else None
+        operation: dict[str, Any] = {
+            "operationId": f"operation{i}",
+            "tags": [f"tag{i % tags}"] if tags else [],
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}]
+            + [
+                {"name": f"param{p}", "in": "query", "schema": parameter_types[p % len(parameter_types)]}
+                for p in range(parameters)
+            ],
+            "responses": {
+                "200": {
+                    "description": "Success",
+                    "content": {"application/json": {"schema": {"$ref": resource} if resource else {}}},
+                },
+                "404": {"description": "Not found"},
+            },
+        }
+        method = "get"
+        if i % 2 and resource:
+            method = "post"
+            operation["requestBody"] = {"content": {"application/json": {"schema": {"$ref": resource}}}}
+        paths[f"/resources{i}/{{id}}"] = {method: operation}
+    return document(schemas=components, paths=paths)
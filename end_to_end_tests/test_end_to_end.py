@@ -1,3 +1,4 @@
+import json
 import shutil
 import subprocess
 import sys
@@ -11,6 +12,7 @@ from end_to_end_tests.generated_client import (
     _run_command, generate_client, generate_client_from_inline_spec,
 )
 from openapi_python_client.cli import app
+from openapi_python_client.writer import MANIFEST_NAME
 
 
 def _compare_directories(
@@ -32,7 +34,7 @@ def _compare_directories(
     """
     first_printable = record.relative_to(Path.cwd())
     second_printable = test_subject.relative_to(Path.cwd())
-    dc = dircmp(record, test_subject, ignore=[".ruff_cache", "__pycache__"] + (ignore or []))
+    dc = dircmp(record, test_subject, ignore=[".ruff_cache", "__pycache__", MANIFEST_NAME] + (ignore or []))
     missing_files = set(dc.left_only + dc.right_only) - (expected_missing or set())
     if missing_files:
         pytest.fail(
@@ -118,6 +120,31 @@ def test_baseline_end_to_end_3_1():
     run_e2e_test("baseline_openapi_3.1.yaml", [], {})
 
 
+def test_imports_need_no_cleanup():
+    """The generator tidies imports itself, so formatting alone produces the golden record"""
+    config_path = Path(__file__).parent / "format_only_post_hooks.config.yml"
+    run_e2e_test("baseline_openapi_3.0.json", [f"--config={config_path}"], {})
+
+
+def test_tidied_imports_leave_nothing_for_ruff():
+    """With tidy_imports, neither `ruff check --fix` nor `ruff format` change the output of the format-only hook"""
+    config_path = Path(__file__).parent / "format_only_post_hooks.config.yml"
+    with generate_client("baseline_openapi_3.0.json", [f"--config={config_path}"]) as g:
+        paths = sorted(g.output_path.rglob("*.py"))
+        tidied = [path.read_text() for path in paths]
+
+        for command in (["check", "--fix", "."], ["format", "."]):
+            subprocess.run([sys.executable, "-m", "ruff", *command], cwd=g.output_path, capture_output=True, check=True)
+
+        assert [path.read_text() for path in paths] == tidied
+
+
+def test_streaming():
+    """Rendering each endpoint as soon as it's parsed generates the same client"""
+    config_path = Path(__file__).parent / "streaming.config.yml"
+    run_e2e_test("baseline_openapi_3.0.json", [f"--config={config_path}"], {})
+
+
 def test_3_1_specific_features():
     run_e2e_test(
         "3.1_specific.openapi.yaml",
@@ -254,6 +281,65 @@ def test_custom_post_hooks():
         assert "this should fail" in g.generator_result.stderr
 
 
+def test_profile(tmp_path: Path):
+    report_path = tmp_path / "profile.json"
+    config_path = Path(__file__).parent / "format_only_post_hooks.config.yml"
+    with generate_client(
+        "baseline_openapi_3.0.json", [f"--config={config_path}", f"--profile={report_path}", "--profile-top=3"]
+    ):
+        report = json.loads(report_path.read_text())
+    assert set(report["phases"]) == {"load", "validate", "schemas", "endpoints", "render", "write", "post_hooks"}
+    assert set(report["slowest"]) == {"schemas", "endpoints", "templates"}
+    assert all(len(items) == 3 for items in report["slowest"].values())
+
+
+def test_sharded():
+    config_path = Path(__file__).parent / "sharded.config.yml"
+    with generate_client("baseline_openapi_3.0.json", [f"--config={config_path}"]) as g:
+        result = subprocess.run(
+            [sys.executable, "-m", "mypy", str(g.output_path), "--strict"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, f"Type checking client failed: {result.stdout}"
+
+        assert not (g.output_path / "my_test_api_client" / "api").exists()
+        post_form_data = g.import_module(".tests.api.tests.post_form_data")
+        assert post_form_data.AFormData is g.import_symbol(".tests.models", "AFormData")
+        assert g.import_module(".everything_else.api.default.get_common_parameters") is not None
+        assert g.import_module(".everything_else.api.true_.false_") is not None
+
+
+def test_generate_batch(tmp_path: Path):
+    e2e_tests = Path(__file__).parent
+    output_dir = Path.cwd() / "test-generate-batch"
+    clients = {
+        "baseline": ("baseline_openapi_3.0.json", "config.yml", "golden-record"),
+        "baseline-3-1": ("baseline_openapi_3.1.yaml", "config.yml", "golden-record"),
+        "literal-enums": ("openapi_3.1_enums.yaml", "literal_enums.config.yml", "literal-enums-golden-record"),
+    }
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "clients": [
+                    {"path": str(e2e_tests / document), "config": str(e2e_tests / config), "output_path": str(output_dir / name)}
+                    for name, (document, config, _) in clients.items()
+                ]
+            }
+        )
+    )
+    output_dir.mkdir()
+    try:
+        result = CliRunner().invoke(app, ["generate-batch", f"--manifest={manifest_path}", "--workers=3"])
+
+        assert result.exit_code == 0, result.output
+        for name, (_, _, golden_record) in clients.items():
+            _compare_directories(e2e_tests / golden_record, output_dir / name)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
 def test_generate_dir_already_exists():
     project_dir = Path.cwd() / "my-test-api-client"
     if not project_dir.exists():
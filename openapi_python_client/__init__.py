@@ -2,26 +2,53 @@
 
 import json
 import mimetypes
+import multiprocessing
+import os
+import shlex
 import shutil
 import subprocess
-from collections.abc import Sequence
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from functools import partial
 from importlib.metadata import version
+from itertools import islice
 from pathlib import Path
 from subprocess import CalledProcessError
-from typing import Any
+from typing import Any, TextIO, cast
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import httpcore
 import httpx
-from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemLoader, PackageLoader
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    Environment,
+    FileSystemLoader,
+    PackageLoader,
+    Template,
+    TemplateNotFound,
+    meta,
+)
 from ruamel.yaml import YAML
 from ruamel.yaml.error import YAMLError
 
-from openapi_python_client import utils
+from openapi_python_client import cache, profiling, utils
 
-from .config import Config, MetaType
+from .config import Config, MetaType, PostHook, PostHookGroup
 from .parser import GeneratorData, import_string_from_class
+from .parser.bundle import bundle_references, has_external_references
 from .parser.errors import ErrorLevel, GeneratorError
-from .parser.properties import LiteralEnumProperty
+from .parser.inputs import ALL_PATHS, DocumentInputs, path_input
+from .parser.openapi import Endpoint
+from .parser.properties import LiteralEnumProperty, ModelProperty
+from .sharding import Shard, plan_shards, relocate_imports
+from .tidy import ruff_line_length, tidy_imports
+from .writer import MANIFEST_NAME, OutputWriter
 
 __version__ = version(__package__)
 
@@ -34,6 +61,75 @@ TEMPLATE_FILTERS = {
 }
 
 
+# The path to render to, the template and its context, and the inputs it's rendered from (if it can be kept)
+_RenderJob = tuple[Path, Template, dict[str, Any], list[str] | None]
+
+# Post hooks can use this placeholder to only process the Python files that were added or changed by this run
+_FILES_PLACEHOLDER = "{files}"
+# Past this length, `{files}` is replaced with `.` instead, to stay well within command line limits (8191 on Windows)
+_MAX_FILES_ARGUMENT_LENGTH = 4096
+# The line length set in the generated project's Ruff config
+_LINE_LENGTH = 120
+# Post hooks taking longer than this are reported, so that it's clear when one is what's slowing down generation
+_REPORT_HOOK_SECONDS = 1.0
+
+
+# Jobs produced lazily (when streaming) are rendered in processes this many at a time, so only those are kept in memory
+_RENDER_CHUNK_SIZE = 256
+# The project and jobs which a process forked to render modules renders, inherited from the process it was forked from
+_FORKED_RENDERING: "tuple[Project, list[_RenderJob]] | None" = None
+
+# The templates used through `_TemplateModules` by the template currently being rendered, which can't be found statically
+_USED_TEMPLATES: ContextVar[set[str] | None] = ContextVar("used_templates", default=None)
+# Where to print progress to instead of standard output (like when generating many clients at once)
+_OUTPUT: ContextVar[TextIO | None] = ContextVar("output", default=None)
+
+
+class _TemplateModules(dict[str, Any]):
+    """The macros exported by each template in a directory, loaded from the `Environment` the first time they're used.
+
+    Templates use this (as `property_templates[property.template]`) instead of `{% import %}`-ing a property's template
+    each time they handle a property.
+    """
+
+    def __init__(self, env: Environment, directory: str) -> None:
+        super().__init__()
+        self.env = env
+        self.directory = directory
+
+    def __getitem__(self, name: str) -> Any:
+        used = _USED_TEMPLATES.get()
+        if used is not None:
+            used.add(f"{self.directory}/{name}")
+        return super().__getitem__(name)
+
+    def __missing__(self, name: str) -> Any:
+        module = self[name] = self.env.get_template(f"{self.directory}/{name}").module
+        return module
+
+
+def _create_environment(config: Config, custom_template_path: Path | None) -> Environment:
+    package_loader = PackageLoader(__package__)
+    loader: BaseLoader
+    if custom_template_path is not None:
+        loader = ChoiceLoader(
+            [
+                FileSystemLoader(str(custom_template_path)),
+                package_loader,
+            ]
+        )
+    else:
+        loader = package_loader
+    return Environment(
+        loader=loader,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        extensions=["jinja2.ext.loopcontrols"],
+        keep_trailing_newline=True,
+        bytecode_cache=cache.template_bytecode_cache(config.cache_dir),
+    )
+
+
 class Project:
     """Represents a Python project (the top level file-tree) to generate"""
 
@@ -43,28 +139,12 @@ class Project:
         openapi: GeneratorData,
         config: Config,
         custom_template_path: Path | None = None,
+        env: Environment | None = None,
     ) -> None:
         self.openapi: GeneratorData = openapi
         self.config = config
-
-        package_loader = PackageLoader(__package__)
-        loader: BaseLoader
-        if custom_template_path is not None:
-            loader = ChoiceLoader(
-                [
-                    FileSystemLoader(str(custom_template_path)),
-                    package_loader,
-                ]
-            )
-        else:
-            loader = package_loader
-        self.env: Environment = Environment(
-            loader=loader,
-            trim_blocks=True,
-            lstrip_blocks=True,
-            extensions=["jinja2.ext.loopcontrols"],
-            keep_trailing_newline=True,
-        )
+        # Passing the `env` of a previous project with the same config and templates reuses its compiled templates
+        self.env: Environment = env or _create_environment(config, custom_template_path)
 
         self.project_name: str = config.project_name_override or f"{utils.kebab_case(openapi.title).lower()}-client"
         self.package_name: str = config.package_name_override or self.project_name.replace("-", "_")
@@ -102,50 +182,166 @@ class Project:
             project_dir=self.project_dir,
             openapi=self.openapi,
             endpoint_collections_by_tag=self.openapi.endpoint_collections_by_tag,
+            property_templates=_TemplateModules(self.env, "property_templates"),
         )
         self.errors: list[GeneratorError] = []
+        self.post_hook_seconds: dict[str, float] = {}
+        # Without a generated project, Ruff uses the config of whichever project the package is generated into
+        self._line_length = _LINE_LENGTH if config.meta_type != MetaType.NONE else ruff_line_length(self.project_dir)
+        self.writer = OutputWriter(
+            root=self.project_dir, encoding=config.file_encoding, manifest_path=self._manifest_path()
+        )
+        # Modules generated only from inputs which didn't change since the previous run are kept instead of rendered.
+        # Those inputs are parts of the document (named by JSON pointers) and templates (named by their names).
+        self._changed_inputs: set[str] | None = None
+        self._template_dependencies: dict[str, set[str]] = {}
+        # With `Config.shard_by_tag`, the shards to generate, and how to fix the imports of each module moved into one
+        self._shards: list[Shard] = []
+        self._relocations: dict[Path, Callable[[str], str]] = {}
+
+    def _manifest_path(self) -> Path | None:
+        """Where the writer keeps its manifest, if anywhere"""
+        if self.config.meta_type != MetaType.NONE:
+            return self.project_dir / MANIFEST_NAME
+        # Without a generated project, the project directory is the package itself, which shouldn't be cluttered
+        return cache.manifest_path(self.config.cache_dir, self.project_dir)
 
     def build(self) -> Sequence[GeneratorError]:
         """Create the project from templates"""
 
-        print(f"Generating {self.project_dir}")
+        _print(f"Generating {self.project_dir}")
         try:
             self.project_dir.mkdir()
         except FileExistsError:
             if not self.config.overwrite:
                 return [GeneratorError(detail="Directory already exists. Delete it or use the --overwrite option.")]
-        self._create_package()
-        self._build_metadata()
-        self._build_models()
-        self._build_api()
-        self._run_post_hooks()
+        if self.config.shard_by_tag:
+            if self.openapi.pending_endpoints is not None:
+                return [
+                    GeneratorError(
+                        header="streaming can't be used with shard_by_tag",
+                        detail="Shards are planned from every endpoint, so they all have to be parsed first.",
+                    )
+                ]
+            shards = plan_shards(self.openapi, self.config)
+            if isinstance(shards, GeneratorError):
+                return [shards]
+            self._shards = shards
+        self._changed_inputs = self._find_changed_inputs()
+        with profiling.phase("render"):
+            self._create_package()
+            self._build_metadata()
+            if self.openapi.pending_endpoints is not None:
+                # Models aren't all known until every endpoint was parsed (and rendered)
+                self._build_api()
+                self._build_models()
+            else:
+                self._build_models()
+                self._build_api()
+        _print(self.writer.summary)
+        with profiling.phase("post_hooks"):
+            self._run_post_hooks()
+        with profiling.phase("write"):
+            self.writer.save_manifest()
         return self._get_errors()
 
-    def _run_post_hooks(self) -> None:
-        for command in self.config.post_hooks:
-            self._run_command(command)
+    def _find_changed_inputs(self) -> set[str] | None:
+        """The inputs which changed since the previous run, or `None` if every module has to be rendered"""
+        inputs = self.openapi.inputs
+        if not isinstance(inputs, DocumentInputs):
+            return None
+        key = cache.render_cache_key(
+            self.config, inputs.shared_hash, self.project_name, self.package_name, self.version
+        )
+        templates = cache.template_hashes(self.env)
+        shards = {shard.name: sorted(shard.models) for shard in self._shards}
+        self.writer.inputs = {"key": key, "hashes": inputs.hashes, "templates": templates, "shards": shards}
+        previous = self.writer.previous_inputs
+        previous_hashes = previous.get("hashes")
+        previous_templates = previous.get("templates")
+        previous_shards = previous.get("shards")
+        if (
+            previous.get("key") != key
+            or not isinstance(previous_hashes, dict)
+            or not isinstance(previous_templates, dict)
+            or not isinstance(previous_shards, dict)
+        ):
+            return None
+        changed = inputs.changed_since(previous_hashes)
+        changed.update(
+            name for name in {*templates, *previous_templates} if templates.get(name) != previous_templates.get(name)
+        )
+        # Moving a model in or out of a shard changes the imports of the modules in it
+        changed.update(
+            _shard_input(name) for name in {*shards, *previous_shards} if shards.get(name) != previous_shards.get(name)
+        )
+        return changed
 
-    def _run_command(self, cmd: str) -> None:
-        cmd_name = cmd.split(" ", maxsplit=1)[0]
+    def _run_post_hooks(self) -> None:
+        """Run each post hook in order. The hooks of a `PostHookGroup` are run concurrently."""
+        files = self._post_hook_files()
+        # Hooks run concurrently report their progress in this context, which is where its output should go
+        context = copy_context()
+        for hook in self.config.post_hooks:
+            commands = hook.concurrently if isinstance(hook, PostHookGroup) else [hook]
+            if len(commands) > 1:
+                with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+                    errors = list(
+                        executor.map(lambda command: context.copy().run(self._run_command, command, files), commands)
+                    )
+            else:
+                errors = [self._run_command(command, files) for command in commands]
+            self.errors.extend(error for error in errors if error is not None)
+
+    def _post_hook_files(self) -> list[str] | None:
+        """The paths which `{files}` stands for in post hooks, or `None` if no Python files were written"""
+        summary = self.writer.summary
+        written = [path.as_posix() for path in [*summary.added, *summary.changed] if path.suffix in (".py", ".pyi")]
+        if not written:
+            return None
+        if summary.unchanged == 0 or len(_quote_arguments(written)) > _MAX_FILES_ARGUMENT_LENGTH:
+            return ["."]
+        return written
+
+    def _run_command(self, hook: PostHook, files: list[str] | None) -> GeneratorError | None:
+        """Run `hook` in the project directory. A hook given as a list of arguments is run without a shell."""
+        label = hook if isinstance(hook, str) else " ".join(hook)
+        cmd: PostHook
+        if isinstance(hook, str):
+            cmd = hook
+            if _FILES_PLACEHOLDER in cmd:
+                if files is None:
+                    return None
+                cmd = cmd.replace(_FILES_PLACEHOLDER, _quote_arguments(files))
+            cmd_name = cmd.split(" ", maxsplit=1)[0]
+        else:
+            if _FILES_PLACEHOLDER in hook:
+                if files is None:
+                    return None
+                cmd = [part for arg in hook for part in (files if arg == _FILES_PLACEHOLDER else [arg])]
+            else:
+                cmd = hook
+            cmd_name = cmd[0] if cmd else ""
         command_exists = shutil.which(cmd_name)
         if not command_exists:
-            self.errors.append(
-                GeneratorError(
-                    level=ErrorLevel.WARNING, header="Skipping Integration", detail=f"{cmd_name} is not in PATH"
-                )
+            return GeneratorError(
+                level=ErrorLevel.WARNING, header="Skipping Integration", detail=f"{cmd_name} is not in PATH"
             )
-            return
+        start = time.perf_counter()
         try:
             cwd = self.project_dir
-            subprocess.run(cmd, cwd=cwd, shell=True, capture_output=True, check=True)
+            subprocess.run(cmd, cwd=cwd, shell=isinstance(cmd, str), capture_output=True, check=True)
         except CalledProcessError as err:
-            self.errors.append(
-                GeneratorError(
-                    level=ErrorLevel.ERROR,
-                    header=f"{cmd_name} failed",
-                    detail=err.stderr.decode() or err.output.decode(),
-                )
+            return GeneratorError(
+                level=ErrorLevel.ERROR,
+                header=f"{cmd_name} failed",
+                detail=err.stderr.decode() or err.output.decode(),
             )
+        finally:
+            seconds = self.post_hook_seconds[label] = time.perf_counter() - start
+            if seconds >= _REPORT_HOOK_SECONDS:
+                _print(f"Post hook `{label}` took {seconds:.1f}s")
+        return None
 
     def _get_errors(self) -> list[GeneratorError]:
         errors: list[GeneratorError] = []
@@ -162,15 +358,15 @@ class Project:
         package_init = self.package_dir / "__init__.py"
 
         package_init_template = self.env.get_template("package_init.py.jinja")
-        package_init.write_text(package_init_template.render(), encoding=self.config.file_encoding)
+        self._write(package_init, package_init_template.render())
 
         if self.config.meta_type != MetaType.NONE:
             pytyped = self.package_dir / "py.typed"
-            pytyped.write_text("# Marker file for PEP 561", encoding=self.config.file_encoding)
+            self._write(pytyped, "# Marker file for PEP 561")
 
         types_template = self.env.get_template("types.py.jinja")
         types_path = self.package_dir / "types.py"
-        types_path.write_text(types_template.render(), encoding=self.config.file_encoding)
+        self._write(types_path, types_template.render())
 
     def _build_metadata(self) -> None:
         if self.config.meta_type == MetaType.NONE:
@@ -183,127 +379,326 @@ class Project:
         # README.md
         readme = self.project_dir / "README.md"
         readme_template = self.env.get_template("README.md.jinja")
-        readme.write_text(
-            readme_template.render(meta=self.config.meta_type),
-            encoding=self.config.file_encoding,
-        )
+        self._write(readme, readme_template.render(meta=self.config.meta_type))
 
         # .gitignore
         git_ignore_path = self.project_dir / ".gitignore"
         git_ignore_template = self.env.get_template(".gitignore.jinja")
-        git_ignore_path.write_text(git_ignore_template.render(), encoding=self.config.file_encoding)
+        self._write(git_ignore_path, git_ignore_template.render())
 
     def _build_pyproject_toml(self) -> None:
         template = "pyproject.toml.jinja"
         pyproject_template = self.env.get_template(template)
         pyproject_path = self.project_dir / "pyproject.toml"
-        pyproject_path.write_text(
-            pyproject_template.render(meta=self.config.meta_type),
-            encoding=self.config.file_encoding,
-        )
+        self._write(pyproject_path, pyproject_template.render(meta=self.config.meta_type))
 
     def _build_setup_py(self) -> None:
         template = self.env.get_template("setup.py.jinja")
         path = self.project_dir / "setup.py"
-        path.write_text(
-            template.render(),
-            encoding=self.config.file_encoding,
-        )
+        self._write(path, template.render())
 
     def _build_models(self) -> None:
-        # Generate models
+        # Generate models, each in the shard which is the only one using it (if any), or in the top-level package
         models_dir = self.package_dir / "models"
-        shutil.rmtree(models_dir, ignore_errors=True)
-        models_dir.mkdir()
-        models_init = models_dir / "__init__.py"
-        imports = []
-        alls = []
+        shard_by_model = {model: shard for shard in self._shards for model in shard.models}
+        # The imports and names of everything to export from each `models` package
+        exports: dict[Path, tuple[list[str], list[str]]] = {models_dir: ([], [])}
+        exports.update({self.package_dir / shard.name / "models": ([], []) for shard in self._shards})
 
+        render_jobs: list[_RenderJob] = []
         model_template = self.env.get_template("model.py.jinja")
-        for model in self.openapi.models:
-            module_path = models_dir / f"{model.class_info.module_name}.py"
-            module_path.write_text(model_template.render(model=model), encoding=self.config.file_encoding)
-            imports.append(import_string_from_class(model.class_info))
-            alls.append(model.class_info.name)
-
-        # Generate enums
         str_enum_template = self.env.get_template("str_enum.py.jinja")
         int_enum_template = self.env.get_template("int_enum.py.jinja")
         literal_enum_template = self.env.get_template("literal_enum.py.jinja")
-        for enum in self.openapi.enums:
-            module_path = models_dir / f"{enum.class_info.module_name}.py"
-            if isinstance(enum, LiteralEnumProperty):
-                module_path.write_text(literal_enum_template.render(enum=enum), encoding=self.config.file_encoding)
-            elif enum.value_type is int:
-                module_path.write_text(int_enum_template.render(enum=enum), encoding=self.config.file_encoding)
+        # How endpoints use each model changes its module too, so it's tracked like an input of that module
+        previous_usages = self.writer.previous_inputs.get("usages")
+        usages: dict[str, list[str]] = {}
+        for model_or_enum in [*self.openapi.models, *self.openapi.enums]:
+            module_name = model_or_enum.class_info.module_name
+            shard = shard_by_model.get(module_name)
+            directory = models_dir if shard is None else self.package_dir / shard.name / "models"
+            module_path = directory / f"{module_name}.py"
+            sources: list[str] | None
+            if isinstance(model_or_enum, ModelProperty):
+                # Models defined inline in an operation could have come from any of them
+                sources = [root for root in model_or_enum.roots if not isinstance(root, utils.ClassName)]
+                sources = [*(sources or [ALL_PATHS]), _usage_input(module_name)]
+                usage = usages[module_name] = _model_usage(model_or_enum)
+                if self._changed_inputs is not None and (
+                    not isinstance(previous_usages, dict) or previous_usages.get(module_name) != usage
+                ):
+                    self._changed_inputs.add(_usage_input(module_name))
+                render_jobs.append((module_path, model_template, {"model": model_or_enum}, sources))
             else:
-                module_path.write_text(str_enum_template.render(enum=enum), encoding=self.config.file_encoding)
-            imports.append(import_string_from_class(enum.class_info))
-            alls.append(enum.class_info.name)
+                sources = None
+                if isinstance(model_or_enum, LiteralEnumProperty):
+                    template = literal_enum_template
+                elif model_or_enum.value_type is int:
+                    template = int_enum_template
+                else:
+                    template = str_enum_template
+                render_jobs.append((module_path, template, {"enum": model_or_enum}, sources))
+            if shard is not None:
+                self._relocate(module_path, ("models", module_name), shard, sources)
+            imports, alls = exports[directory]
+            imports.append(import_string_from_class(model_or_enum.class_info))
+            alls.append(model_or_enum.class_info.name)
+        if self.writer.inputs:
+            self.writer.inputs["usages"] = usages
+        self._render_modules(render_jobs)
 
         models_init_template = self.env.get_template("models_init.py.jinja")
-        models_init.write_text(
-            models_init_template.render(imports=imports, alls=alls), encoding=self.config.file_encoding
-        )
+        for directory, (imports, alls) in exports.items():
+            self._write(directory / "__init__.py", models_init_template.render(imports=imports, alls=alls))
+            with profiling.phase("write"):
+                self.writer.remove_stale(directory)
 
     def _build_api(self) -> None:
         # Generate Client
         client_path = self.package_dir / "client.py"
         client_template = self.env.get_template("client.py.jinja")
-        client_path.write_text(client_template.render(), encoding=self.config.file_encoding)
+        self._write(client_path, client_template.render())
 
         # Generate included Errors
         errors_path = self.package_dir / "errors.py"
         errors_template = self.env.get_template("errors.py.jinja")
-        errors_path.write_text(errors_template.render(), encoding=self.config.file_encoding)
+        self._write(errors_path, errors_template.render())
 
-        # Generate endpoints
-        api_dir = self.package_dir / "api"
-        shutil.rmtree(api_dir, ignore_errors=True)
-        api_dir.mkdir()
-        api_init_path = api_dir / "__init__.py"
+        # Generate endpoints, in the `api` package of each shard if the client is sharded
+        shards: list[Shard | None] = [*self._shards] or [None]
         api_init_template = self.env.get_template("api_init.py.jinja")
-        api_init_path.write_text(api_init_template.render(), encoding=self.config.file_encoding)
-
-        endpoint_collections_by_tag = self.openapi.endpoint_collections_by_tag
+        endpoint_init_template = self.env.get_template("endpoint_init.py.jinja")
         endpoint_template = self.env.get_template(
             "endpoint_module.py.jinja", globals={"isbool": lambda obj: obj.get_base_type_string() == "bool"}
         )
-        for tag, collection in endpoint_collections_by_tag.items():
-            tag_dir = api_dir / tag
-            tag_dir.mkdir()
-
-            endpoint_init_path = tag_dir / "__init__.py"
-            endpoint_init_template = self.env.get_template("endpoint_init.py.jinja")
-            endpoint_init_path.write_text(
-                endpoint_init_template.render(endpoint_collection=collection),
-                encoding=self.config.file_encoding,
-            )
-
-            for endpoint in collection.endpoints:
-                module_path = tag_dir / f"{utils.PythonIdentifier(endpoint.name, self.config.field_prefix)}.py"
-                module_path.write_text(
-                    endpoint_template.render(
-                        endpoint=endpoint,
-                    ),
-                    encoding=self.config.file_encoding,
+        render_jobs: list[_RenderJob] = []
+        for shard in shards:
+            if shard is None:
+                api_dir = self.package_dir / "api"
+                if self.openapi.pending_endpoints is not None:
+                    # Each endpoint is rendered as soon as it's parsed, so the collections only get its parse errors
+                    self._render_modules(
+                        self._endpoint_job(api_dir / tag, endpoint_template, endpoint, shard)
+                        for endpoint, tags in self.openapi.parse_pending_endpoints()
+                        for tag in tags
+                    )
+                tags = list(self.openapi.endpoint_collections_by_tag)
+            else:
+                shard_init_template = self.env.get_template("shard_init.py.jinja")
+                self._write(self.package_dir / shard.name / "__init__.py", shard_init_template.render(shard=shard))
+                api_dir = self.package_dir / shard.name / "api"
+                tags = shard.tags
+            self._write(api_dir / "__init__.py", api_init_template.render())
+
+            for tag in tags:
+                collection = self.openapi.endpoint_collections_by_tag[tag]
+                tag_dir = api_dir / tag
+                self._write(tag_dir / "__init__.py", endpoint_init_template.render(endpoint_collection=collection))
+
+                render_jobs.extend(
+                    self._endpoint_job(tag_dir, endpoint_template, endpoint, shard) for endpoint in collection.endpoints
                 )
+        self._render_modules(render_jobs)
+
+        with profiling.phase("write"):
+            generated = {self.package_dir / "models"}
+            for shard in shards:
+                api_dir = self.package_dir / "api" if shard is None else self.package_dir / shard.name / "api"
+                self.writer.remove_stale(api_dir)
+                generated.add(api_dir if shard is None else api_dir.parent)
+            # Shards (or the unsharded `api` package) generated by the previous run, which aren't anymore
+            for directory in sorted(self.writer.previous_directories(self.package_dir) - generated):
+                self.writer.remove_stale(directory)
+
+    def _endpoint_job(self, tag_dir: Path, template: Template, endpoint: Endpoint, shard: Shard | None) -> _RenderJob:
+        module_name = utils.PythonIdentifier(endpoint.name, self.config.field_prefix)
+        module_path = tag_dir / f"{module_name}.py"
+        sources = [path_input(endpoint.path)]
+        if shard is not None:
+            self._relocate(module_path, ("api", tag_dir.name, module_name), shard, sources)
+        return module_path, template, {"endpoint": endpoint}, sources
+
+    def _relocate(self, path: Path, module: tuple[str, ...], shard: Shard, sources: list[str] | None) -> None:
+        """Fix the imports of the module rendered to `path` for it being in `shard` instead of being `module`"""
+        self._relocations[path] = partial(relocate_imports, module=module, shard=shard.name, models=shard.models)
+        if sources is not None:
+            sources.append(_shard_input(shard.name))
+
+    def _tidy(self, path: Path, content: str) -> str:
+        """With `Config.tidy_imports`, clean up the imports of generated Python modules, so post hooks don't need to"""
+        if not self.config.tidy_imports or path.suffix != ".py":
+            return content
+        # Everything imported by a package's `__init__.py` might be there to be re-exported
+        return tidy_imports(content, line_length=self._line_length, keep_unused=path.name == "__init__.py")
+
+    def _write(self, path: Path, content: str) -> None:
+        content = self._tidy(path, content)
+        with profiling.phase("write"):
+            self.writer.write(path, content)
+
+    def _keep(self, job: _RenderJob) -> bool:
+        """Keep the module written by the previous run instead of rendering it, if none of its inputs changed"""
+        path, _, _, sources = job
+        if self._changed_inputs is None or sources is None:
+            return False
+        previous_sources = self.writer.previous_sources(path)
+        if previous_sources is None or not self._changed_inputs.isdisjoint([*sources, *previous_sources]):
+            return False
+        return self.writer.keep(path)
+
+    def _dependencies(self, name: str) -> set[str]:
+        """`name` and every template it imports or includes, directly or indirectly"""
+        dependencies = self._template_dependencies.get(name)
+        if dependencies is not None:
+            return dependencies
+        dependencies = set()
+        to_visit = [name]
+        while to_visit:
+            current = to_visit.pop()
+            if current not in dependencies:
+                dependencies.add(current)
+                to_visit.extend(self._referenced_templates(current))
+        self._template_dependencies[name] = dependencies
+        return dependencies
+
+    def _referenced_templates(self, name: str) -> list[str]:
+        assert self.env.loader is not None
+        try:
+            source = self.env.loader.get_source(self.env, name)[0]
+        except TemplateNotFound:
+            return []
+        referenced = list(meta.find_referenced_templates(self.env.parse(source)))
+        if None in referenced:  # Which template isn't known until rendering, so it could be any of them
+            return self.env.list_templates()
+        return cast(list[str], referenced)
+
+    def _render(self, job: _RenderJob) -> tuple[str, set[str]]:
+        """Render a job, returning the content and the templates used by it which can't be found statically"""
+        path, template, context, _ = job
+        used = {template.name} if template.name else set()
+        token = _USED_TEMPLATES.set(used)
+        try:
+            with profiling.item("templates", template.name or str(template)):
+                content = template.render(**context)
+                relocate = self._relocations.get(path)
+                if relocate is not None:
+                    content = relocate(content)
+        finally:
+            _USED_TEMPLATES.reset(token)
+        return self._tidy(path, content), used
+
+    def _render_modules(self, render_jobs: Iterable[_RenderJob]) -> None:
+        """Render each `(path, template, context, sources)` job and write the result to `path`.
+
+        When `Config.workers` is greater than one, rendering is split between that many processes (at most one per
+        CPU). Those are forked, so they already have every job and template, and only send back what they rendered.
+        Results are written in the order the jobs were given, so the output is identical to rendering them one at a
+        time. A list of jobs is rendered all at once, while other iterables are rendered a chunk at a time, so their jobs
+        can be produced lazily.
+
+        Jobs whose inputs didn't change since the previous run are skipped, keeping the module that run wrote.
+        """
+        workers = self._render_processes()
+        chunks: Iterable[list[_RenderJob]]
+        if isinstance(render_jobs, list):
+            chunks = [[job for job in render_jobs if not self._keep(job)]]
+        else:
+            chunks = _chunks((job for job in render_jobs if not self._keep(job)), _RENDER_CHUNK_SIZE)
+        for chunk in chunks:
+            if workers <= 1 or len(chunk) <= 1:
+                for job in chunk:
+                    self._write_rendered(job, self._render(job))
+                continue
+            size = -(-len(chunk) // (4 * workers))  # A few parts per process, so they finish around the same time
+            parts = [range(start, min(start + size, len(chunk))) for start in range(0, len(chunk), size)]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_start_forked_rendering,
+                initargs=(self, chunk),
+            ) as executor:
+                for part, rendered in zip(parts, executor.map(_render_forked, parts), strict=True):
+                    for index, result in zip(part, rendered, strict=True):
+                        self._write_rendered(chunk[index], result)
+
+    def _render_processes(self) -> int:
+        """How many processes to render modules in, where one means rendering them in this process"""
+        if profiling.is_active():
+            return 1  # What forked processes measure wouldn't make it into the report
+        # Forking is only safe on Linux, and only while no other thread (like those generating clients in a batch)
+        # could be holding a lock
+        if sys.platform != "linux" or threading.active_count() > 1:
+            return 1
+        return min(self.config.workers, os.cpu_count() or 1)
+
+    def _write_rendered(self, job: _RenderJob, rendered: tuple[str, set[str]]) -> None:
+        module_path, _, _, sources = job
+        content, used = rendered
+        templates = set().union(*(self._dependencies(name) for name in used))
+        with profiling.phase("write"):
+            self.writer.write(module_path, content, sources=None if sources is None else [*sources, *templates])
+
+
+def _print(message: object) -> None:
+    print(message, file=_OUTPUT.get())
+
+
+def _quote_arguments(arguments: list[str]) -> str:
+    """`arguments` as part of a command line for the shell which post hooks given as a string are run in"""
+    if os.name == "nt":
+        return subprocess.list2cmdline(arguments)
+    return shlex.join(arguments)
+
+
+def _start_forked_rendering(project: Project, render_jobs: list[_RenderJob]) -> None:
+    global _FORKED_RENDERING  # noqa: PLW0603
+    _FORKED_RENDERING = (project, render_jobs)
+
+
+def _render_forked(indices: range) -> list[tuple[str, set[str]]]:
+    """Render the jobs at `indices`, in a process forked by `Project._render_modules`"""
+    assert _FORKED_RENDERING is not None
+    project, render_jobs = _FORKED_RENDERING
+    return [project._render(render_jobs[index]) for index in indices]
+
+
+def _chunks(render_jobs: Iterator[_RenderJob], size: int) -> Iterator[list[_RenderJob]]:
+    while chunk := list(islice(render_jobs, size)):
+        yield chunk
+
+
+def _usage_input(module_name: str) -> str:
+    """The input which changes whenever how endpoints use the model in `module_name` does"""
+    return f"usage:{module_name}"
+
+
+def _model_usage(model: ModelProperty) -> list[str]:
+    """What about how endpoints use `model` changes what's generated for it"""
+    return ["multipart"] if model.is_multipart_body else []
+
+
+def _shard_input(name: str) -> str:
+    """The input which changes whenever the models in the shard `name` do, so every module in it is rendered again"""
+    return f"shard:{name}"
 
 
 def _get_project_for_url_or_path(
     config: Config,
     custom_template_path: Path | None = None,
+    env: Environment | None = None,
 ) -> Project | GeneratorError:
-    data_dict = _get_document(source=config.document_source, timeout=config.http_timeout)
-    if isinstance(data_dict, GeneratorError):
-        return data_dict
-    openapi = GeneratorData.from_dict(data_dict, config=config)
+    with profiling.phase("load"):
+        document = _get_document_bytes(source=config.document_source, timeout=config.http_timeout)
+    if isinstance(document, GeneratorError):
+        return document
+    openapi = _parse_document(*document, config=config)
     if isinstance(openapi, GeneratorError):
         return openapi
     return Project(
         openapi=openapi,
         custom_template_path=custom_template_path,
         config=config,
+        env=env,
     )
 
 
@@ -327,21 +722,117 @@ def generate(
     return project.build()
 
 
+# Load time above which it's reported, so that it's clear when a huge document is what's slowing down generation
+_REPORT_LOAD_SECONDS = 1.0
+
+
+def _looks_like_json(data: bytes) -> bool:
+    """Whether `data` starts like a JSON document, which is much faster to parse as JSON than as YAML"""
+    return data.lstrip(b"\xef\xbb\xbf \t\r\n")[:1] in (b"{", b"[")
+
+
 def _load_yaml_or_json(data: bytes, content_type: str | None) -> dict[str, Any] | GeneratorError:
     if content_type == "application/json":
         try:
-            return json.loads(data.decode())
+            return json.loads(data)
         except ValueError as err:
             return GeneratorError(header=f"Invalid JSON from provided source: {err}")
-    else:
+    if _looks_like_json(data):
         try:
-            yaml = YAML(typ="safe")
-            return yaml.load(data)
-        except YAMLError as err:
-            return GeneratorError(header=f"Invalid YAML from provided source: {err}")
+            return json.loads(data)
+        except ValueError:
+            pass  # Could still be YAML, like `{openapi: 3.1.0, ...}`
+    try:
+        # Uses the libyaml-based parser if ruamel.yaml.clib is installed
+        yaml = YAML(typ="safe")
+        return yaml.load(data)
+    except YAMLError as err:
+        return GeneratorError(header=f"Invalid YAML from provided source: {err}")
+
+
+def _parse_document(
+    document: bytes, content_type: str | None, *, config: Config, referenced: dict[str, bytes] | None = None
+) -> GeneratorData | GeneratorError:
+    """Parse the raw bytes of an OpenAPI document, reusing a previous result from `Config.cache_dir` if possible.
+
+    The raw bytes of every document it references are added to `referenced`, by URI.
+    """
+    data_dict: dict[str, Any] | GeneratorError | None = None
+    cache_document = document
+    if has_external_references(document):
+        # What's parsed depends on the referenced documents too, so they have to be loaded before checking the cache
+        data_dict = _load_and_report(document, content_type)
+        if isinstance(data_dict, GeneratorError):
+            return data_dict
+        referenced = {} if referenced is None else referenced
+        with profiling.phase("load"):
+            error = bundle_references(
+                data_dict,
+                uri=_document_uri(config.document_source),
+                load=lambda uri: _load_referenced_document(uri, timeout=config.http_timeout, loaded=referenced),
+            )
+        if error is not None:
+            return error
+        cache_document = b"".join([document, *(uri.encode() + data for uri, data in sorted(referenced.items()))])
+
+    cache_key = cache.parse_cache_key(cache_document, config) if config.cache_dir is not None else None
+    if config.cache_dir is not None and cache_key is not None:
+        cached = cache.load_generator_data(config.cache_dir, cache_key)
+        if cached is not None:
+            return cached
+
+    if data_dict is None:
+        data_dict = _load_and_report(document, content_type)
+    if isinstance(data_dict, GeneratorError):
+        return data_dict
+    openapi = GeneratorData.from_dict(data_dict, config=config)
+    if config.cache_dir is not None and cache_key is not None and not isinstance(openapi, GeneratorError):
+        cache.store_generator_data(config.cache_dir, cache_key, openapi)
+    return openapi
+
+
+def _load_and_report(document: bytes, content_type: str | None) -> dict[str, Any] | GeneratorError:
+    start = time.perf_counter()
+    with profiling.phase("load"):
+        data_dict = _load_yaml_or_json(document, content_type)
+    load_seconds = time.perf_counter() - start
+    if load_seconds >= _REPORT_LOAD_SECONDS:
+        _print(f"Loaded OpenAPI document ({len(document) / 1_000_000:.1f} MB) in {load_seconds:.1f}s")
+    return data_dict
+
+
+def _document_uri(source: str | Path) -> str:
+    """The absolute URI of a document, which references in it are relative to"""
+    return source if isinstance(source, str) else source.absolute().as_uri()
+
+
+def _load_referenced_document(uri: str, *, timeout: int, loaded: dict[str, bytes]) -> Any | GeneratorError:
+    """Load a document referenced from the OpenAPI document, recording its raw bytes in `loaded`"""
+    parsed = urlparse(uri)
+    try:
+        if parsed.scheme == "file":
+            path = Path(url2pathname(parsed.path))
+            data = path.read_bytes()
+            content_type = mimetypes.guess_type(uri, strict=True)[0]
+        else:
+            response = httpx.get(uri, timeout=timeout, follow_redirects=True)
+            response.raise_for_status()
+            data = response.content
+            content_type = response.headers.get("content-type", "").split(";")[0] or None
+    except (OSError, httpx.HTTPError, httpcore.NetworkError) as err:
+        return GeneratorError(detail=str(err))
+    loaded[uri] = data
+    return _load_yaml_or_json(data, content_type)
 
 
 def _get_document(*, source: str | Path, timeout: int) -> dict[str, Any] | GeneratorError:
+    document = _get_document_bytes(source=source, timeout=timeout)
+    if isinstance(document, GeneratorError):
+        return document
+    return _load_yaml_or_json(*document)
+
+
+def _get_document_bytes(*, source: str | Path, timeout: int) -> tuple[bytes, str | None] | GeneratorError:
     yaml_bytes: bytes
     content_type: str | None
     if isinstance(source, str):
@@ -359,4 +850,4 @@ def _get_document(*, source: str | Path, timeout: int) -> dict[str, Any] | Gener
         yaml_bytes = source.read_bytes()
         content_type = mimetypes.guess_type(source.absolute().as_uri(), strict=True)[0]
 
-    return _load_yaml_or_json(yaml_bytes, content_type)
+    return yaml_bytes, content_type
@@ -0,0 +1,107 @@
+"""Generating many clients in one process, from a manifest listing each of them
+
+Every client is generated as if by its own `generate` command, but work which would be the same for each of them is
+only done once. The generator is only started and imported once, every template is compiled once for all the clients'
+template environments, and names are converted using the same caches. Clients are generated on a pool of threads, and
+the progress each of them reports is collected and printed once it's done, so the output of different clients isn't
+mixed up.
+"""
+
+__all__ = ["BatchClient", "BatchManifest", "generate_batch"]
+
+import io
+import json
+import mimetypes
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import replace
+from pathlib import Path
+
+from jinja2 import Environment
+from pydantic import BaseModel
+from ruamel.yaml import YAML
+
+from . import _OUTPUT, _create_environment, _get_project_for_url_or_path, cache, profiling
+from .config import Config
+from .parser.errors import GeneratorError
+
+
+class BatchClient(BaseModel):
+    """A client to generate, with the same options as the `generate` command"""
+
+    path: Path | None = None
+    url: str | None = None
+    config: Path | None = None
+    output_path: Path
+
+
+class BatchManifest(BaseModel):
+    """The clients to generate with the `generate-batch` command"""
+
+    clients: list[BatchClient]
+
+    @staticmethod
+    def load_from_path(path: Path) -> "BatchManifest":
+        """Load a manifest from a JSON or YAML file, in which relative paths are relative to the file"""
+        mime = mimetypes.guess_type(path.absolute().as_uri(), strict=True)[0]
+        if mime == "application/json":
+            manifest_data = json.loads(path.read_text())
+        else:
+            yaml = YAML(typ="safe")
+            manifest_data = yaml.load(path)
+        manifest = BatchManifest(**manifest_data)
+        for client in manifest.clients:
+            client.path = path.parent / client.path if client.path is not None else None
+            client.config = path.parent / client.config if client.config is not None else None
+            client.output_path = path.parent / client.output_path
+        return manifest
+
+
+def generate_batch(
+    configs: Sequence[Config], *, custom_template_path: Path | None = None, workers: int = 1
+) -> list[GeneratorError]:
+    """Generate a client for each of `configs`, `workers` at a time, returning the errors of all of them.
+
+    Errors are in the order of `configs`, and the header of each starts with where the client it's for is generated.
+    The progress each client reports is printed all at once, after that client is generated.
+    """
+    if not configs:
+        return []
+    if workers > 1 and profiling.is_active():
+        # Each client would add its phases to the same profile at the same time
+        raise ValueError("Clients can't be generated concurrently while profiling")
+    # Compiled templates are kept in the cache_dir of the first client (if it has one)
+    env = _create_environment(configs[0], custom_template_path)
+    env.bytecode_cache = cache.shared_template_bytecode_cache(env.bytecode_cache)
+    lock = threading.Lock()
+
+    def generate(config: Config) -> list[GeneratorError]:
+        destination = _OUTPUT.get()
+        output = io.StringIO()
+        _OUTPUT.set(output)
+        try:
+            project = _get_project_for_url_or_path(config, custom_template_path, env=_client_environment(env))
+            if isinstance(project, GeneratorError):
+                errors: Sequence[GeneratorError] = [project]
+            else:
+                errors = project.build()
+        finally:
+            with lock:
+                print(output.getvalue(), end="", file=destination, flush=True)
+        label = config.output_path or config.document_source
+        return [replace(error, header=f"{label}: {error.header}") for error in errors]
+
+    # Each client is generated in the caller's context, which is where the profiler (if any) is
+    context = copy_context()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda config: context.copy().run(generate, config), configs))
+    return [error for errors in results for error in errors]
+
+
+def _client_environment(env: Environment) -> Environment:
+    """An environment sharing everything with `env` but its globals, which each `Project` sets for itself"""
+    client_env = env.overlay()
+    client_env.globals = dict(env.globals)
+    return client_env
@@ -0,0 +1,216 @@
+"""Caching of expensive intermediate results between runs of the generator"""
+
+__all__ = [
+    "load_generator_data",
+    "manifest_path",
+    "parse_cache_key",
+    "render_cache_key",
+    "shared_template_bytecode_cache",
+    "store_generator_data",
+    "template_bytecode_cache",
+    "template_hashes",
+]
+
+import hashlib
+import os
+import pickle
+import tempfile
+from importlib.metadata import version
+from pathlib import Path
+from types import CodeType
+from typing import TYPE_CHECKING
+
+from attrs import asdict
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache
+from jinja2.bccache import Bucket
+
+from .config import Config
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .parser import GeneratorData
+
+# Config values which only affect how the client is written, not how the document is parsed
+_OUTPUT_ONLY_CONFIG = frozenset(
+    {
+        "cache_dir",
+        "document_source",
+        "file_encoding",
+        "http_timeout",
+        "meta_type",
+        "output_path",
+        "overwrite",
+        "package_name_override",
+        "package_version_override",
+        "post_hooks",
+        "project_name_override",
+        "shard_by_tag",
+        "shard_groups",
+        "tidy_imports",
+        "workers",
+    }
+)
+
+
+def parse_cache_key(document: bytes, config: Config) -> str:
+    """Get a key identifying the result of parsing `document` with `config` using this version of the generator"""
+    digest = hashlib.sha256()
+    digest.update(version("openapi-python-client").encode())
+    config_values = {
+        name: value for name, value in asdict(config, recurse=False).items() if name not in _OUTPUT_ONLY_CONFIG
+    }
+    digest.update(repr(sorted(config_values.items())).encode())
+    digest.update(document)
+    return digest.hexdigest()
+
+
+# Config values which don't affect the content of generated files
+_NON_RENDERING_CONFIG = frozenset(
+    {"cache_dir", "document_source", "http_timeout", "output_path", "overwrite", "post_hooks", "workers"}
+)
+
+
+def render_cache_key(config: Config, *values: str) -> str:
+    """Get a key identifying everything besides the document and templates which affects how the document is rendered.
+
+    That's the version of the generator, `config`, and any `values`.
+    """
+    digest = hashlib.sha256()
+    digest.update(version("openapi-python-client").encode())
+    config_values = {
+        name: value for name, value in asdict(config, recurse=False).items() if name not in _NON_RENDERING_CONFIG
+    }
+    digest.update(repr(sorted(config_values.items())).encode())
+    for value in values:
+        digest.update(value.encode())
+    return digest.hexdigest()
+
+
+def template_hashes(env: Environment) -> dict[str, str]:
+    """A hash of the source of every template `env` can load, by name"""
+    if env.loader is None:
+        return {}
+    return {
+        name: hashlib.sha256(env.loader.get_source(env, name)[0].encode()).hexdigest()
+        for name in sorted(env.list_templates())
+    }
+
+
+def _parse_cache_path(cache_dir: Path, key: str) -> Path:
+    return cache_dir / "parsed" / f"{key}.pickle"
+
+
+def load_generator_data(cache_dir: Path, key: str) -> "GeneratorData | None":
+    """Load previously parsed `GeneratorData`, or return `None` if it isn't cached (or the cache is unreadable)"""
+    from .parser import GeneratorData  # noqa: PLC0415
+
+    try:
+        with _parse_cache_path(cache_dir, key).open("rb") as cache_file:
+            data = pickle.load(cache_file)
+    except Exception:  # Any problem with the cache means it has to be rebuilt
+        return None
+    return data if isinstance(data, GeneratorData) else None
+
+
+def store_generator_data(cache_dir: Path, key: str, data: "GeneratorData") -> None:
+    """Save parsed `GeneratorData` so that a later run with the same inputs can skip parsing.
+
+    Caching is best-effort: if the data can't be written, the next run will simply parse the document again.
+    """
+    path = _parse_cache_path(cache_dir, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent runs never see a partially written cache entry
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            pickle.dump(data, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PicklingError, RecursionError, TypeError, AttributeError):
+        Path(temp_path).unlink(missing_ok=True)
+
+
+class _TemplateBytecodeCache(FileSystemBytecodeCache):
+    """A `FileSystemBytecodeCache` which carries on without caching if the cache directory can't be written to"""
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            pass
+
+
+def template_bytecode_cache(cache_dir: Path | None) -> BytecodeCache | None:
+    """Get a cache for compiled templates, stored in `cache_dir` or, if that isn't set, a per-user temporary directory.
+
+    Jinja stores a checksum of each template's source along with its compiled code, so changing a template (including
+    a custom one) always causes it to be recompiled.
+    """
+    try:
+        if cache_dir is None:
+            return _TemplateBytecodeCache()
+        template_cache_dir = cache_dir / "templates"
+        template_cache_dir.mkdir(parents=True, exist_ok=True)
+        return _TemplateBytecodeCache(str(template_cache_dir))
+    except (OSError, RuntimeError):  # Jinja raises RuntimeError if it can't find a safe temporary directory
+        return None
+
+
+def manifest_path(cache_dir: Path | None, output_dir: Path) -> Path | None:
+    """Where to keep the manifest of what was generated into `output_dir`, when it shouldn't be kept in there.
+
+    That's in `cache_dir` or, if that isn't set, a per-user temporary directory. `None` if there's nowhere safe for it.
+    """
+    directory = cache_dir if cache_dir is not None else _user_temp_dir()
+    if directory is None:
+        return None
+    key = hashlib.sha256(str(output_dir.resolve()).encode()).hexdigest()
+    return directory / "manifests" / f"{key}.json"
+
+
+def _user_temp_dir() -> Path | None:
+    """A temporary directory only the current user can write to, like the one Jinja caches compiled templates in"""
+    if not hasattr(os, "getuid"):
+        return Path(tempfile.gettempdir()) / "openapi-python-client"  # Windows gives each user their own
+    directory = Path(tempfile.gettempdir()) / f"openapi-python-client-{os.getuid()}"
+    try:
+        directory.mkdir(mode=0o700, exist_ok=True)
+        if directory.stat().st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    return directory
+
+
+class _SharedBytecodeCache(BytecodeCache):
+    """Keeps compiled templates in memory for every environment using it, in front of another cache (if any)"""
+
+    def __init__(self, stored: BytecodeCache | None) -> None:
+        self._stored = stored
+        self._compiled: dict[str, tuple[str, CodeType]] = {}
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        compiled = self._compiled.get(bucket.key)
+        if compiled is not None and compiled[0] == bucket.checksum:
+            bucket.code = compiled[1]
+            return
+        if self._stored is not None:
+            self._stored.load_bytecode(bucket)
+            if bucket.code is not None:
+                self._compiled[bucket.key] = (bucket.checksum, bucket.code)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        if bucket.code is not None:
+            self._compiled[bucket.key] = (bucket.checksum, bucket.code)
+        if self._stored is not None:
+            self._stored.dump_bytecode(bucket)
+
+
+def shared_template_bytecode_cache(stored: BytecodeCache | None) -> BytecodeCache:
+    """Get a cache which lets several environments (like one per generated client) share compiled templates.
+
+    Each template is only compiled (or loaded from `stored`) by the first environment which uses it. The others create
+    their templates from the same code, so they can still render them with globals of their own.
+    """
+    return _SharedBytecodeCache(stored)
@@ -1,11 +1,12 @@
 import codecs
 from collections.abc import Sequence
+from contextlib import nullcontext
 from pathlib import Path
 from pprint import pformat
 
 import typer
 
-from openapi_python_client import MetaType, __version__
+from openapi_python_client import MetaType, __version__, profiling
 from openapi_python_client.config import Config, ConfigFile
 from openapi_python_client.parser.errors import ErrorLevel, GeneratorError, ParseError
 
@@ -27,6 +28,7 @@ def _process_config(
     file_encoding: str,
     overwrite: bool,
     output_path: Path | None,
+    workers: int | None = None,
 ) -> Config:
     source: Path | str
     if url and not path:
@@ -53,6 +55,8 @@ def _process_config(
             config_file = ConfigFile.load_from_path(path=config_path)
         except Exception as err:
             raise typer.BadParameter("Unable to parse config") from err
+    if workers is not None:
+        config_file.workers = workers
 
     return Config.from_sources(config_file, meta_type, source, file_encoding, overwrite, output_path=output_path)
 
@@ -148,6 +152,14 @@ def generate(
         "Defaults to the OpenAPI document title converted to kebab or snake case (depending on meta type). "
         "Can also be overridden with `project_name_override` or `package_name_override` in config.",
     ),
+    profile: Path | None = typer.Option(
+        None,
+        help="Write a JSON report of the time and peak memory of each phase of generation to this path. "
+        "Tracing memory makes generation much slower.",
+        dir_okay=False,
+    ),
+    profile_top: int = typer.Option(20, help="How many of the slowest schemas, endpoints, and templates to report"),
+    workers: int | None = typer.Option(None, help="How many processes to render modules in (overrides the config)"),
 ) -> None:
     """Generate a new OpenAPI Client library"""
     from . import generate  # noqa: PLC0415
@@ -160,9 +172,107 @@ def generate(
         file_encoding=file_encoding,
         overwrite=overwrite,
         output_path=output_path,
+        workers=workers,
     )
-    errors = generate(
-        custom_template_path=custom_template_path,
-        config=config,
+    with profiling.profile(profile, top=profile_top) if profile else nullcontext():
+        errors = generate(
+            custom_template_path=custom_template_path,
+            config=config,
+        )
+    handle_errors(errors, fail_on_warning)
+
+
+@app.command()
+def watch(
+    path: Path = typer.Option(..., help="A path to the OpenAPI document"),
+    custom_template_path: Path | None = typer.Option(
+        None,
+        help="A path to a directory containing custom template(s)",
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+    ),  # type: ignore
+    meta: MetaType = typer.Option(
+        MetaType.POETRY,
+        help="The type of metadata you want to generate.",
+    ),
+    file_encoding: str = typer.Option("utf-8", help="Encoding used when writing generated"),
+    config_path: Path | None = typer.Option(None, "--config", help="Path to the config file to use"),
+    output_path: Path | None = typer.Option(
+        None,
+        help="Path to write the generated code to. "
+        "Defaults to the OpenAPI document title converted to kebab or snake case (depending on meta type). "
+        "Can also be overridden with `project_name_override` or `package_name_override` in config.",
+    ),
+    interval: float = typer.Option(0.5, help="How often to check for changes, in seconds"),
+    workers: int | None = typer.Option(None, help="How many processes to render modules in (overrides the config)"),
+) -> None:
+    """Generate a client, then generate it again every time the document or custom templates change"""
+    from .watch import Watcher  # noqa: PLC0415
+
+    config = _process_config(
+        url=None,
+        path=path,
+        config_path=config_path,
+        meta_type=meta,
+        file_encoding=file_encoding,
+        overwrite=True,
+        output_path=output_path,
+        workers=workers,
     )
+    watcher = Watcher(config=config, custom_template_path=custom_template_path)
+    try:
+        while True:
+            try:
+                handle_errors(watcher.generate())
+            except typer.Exit:
+                pass  # The errors were reported, and fixing them is what the next change is probably for
+            typer.secho("Watching for changes (press Ctrl+C to stop)...", fg=typer.colors.BLUE)
+            watcher.wait_for_changes(interval=interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command("generate-batch")
+def generate_batch(
+    manifest: Path = typer.Option(..., help="A path to the manifest listing the clients to generate"),
+    custom_template_path: Path | None = typer.Option(
+        None,
+        help="A path to a directory containing custom template(s)",
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+    ),  # type: ignore
+    meta: MetaType = typer.Option(
+        MetaType.POETRY,
+        help="The type of metadata you want to generate.",
+    ),
+    file_encoding: str = typer.Option("utf-8", help="Encoding used when writing generated"),
+    fail_on_warning: bool = False,
+    overwrite: bool = typer.Option(False, help="Overwrite the existing clients if they exist"),
+    workers: int = typer.Option(1, help="How many clients to generate at once"),
+) -> None:
+    """Generate every client listed in a manifest, sharing compiled templates and caches between them"""
+    from .batch import BatchManifest  # noqa: PLC0415
+    from .batch import generate_batch as generate  # noqa: PLC0415
+
+    try:
+        batch = BatchManifest.load_from_path(path=manifest)
+    except Exception as err:
+        raise typer.BadParameter("Unable to parse manifest") from err
+    configs = [
+        _process_config(
+            url=client.url,
+            path=client.path,
+            config_path=client.config,
+            meta_type=meta,
+            file_encoding=file_encoding,
+            overwrite=overwrite,
+            output_path=client.output_path,
+        )
+        for client in batch.clients
+    ]
+    errors = generate(configs, custom_template_path=custom_template_path, workers=workers)
     handle_errors(errors, fail_on_warning)
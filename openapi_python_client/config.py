@@ -18,6 +18,30 @@ class ClassOverride(BaseModel):
     module_name: str | None = None
 
 
+class OperationFilter(BaseModel):
+    """Operations to include in or exclude from generation, by any of their tags, paths, or operation IDs.
+
+    See https://github.com/openapi-generators/openapi-python-client#include-and-exclude
+    """
+
+    tags: list[str] = []
+    paths: list[str] = []
+    operation_ids: list[str] = []
+
+
+class PostHookGroup(BaseModel):
+    """Post hooks which don't depend on each other, so are run at the same time.
+
+    See https://github.com/openapi-generators/openapi-python-client#post_hooks
+    """
+
+    concurrently: list[str | list[str]]
+
+
+# A shell command, or the arguments of a command to run without a shell
+PostHook = str | list[str]
+
+
 class MetaType(StrEnum):
     """The types of metadata supported for project generation."""
 
@@ -40,12 +64,22 @@ class ConfigFile(BaseModel):
     package_name_override: str | None = None
     package_version_override: str | None = None
     use_path_prefixes_for_title_model_names: bool = True
-    post_hooks: list[str] | None = None
+    post_hooks: list[PostHook | PostHookGroup] | None = None
     docstrings_on_attributes: bool = False
     field_prefix: str = "field_"
     generate_all_tags: bool = False
     http_timeout: int = 5
     literal_enums: bool = False
+    lazy_components: bool = False
+    workers: int = 1
+    cache_dir: Path | None = None
+    include: OperationFilter | None = None
+    exclude: OperationFilter | None = None
+    prune_components: bool = False
+    shard_by_tag: bool = False
+    shard_groups: dict[str, list[str]] | None = None
+    streaming: bool = False
+    tidy_imports: bool = False
 
     @staticmethod
     def load_from_path(path: Path) -> "ConfigFile":
@@ -70,12 +104,22 @@ class Config:
     package_name_override: str | None
     package_version_override: str | None
     use_path_prefixes_for_title_model_names: bool
-    post_hooks: list[str]
+    post_hooks: list[PostHook | PostHookGroup]
     docstrings_on_attributes: bool
     field_prefix: str
     generate_all_tags: bool
     http_timeout: int
     literal_enums: bool
+    lazy_components: bool
+    workers: int
+    cache_dir: Path | None
+    include: OperationFilter | None
+    exclude: OperationFilter | None
+    prune_components: bool
+    shard_by_tag: bool
+    shard_groups: dict[str, list[str]]
+    streaming: bool
+    tidy_imports: bool
     document_source: Path | str
     file_encoding: str
     content_type_overrides: dict[str, str]
@@ -95,13 +139,13 @@ class Config:
             post_hooks = config_file.post_hooks
         elif meta_type == MetaType.NONE:
             post_hooks = [
-                "ruff check . --fix-only --extend-select=I",
-                "ruff format .",
+                "ruff check {files} --fix-only --extend-select=I",
+                "ruff format {files}",
             ]
         else:
             post_hooks = [
-                "ruff check --fix-only .",
-                "ruff format .",
+                "ruff check --fix-only {files}",
+                "ruff format {files}",
             ]
 
         config = Config(
@@ -118,6 +162,16 @@ class Config:
             generate_all_tags=config_file.generate_all_tags,
             http_timeout=config_file.http_timeout,
             literal_enums=config_file.literal_enums,
+            lazy_components=config_file.lazy_components,
+            workers=config_file.workers,
+            cache_dir=config_file.cache_dir,
+            include=config_file.include,
+            exclude=config_file.exclude,
+            prune_components=config_file.prune_components,
+            shard_by_tag=config_file.shard_by_tag or bool(config_file.shard_groups),
+            shard_groups=config_file.shard_groups or {},
+            streaming=config_file.streaming,
+            tidy_imports=config_file.tidy_imports,
             document_source=document_source,
             file_encoding=file_encoding,
             overwrite=overwrite,
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from enum import StrEnum
 
 import attr
@@ -34,7 +35,7 @@ def body_from_data(
     *,
     data: oai.Operation,
     schemas: Schemas,
-    request_bodies: dict[str, oai.RequestBody | oai.Reference],
+    request_bodies: Mapping[str, oai.RequestBody | oai.Reference],
     config: Config,
     endpoint_name: str,
 ) -> tuple[list[Body | ParseError], Schemas]:
@@ -103,11 +104,8 @@ def body_from_data(
             prop = attr.evolve(prop, is_multipart_body=True)
             schemas = attr.evolve(
                 schemas,
-                classes_by_name={
-                    **schemas.classes_by_name,
-                    prop.class_info.name: prop,
-                },
-                models_to_process=[*schemas.models_to_process, prop],
+                classes_by_name=schemas.classes_by_name.set(prop.class_info.name, prop),
+                models_to_process=schemas.models_to_process.appended(prop),
             )
         bodies.append(
             Body(
@@ -121,7 +119,7 @@ def body_from_data(
 
 
 def _resolve_reference(
-    body: oai.RequestBody | oai.Reference | None, request_bodies: dict[str, oai.RequestBody | oai.Reference]
+    body: oai.RequestBody | oai.Reference | None, request_bodies: Mapping[str, oai.RequestBody | oai.Reference]
 ) -> oai.RequestBody | ParseError | None:
     if body is None:
         return None
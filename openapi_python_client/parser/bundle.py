@@ -0,0 +1,234 @@
+"""Bundling an OpenAPI document which references other documents into a single document
+
+A document can be split across files or URLs with references like `common.yaml#/components/schemas/Error`. The parser
+only understands references within one document, so every part of another document which is referenced is copied into
+the `components` of the main document (where it would be if the document were one file), and references to it are
+replaced with references to that copy.
+"""
+
+__all__ = ["DocumentLoader", "bundle_references", "has_external_references"]
+
+import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from pathlib import PurePosixPath
+from typing import Any
+from urllib.parse import unquote, urldefrag, urljoin, urlparse
+
+from .errors import GeneratorError
+
+DocumentLoader = Callable[[str], Any | GeneratorError]
+"""Loads the document at an absolute URI"""
+
+# A `$ref` (in JSON or YAML) whose value doesn't start with `#`, so isn't within the same document
+_EXTERNAL_REFERENCE = re.compile(rb"""\$ref["']?\s*:\s*(?:["'][^"'#]|[^\s"'#])""")
+_COMPONENT = re.compile(r"/components/(?P<kind>[^/]+)/(?P<name>[^/]+)")
+# Loading documents is mostly waiting on disk or network, so this doesn't need to depend on `Config.workers`
+_MAX_CONCURRENT_LOADS = 8
+_REMOTE_SCHEMES = frozenset({"http", "https"})
+_SCHEMES = _REMOTE_SCHEMES | {"file"}
+
+_PATH_ITEMS = "pathItems"
+# The kind of component that a reference is to, based on the key it's under
+_KINDS_BY_KEY = {
+    "schema": "schemas",
+    "schemas": "schemas",
+    "parameters": "parameters",
+    "requestBody": "requestBodies",
+    "requestBodies": "requestBodies",
+    "responses": "responses",
+    "headers": "headers",
+    "examples": "examples",
+    "links": "links",
+    "callbacks": "callbacks",
+    "securitySchemes": "securitySchemes",
+    "paths": _PATH_ITEMS,
+}
+
+
+def has_external_references(document: bytes) -> bool:
+    """Whether the raw `document` might reference other documents, without having to load it"""
+    return _EXTERNAL_REFERENCE.search(document) is not None
+
+
+def bundle_references(document: dict[str, Any], *, uri: str, load: DocumentLoader) -> GeneratorError | None:
+    """Copy everything that `document` (found at `uri`) references in other documents into it.
+
+    Referenced documents are loaded concurrently with `load`, and each is loaded only once.
+
+    Returns:
+        An error if a referenced document couldn't be loaded, or doesn't contain what's referenced.
+    """
+    bundler = _Bundler(document, uri, load)
+    bundler.load_referenced_documents()
+    if bundler.error is None:
+        bundler.replace_referencing_components()
+        bundler.rewrite(document, uri, None)
+    return bundler.error
+
+
+class _Bundler:
+    def __init__(self, root: dict[str, Any], uri: str, load: DocumentLoader) -> None:
+        self.root = root
+        self.root_uri = uri
+        self.load = load
+        self.documents: dict[str, Any] = {uri: root}
+        self.copies: dict[str, str] = {}  # Absolute reference → local reference to the copy of what it references
+        self.error: GeneratorError | None = None
+
+    def fail(self, header: str, detail: str | None = None) -> None:
+        if self.error is None:
+            self.error = GeneratorError(header=header, detail=detail)
+
+    def load_referenced_documents(self) -> None:
+        pending = self._referenced_documents(self.root, self.root_uri)
+        while pending and self.error is None:
+            with ThreadPoolExecutor(max_workers=min(len(pending), _MAX_CONCURRENT_LOADS)) as executor:
+                loaded = dict(zip(pending, executor.map(self.load, pending), strict=True))
+            pending = set()
+            for uri, document in loaded.items():
+                if isinstance(document, GeneratorError):
+                    self.fail(f"Could not load referenced document {uri}", document.detail or document.header)
+                    continue
+                self.documents[uri] = document
+            for uri in loaded:
+                if uri in self.documents:
+                    pending |= self._referenced_documents(self.documents[uri], uri)
+
+    def _referenced_documents(self, node: Any, uri: str) -> set[str]:
+        """Every document referenced from `node` (in the document at `uri`) which hasn't been loaded yet"""
+        found: set[str] = set()
+        for ref in _references(node):
+            target_uri = urldefrag(urljoin(uri, ref))[0]
+            if target_uri in self.documents or target_uri in found:
+                continue
+            scheme = urlparse(target_uri).scheme
+            if scheme not in _SCHEMES:
+                self.fail(f"Unsupported reference {ref} in {uri}", "Only files and HTTP(S) URLs can be referenced")
+            elif scheme == "file" and urlparse(uri).scheme in _REMOTE_SCHEMES:
+                self.fail(f"Unsupported reference {ref} in {uri}", "Remote documents can't reference local files")
+            else:
+                found.add(target_uri)
+        return found
+
+    def replace_referencing_components(self) -> None:
+        """Replace components which only reference another document with what they reference.
+
+        Splitting a document up commonly leaves entries like `Pet: {$ref: pet.yaml}` in `components`, and copying `Pet`
+        in elsewhere (as `Pet2`) would generate it twice.
+        """
+        components = self.root.get("components")
+        if not isinstance(components, dict):
+            return
+        for kind, entries in components.items():
+            if not isinstance(entries, dict):
+                continue
+            for name, entry in list(entries.items()):
+                ref = entry.get("$ref") if isinstance(entry, dict) else None
+                if not isinstance(ref, str) or len(entry) > 1:
+                    continue
+                target_uri, fragment = urldefrag(urljoin(self.root_uri, ref))
+                absolute = f"{target_uri}#{fragment}"
+                if target_uri == self.root_uri or absolute in self.copies:
+                    continue
+                target = self._resolve(target_uri, fragment, ref)
+                if target is None:
+                    continue
+                self.copies[absolute] = f"#/components/{kind}/{_escape(name)}"
+                entries[name] = copy = deepcopy(target)
+                self.rewrite(copy, target_uri, kind)
+
+    def rewrite(self, node: Any, uri: str, kind: str | None) -> None:
+        """Replace every reference in `node` (in the document at `uri`) with one within the main document"""
+        if isinstance(node, list):
+            for item in node:
+                self.rewrite(item, uri, kind)
+            return
+        if not isinstance(node, dict):
+            return
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            target_uri, fragment = urldefrag(urljoin(uri, ref))
+            if target_uri == self.root_uri:
+                node["$ref"] = f"#{fragment}"
+            elif kind == _PATH_ITEMS:
+                # There's nowhere in `components` for path items in OpenAPI 3.0, so they're copied in place instead
+                target = self._resolve(target_uri, fragment, ref)
+                if isinstance(target, dict):
+                    del node["$ref"]
+                    node.update(deepcopy(target))
+                    uri = target_uri
+            else:
+                node["$ref"] = self._copy(target_uri, fragment, ref, kind or "schemas")
+        # Copies are added to `components` while it's being rewritten
+        for key, value in list(node.items()):
+            self.rewrite(value, uri, kind if kind == "schemas" else _KINDS_BY_KEY.get(key, kind))
+
+    def _copy(self, uri: str, fragment: str, ref: str, kind: str) -> str:
+        """Copy what `uri#fragment` references into the main document, returning a reference to the copy"""
+        absolute = f"{uri}#{fragment}"
+        if absolute in self.copies:
+            return self.copies[absolute]
+        target = self._resolve(uri, fragment, ref)
+        if target is None:
+            return ref
+
+        if component := _COMPONENT.fullmatch(fragment):
+            kind, name = component["kind"], _unescape(component["name"])
+        else:
+            name = _unescape(fragment.rsplit("/", maxsplit=1)[-1]) or PurePosixPath(urlparse(uri).path).stem
+        components = self.root.setdefault("components", {}).setdefault(kind, {})
+        unique_name = name
+        suffix = 2
+        while unique_name in components:
+            unique_name = f"{name}{suffix}"
+            suffix += 1
+
+        # Recorded before rewriting the copy, in case it (indirectly) references itself
+        self.copies[absolute] = f"#/components/{kind}/{_escape(unique_name)}"
+        components[unique_name] = copy = deepcopy(target)
+        self.rewrite(copy, uri, kind)
+        return self.copies[absolute]
+
+    def _resolve(self, uri: str, fragment: str, ref: str) -> Any:
+        """Find what the JSON pointer `fragment` points to in the document at `uri`"""
+        node = self.documents.get(uri)
+        if fragment and not fragment.startswith("/"):
+            self.fail(f"Could not resolve reference {ref}", "References must be JSON pointers")
+            return None
+        for part in fragment.split("/")[1:]:
+            key = _unescape(part)
+            if isinstance(node, dict) and key in node:
+                node = node[key]
+            elif isinstance(node, list) and key.isdigit() and int(key) < len(node):
+                node = node[int(key)]
+            else:
+                self.fail(f"Could not resolve reference {ref}", f"{uri} has nothing at {fragment}")
+                return None
+        return node
+
+
+def _references(node: Any) -> list[str]:
+    """Every `$ref` in `node`"""
+    found: list[str] = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                found.append(ref)
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return found
+
+
+def _escape(name: str) -> str:
+    return name.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(part: str) -> str:
+    """Decode one part of a JSON pointer in a URI fragment"""
+    return unquote(part).replace("~1", "/").replace("~0", "~")
@@ -0,0 +1,112 @@
+"""Validation of reusable components the first time they're used, instead of all at once"""
+
+__all__ = ["ComponentMap", "LazyComponents"]
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Generic, TypeVar
+
+from pydantic import TypeAdapter, ValidationError
+
+from .. import schema as oai
+from ..schema.openapi_schema_pydantic.reference import ReferenceOr
+from .errors import GeneratorError, ParseError
+
+_T = TypeVar("_T")
+
+_SECTIONS = (
+    "schemas",
+    "responses",
+    "parameters",
+    "examples",
+    "requestBodies",
+    "headers",
+    "securitySchemes",
+    "links",
+    "callbacks",
+)
+
+_SCHEMA_ADAPTER: TypeAdapter[oai.Reference | oai.Schema] = TypeAdapter(ReferenceOr[oai.Schema])
+_PARAMETER_ADAPTER: TypeAdapter[oai.Reference | oai.Parameter] = TypeAdapter(ReferenceOr[oai.Parameter])
+_REQUEST_BODY_ADAPTER: TypeAdapter[oai.Reference | oai.RequestBody] = TypeAdapter(ReferenceOr[oai.RequestBody])
+_RESPONSE_ADAPTER: TypeAdapter[oai.Reference | oai.Response] = TypeAdapter(ReferenceOr[oai.Response])
+
+
+class ComponentMap(Mapping[str, _T], Generic[_T]):
+    """The entries of one section of `components`, each validated the first time it's looked up.
+
+    An entry which fails validation is recorded in `errors` and then treated as if it didn't exist, so that only the
+    parts of the document which use it are affected.
+    """
+
+    def __init__(self, *, section: str, data: dict[str, Any], adapter: TypeAdapter[_T], errors: list[ParseError]):
+        self.section = section
+        self._data = data
+        self._adapter = adapter
+        self._errors = errors
+        self._validated: dict[str, _T | None] = {}
+
+    def _validate(self, name: str) -> _T | None:
+        if name in self._validated:
+            return self._validated[name]
+        result: _T | None = None
+        if name in self._data:
+            try:
+                result = self._adapter.validate_python(self._data[name])
+            except ValidationError as err:
+                self._errors.append(
+                    ParseError(header=f"Invalid component {self.section}/{name}, it will be ignored", detail=str(err))
+                )
+        self._validated[name] = result
+        return result
+
+    def __getitem__(self, name: str) -> _T:
+        result = self._validate(name)
+        if result is None:
+            raise KeyError(name)
+        return result
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names of valid entries, which requires validating all of them"""
+        return (name for name in self._data if self._validate(name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        """Whether there are any entries, without validating them"""
+        return bool(self._data)
+
+
+class LazyComponents:
+    """The parts of the `components` of an OpenAPI document which the generator uses, validated only as they're used.
+
+    Sections which the generator never looks up (like `examples`) are never validated. Every schema and parameter is
+    looked up, since each schema becomes a model, so only `requestBodies` and `responses` are really validated lazily.
+    """
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.errors: list[ParseError] = []
+        self.schemas: ComponentMap[oai.Reference | oai.Schema] = self._section(data, "schemas", _SCHEMA_ADAPTER)
+        self.parameters: ComponentMap[oai.Reference | oai.Parameter] = self._section(
+            data, "parameters", _PARAMETER_ADAPTER
+        )
+        self.requestBodies: ComponentMap[oai.Reference | oai.RequestBody] = self._section(
+            data, "requestBodies", _REQUEST_BODY_ADAPTER
+        )
+        self.responses: ComponentMap[oai.Reference | oai.Response] = self._section(data, "responses", _RESPONSE_ADAPTER)
+
+    def _section(self, data: dict[str, Any], section: str, adapter: TypeAdapter[_T]) -> ComponentMap[_T]:
+        return ComponentMap(section=section, data=data.get(section) or {}, adapter=adapter, errors=self.errors)
+
+    @staticmethod
+    def from_data(data: Any) -> "LazyComponents | GeneratorError":
+        """Check only the structure of `components`, leaving the validation of each entry until it's used"""
+        if data is None:
+            data = {}
+        if not isinstance(data, dict) or not all(
+            isinstance(data[section], dict) for section in _SECTIONS if data.get(section) is not None
+        ):
+            return GeneratorError(
+                header="Failed to parse OpenAPI document", detail="components must map names to objects"
+            )
+        return LazyComponents(data)
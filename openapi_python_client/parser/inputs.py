@@ -0,0 +1,89 @@
+"""Tracking which parts of an OpenAPI document changed between runs, so that only what they affect is generated again"""
+
+__all__ = ["ALL_PATHS", "DocumentInputs", "path_input"]
+
+import hashlib
+import json
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+# Stands for every path in the document, for what's generated from the inline schemas of any operation
+ALL_PATHS = "/paths"
+
+_LOCAL_REFERENCE = re.compile(r'(?<!\\)"\$ref": "#(/[^"]*)"')
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def path_input(path: str) -> str:
+    """The input that everything generated for the operations of `path` is generated from"""
+    return f"/paths/{_escape(path)}"
+
+
+def _input_of(pointer: str) -> str:
+    """The input containing the JSON pointer `pointer`"""
+    parts = pointer.split("/")
+    if parts[1:2] == ["components"]:
+        return "/".join(parts[:4])
+    return "/".join(parts[:3])
+
+
+def _dump(value: Any) -> str:
+    # Documents loaded from YAML can contain dates, which JSON has no type for
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@dataclass
+class DocumentInputs:
+    """A hash of each of the parts of a document that generated code comes from, and the references between them.
+
+    Those inputs are each path (like `/paths/~1pets`) and each component (like `/components/schemas/Pet`). Everything
+    else in the document is hashed together into `shared_hash`, since any of it can affect everything generated.
+    """
+
+    hashes: dict[str, str] = field(default_factory=dict)
+    references: dict[str, set[str]] = field(default_factory=dict)
+    shared_hash: str = ""
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> "DocumentInputs":
+        inputs = DocumentInputs()
+        units: list[tuple[str, Any]] = [(path_input(path), item) for path, item in (data.get("paths") or {}).items()]
+        components = data.get("components") or {}
+        if isinstance(components, Mapping):
+            for kind, values in components.items():
+                if isinstance(values, Mapping):
+                    units.extend((f"/components/{kind}/{_escape(name)}", value) for name, value in values.items())
+        for name, value in units:
+            content = _dump(value)
+            inputs.hashes[name] = _hash(content)
+            inputs.references[name] = {_input_of(pointer) for pointer in _LOCAL_REFERENCE.findall(content)}
+        shared = {key: value for key, value in data.items() if key not in ("paths", "components")}
+        inputs.shared_hash = _hash(_dump(shared))
+        return inputs
+
+    def changed_since(self, previous_hashes: Mapping[str, str]) -> set[str]:
+        """Every input which changed since `previous_hashes`, or references (maybe indirectly) one which did"""
+        changed = {name for name, hash_ in self.hashes.items() if previous_hashes.get(name) != hash_}
+        changed.update(name for name in previous_hashes if name not in self.hashes)
+        referenced_by: dict[str, list[str]] = {}
+        for name, references in self.references.items():
+            for reference in references:
+                referenced_by.setdefault(reference, []).append(name)
+        to_visit = list(changed)
+        while to_visit:
+            for name in referenced_by.get(to_visit.pop(), ()):
+                if name not in changed:
+                    changed.add(name)
+                    to_visit.append(name)
+        if any(name.startswith(f"{ALL_PATHS}/") for name in changed):
+            changed.add(ALL_PATHS)
+        return changed
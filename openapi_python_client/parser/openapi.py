@@ -1,17 +1,19 @@
 import re
-from collections.abc import Iterator
-from copy import deepcopy
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any, Protocol
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
+from .. import profiling, utils
 from .. import schema as oai
-from .. import utils
 from ..config import Config
 from ..utils import PythonIdentifier
 from .bodies import Body, body_from_data
+from .components import LazyComponents
 from .errors import GeneratorError, ParseError, PropertyError
+from .inputs import DocumentInputs
 from .properties import (
     Class,
     EnumProperty,
@@ -26,6 +28,7 @@ from .properties import (
 )
 from .properties.schemas import parameter_from_reference
 from .responses import HTTPStatusPattern, Responses, response_from_data
+from .selection import select_operations
 
 _PATH_PARAM_REGEX = re.compile("{([a-zA-Z_-][a-zA-Z0-9_-]*)}")
 
@@ -49,62 +52,110 @@ class EndpointCollection:
         data: dict[str, oai.PathItem],
         schemas: Schemas,
         parameters: Parameters,
-        request_bodies: dict[str, oai.RequestBody | oai.Reference],
-        responses: dict[str, oai.Response | oai.Reference],
+        request_bodies: Mapping[str, oai.RequestBody | oai.Reference],
+        responses: Mapping[str, oai.Response | oai.Reference],
         config: Config,
     ) -> tuple[dict[utils.PythonIdentifier, "EndpointCollection"], Schemas, Parameters]:
         """Parse the openapi paths data to get EndpointCollections by tag"""
         endpoints_by_tag: dict[utils.PythonIdentifier, EndpointCollection] = {}
+        for operation in _operations(data.items(), config=config):
+            endpoint, schemas, parameters = _parse_operation(
+                operation,
+                schemas=schemas,
+                parameters=parameters,
+                request_bodies=request_bodies,
+                responses=responses,
+                config=config,
+            )
+            collections = _collect_errors(endpoints_by_tag, operation, endpoint)
+            if not isinstance(endpoint, ParseError):
+                for collection in collections:
+                    collection.endpoints.append(endpoint)
 
-        methods = ["get", "put", "post", "delete", "options", "head", "patch", "trace"]
+        return endpoints_by_tag, schemas, parameters
 
-        for path, path_data in data.items():
-            for method in methods:
-                operation: oai.Operation | None = getattr(path_data, method)
-                if operation is None:
-                    continue
 
-                tags = [utils.PythonIdentifier(value=tag, prefix="tag") for tag in operation.tags or ["default"]]
-                if not config.generate_all_tags:
-                    tags = tags[:1]
+@dataclass
+class _Operation:
+    path: str
+    path_data: oai.PathItem
+    method: str
+    data: oai.Operation
+    tags: list[utils.PythonIdentifier]
 
-                collections = [endpoints_by_tag.setdefault(tag, EndpointCollection(tag=tag)) for tag in tags]
 
-                endpoint, schemas, parameters = Endpoint.from_data(
-                    data=operation,
-                    path=path,
-                    method=method,
-                    tags=tags,
-                    schemas=schemas,
-                    parameters=parameters,
-                    request_bodies=request_bodies,
-                    responses=responses,
-                    config=config,
-                )
-                # Add `PathItem` parameters
-                if not isinstance(endpoint, ParseError):
-                    endpoint, schemas, parameters = Endpoint.add_parameters(
-                        endpoint=endpoint,
-                        data=path_data,
-                        schemas=schemas,
-                        parameters=parameters,
-                        config=config,
-                    )
-                if not isinstance(endpoint, ParseError):
-                    endpoint = Endpoint.sort_parameters(endpoint=endpoint)
-                if isinstance(endpoint, ParseError):
-                    endpoint.header = f"WARNING parsing {method.upper()} {path} within {'/'.join(tags)}. Endpoint will not be generated."
-                    for collection in collections:
-                        collection.parse_errors.append(endpoint)
-                    continue
-                for error in endpoint.errors:
-                    error.header = f"WARNING parsing {method.upper()} {path} within {'/'.join(tags)}."
-                    for collection in collections:
-                        collection.parse_errors.append(error)
-                for collection in collections:
-                    collection.endpoints.append(endpoint)
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
 
-        return endpoints_by_tag, schemas, parameters
+
+def _operations(paths: Iterable[tuple[str, oai.PathItem]], *, config: Config) -> Iterator[_Operation]:
+    for path, path_data in paths:
+        for method in _METHODS:
+            operation: oai.Operation | None = getattr(path_data, method)
+            if operation is None:
+                continue
+
+            tags = [utils.PythonIdentifier(value=tag, prefix="tag") for tag in operation.tags or ["default"]]
+            if not config.generate_all_tags:
+                tags = tags[:1]
+            yield _Operation(path=path, path_data=path_data, method=method, data=operation, tags=tags)
+
+
+def _collect_errors(
+    endpoints_by_tag: dict[utils.PythonIdentifier, "EndpointCollection"],
+    operation: _Operation,
+    endpoint: "Endpoint | ParseError",
+) -> list["EndpointCollection"]:
+    """Add the errors from parsing `operation` to the collection of each of its tags, and return those collections"""
+    path, method, tags = operation.path, operation.method, operation.tags
+    collections = [endpoints_by_tag.setdefault(tag, EndpointCollection(tag=tag)) for tag in tags]
+    if isinstance(endpoint, ParseError):
+        endpoint.header = (
+            f"WARNING parsing {method.upper()} {path} within {'/'.join(tags)}. Endpoint will not be generated."
+        )
+        for collection in collections:
+            collection.parse_errors.append(endpoint)
+        return collections
+    for error in endpoint.errors:
+        error.header = f"WARNING parsing {method.upper()} {path} within {'/'.join(tags)}."
+        for collection in collections:
+            collection.parse_errors.append(error)
+    return collections
+
+
+def _parse_operation(
+    operation: _Operation,
+    *,
+    schemas: Schemas,
+    parameters: Parameters,
+    request_bodies: Mapping[str, oai.RequestBody | oai.Reference],
+    responses: Mapping[str, oai.Response | oai.Reference],
+    config: Config,
+) -> tuple["Endpoint | ParseError", Schemas, Parameters]:
+    path, method = operation.path, operation.method
+    with profiling.item("endpoints", f"{method.upper()} {path}"):
+        endpoint, schemas, parameters = Endpoint.from_data(
+            data=operation.data,
+            path=path,
+            method=method,
+            tags=operation.tags,
+            schemas=schemas,
+            parameters=parameters,
+            request_bodies=request_bodies,
+            responses=responses,
+            config=config,
+        )
+        # Add `PathItem` parameters
+        if not isinstance(endpoint, ParseError):
+            endpoint, schemas, parameters = Endpoint.add_parameters(
+                endpoint=endpoint,
+                data=operation.path_data,
+                schemas=schemas,
+                parameters=parameters,
+                config=config,
+            )
+    if not isinstance(endpoint, ParseError):
+        endpoint = Endpoint.sort_parameters(endpoint=endpoint)
+    return endpoint, schemas, parameters
 
 
 def generate_operation_id(*, path: str, method: str) -> str:
@@ -156,10 +207,9 @@ class Endpoint:
         endpoint: "Endpoint",
         data: oai.Responses,
         schemas: Schemas,
-        responses: dict[str, oai.Response | oai.Reference],
+        responses: Mapping[str, oai.Response | oai.Reference],
         config: Config,
     ) -> tuple["Endpoint", Schemas]:
-        endpoint = deepcopy(endpoint)
         for code, response_data in data.items():
             status_code = HTTPStatusPattern.parse(code)
             if isinstance(status_code, ParseError):
@@ -212,7 +262,8 @@ class Endpoint:
         parameters should therefore be added __after__ operation parameters.
 
         Args:
-            endpoint: The endpoint to add parameters to.
+            endpoint: The endpoint to add parameters to. It is updated in place, so it should not be reused if this
+                returns a `ParseError`.
             data: The Operation or PathItem to add parameters from.
             schemas: The cumulative Schemas of processing so far which should contain details for any references.
             parameters: The cumulative Parameters of processing so far which should contain details for any references.
@@ -232,8 +283,6 @@ class Endpoint:
         if data.parameters is None:
             return endpoint, schemas, parameters
 
-        endpoint = deepcopy(endpoint)
-
         unique_parameters: set[tuple[str, oai.ParameterLocation]] = set()
         parameters_by_location: dict[str, list[Property]] = {
             oai.ParameterLocation.QUERY: endpoint.query_parameters,
@@ -371,13 +420,12 @@ class Endpoint:
         Sorts the path parameters of an `endpoint` so that they match the order declared in `endpoint.path`.
 
         Args:
-            endpoint: The endpoint to sort the parameters of.
+            endpoint: The endpoint to sort the parameters of, which is updated in place.
 
         Returns:
-            Either an updated `endpoint` with sorted path parameters or a `ParseError` if something was wrong with
+            Either the updated `endpoint` with sorted path parameters or a `ParseError` if something was wrong with
                 the path parameters and they could not be sorted.
         """
-        endpoint = deepcopy(endpoint)
         parameters_from_path = re.findall(_PATH_PARAM_REGEX, endpoint.path)
         try:
             endpoint.path_parameters.sort(
@@ -403,8 +451,8 @@ class Endpoint:
         tags: list[PythonIdentifier],
         schemas: Schemas,
         parameters: Parameters,
-        request_bodies: dict[str, oai.RequestBody | oai.Reference],
-        responses: dict[str, oai.Response | oai.Reference],
+        request_bodies: Mapping[str, oai.RequestBody | oai.Reference],
+        responses: Mapping[str, oai.Response | oai.Reference],
         config: Config,
     ) -> tuple["Endpoint | ParseError", Schemas, Parameters]:
         """Construct an endpoint from the OpenAPI data"""
@@ -494,6 +542,27 @@ class Endpoint:
         )
 
 
+_PATHS_ADAPTER: TypeAdapter[dict[str, oai.PathItem]] = TypeAdapter(dict[str, oai.PathItem])
+_PATH_ITEM_ADAPTER: TypeAdapter[oai.PathItem] = TypeAdapter(oai.PathItem)
+
+
+@dataclass
+class PendingEndpoints:
+    """The operations of a document, left to be parsed one at a time while the client is generated.
+
+    That way, only one validated operation (and the endpoint parsed from it) is in memory at a time, instead of all of
+    them. Parsing starts from the schemas and parameters of the components, which every endpoint can use.
+    """
+
+    paths: Mapping[str, Any]
+    schemas: Schemas
+    parameters: Parameters
+    request_bodies: Mapping[str, oai.RequestBody | oai.Reference]
+    responses: Mapping[str, oai.Response | oai.Reference]
+    component_errors: list[ParseError]
+    config: Config
+
+
 @dataclass
 class GeneratorData:
     """All the data needed to generate a client"""
@@ -505,51 +574,119 @@ class GeneratorData:
     errors: list[ParseError]
     endpoint_collections_by_tag: dict[utils.PythonIdentifier, EndpointCollection]
     enums: list[EnumProperty | LiteralEnumProperty]
+    inputs: DocumentInputs | None = None
+    pending_endpoints: PendingEndpoints | None = None
 
     @staticmethod
     def from_dict(data: dict[str, Any], *, config: Config) -> "GeneratorData | GeneratorError":
         """Create an OpenAPI from dict"""
-        try:
-            openapi = oai.OpenAPI.model_validate(data)
-        except ValidationError as err:
-            detail = str(err)
-            if "swagger" in data:
-                detail = (
-                    "You may be trying to use a Swagger document; this is not supported by this project.\n\n" + detail
-                )
-            return GeneratorError(header="Failed to parse OpenAPI document", detail=detail)
+        lazy_components: LazyComponents | None = None
+        paths: dict[str, Any] | None = None
+        with profiling.phase("validate"):
+            if isinstance(data, dict):
+                data = select_operations(data, config=config)
+            document = data
+            if config.lazy_components and isinstance(data, dict):
+                lazy_components_or_error = LazyComponents.from_data(data.get("components"))
+                if isinstance(lazy_components_or_error, GeneratorError):
+                    return lazy_components_or_error
+                lazy_components = lazy_components_or_error
+                data = {**data, "components": None}
+            if config.streaming and isinstance(data, dict) and isinstance(data.get("paths"), dict):
+                # Each path is validated on its own (and validated again once it's parsed), so the whole validated
+                # document is never in memory at once
+                paths = data["paths"]
+                data = {**data, "paths": {}}
+            try:
+                openapi = oai.OpenAPI.model_validate(data)
+                for path, path_item in (paths or {}).items():
+                    _PATHS_ADAPTER.validate_python({path: path_item})
+            except ValidationError as err:
+                detail = str(err)
+                if "swagger" in data:
+                    detail = (
+                        "You may be trying to use a Swagger document; this is not supported by this project.\n\n"
+                        + detail
+                    )
+                return GeneratorError(header="Failed to parse OpenAPI document", detail=detail)
+            inputs = DocumentInputs.from_dict(document)
+        components = lazy_components or openapi.components
         schemas = Schemas()
         parameters = Parameters()
-        if openapi.components and openapi.components.schemas:
-            schemas = build_schemas(components=openapi.components.schemas, schemas=schemas, config=config)
-        if openapi.components and openapi.components.parameters:
-            parameters = build_parameters(
-                components=openapi.components.parameters,
+        with profiling.phase("schemas"):
+            if components and components.schemas:
+                schemas = build_schemas(components=components.schemas, schemas=schemas, config=config)
+            if components and components.parameters:
+                parameters = build_parameters(
+                    components=components.parameters,
+                    parameters=parameters,
+                    config=config,
+                )
+        request_bodies = (components and components.requestBodies) or {}
+        responses = (components and components.responses) or {}
+        component_errors = lazy_components.errors if lazy_components else []
+        generator_data = GeneratorData(
+            title=openapi.info.title,
+            description=openapi.info.description,
+            version=openapi.info.version,
+            endpoint_collections_by_tag={},
+            models=[],
+            errors=[],
+            enums=[],
+            inputs=inputs,
+        )
+        if paths is not None:
+            generator_data.pending_endpoints = PendingEndpoints(
+                paths=paths,
+                schemas=schemas,
                 parameters=parameters,
+                request_bodies=request_bodies,
+                responses=responses,
+                component_errors=component_errors,
                 config=config,
             )
-        request_bodies = (openapi.components and openapi.components.requestBodies) or {}
-        responses = (openapi.components and openapi.components.responses) or {}
-        endpoint_collections_by_tag, schemas, parameters = EndpointCollection.from_data(
-            data=openapi.paths,
-            schemas=schemas,
-            parameters=parameters,
-            request_bodies=request_bodies,
-            responses=responses,
-            config=config,
+        else:
+            with profiling.phase("endpoints"):
+                endpoint_collections_by_tag, schemas, parameters = EndpointCollection.from_data(
+                    data=openapi.paths,
+                    schemas=schemas,
+                    parameters=parameters,
+                    request_bodies=request_bodies,
+                    responses=responses,
+                    config=config,
+                )
+            generator_data.endpoint_collections_by_tag = endpoint_collections_by_tag
+        generator_data._set_classes(schemas, parameters, component_errors)
+        return generator_data
+
+    def parse_pending_endpoints(self) -> Iterator[tuple["Endpoint", list[utils.PythonIdentifier]]]:
+        """Parse the `pending_endpoints` one at a time, yielding each endpoint (which isn't kept) along with its tags.
+
+        Only the errors of each endpoint are added to `endpoint_collections_by_tag`. Once every endpoint was parsed,
+        `models`, `enums`, and `errors` include everything added by them. Iterating again parses them all again.
+        """
+        pending = self.pending_endpoints
+        if pending is None:
+            return
+        self.endpoint_collections_by_tag.clear()
+        schemas, parameters = pending.schemas, pending.parameters
+        parse = partial(
+            _parse_operation, request_bodies=pending.request_bodies, responses=pending.responses, config=pending.config
         )
+        for path, path_data in pending.paths.items():
+            with profiling.phase("validate"):
+                path_item = _PATH_ITEM_ADAPTER.validate_python(path_data)
+            for operation in _operations([(path, path_item)], config=pending.config):
+                with profiling.phase("endpoints"):
+                    endpoint, schemas, parameters = parse(operation, schemas=schemas, parameters=parameters)
+                _collect_errors(self.endpoint_collections_by_tag, operation, endpoint)
+                if not isinstance(endpoint, ParseError):
+                    yield endpoint, operation.tags
+        self._set_classes(schemas, parameters, pending.component_errors)
 
-        enums = [
+    def _set_classes(self, schemas: Schemas, parameters: Parameters, component_errors: list[ParseError]) -> None:
+        self.enums = [
             prop for prop in schemas.classes_by_name.values() if isinstance(prop, EnumProperty | LiteralEnumProperty)
         ]
-        models = [prop for prop in schemas.classes_by_name.values() if isinstance(prop, ModelProperty)]
-
-        return GeneratorData(
-            title=openapi.info.title,
-            description=openapi.info.description,
-            version=openapi.info.version,
-            endpoint_collections_by_tag=endpoint_collections_by_tag,
-            models=models,
-            errors=schemas.errors + parameters.errors,
-            enums=enums,
-        )
+        self.models = [prop for prop in schemas.classes_by_name.values() if isinstance(prop, ModelProperty)]
+        self.errors = schemas.errors + parameters.errors + component_errors
@@ -14,11 +14,13 @@ __all__ = [
     "property_from_data",
 ]
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain
+from typing import TypeVar
 
 from attrs import evolve
 
-from ... import Config, utils
+from ... import Config, profiling, utils
 from ... import schema as oai
 from ..errors import ParameterError, ParseError, PropertyError
 from .any import AnyProperty
@@ -49,6 +51,8 @@ from .string import StringProperty
 from .union import UnionProperty
 from .uuid import UuidProperty
 
+_T = TypeVar("_T")
+
 
 def _string_based_property(
     name: str, required: bool, data: oai.Schema, config: Config
@@ -178,10 +182,7 @@ def property_from_data(  # noqa: PLR0911, PLR0912
         # the class for the schema it's referencing - so we don't add it to classes_by_name; but we do
         # add it to models_to_process, if it's a model, because its properties still need to be resolved.
         if isinstance(prop, ModelProperty):
-            schemas = evolve(
-                schemas,
-                models_to_process=[*schemas.models_to_process, prop],
-            )
+            schemas = evolve(schemas, models_to_process=schemas.models_to_process.appended(prop))
         return prop, schemas
 
     if data.type == oai.DataType.BOOLEAN:
@@ -311,17 +312,126 @@ def property_from_data(  # noqa: PLR0911, PLR0912
     )
 
 
+_SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+
+def _schema_creation_dependencies(  # noqa: PLR0912
+    data: oai.Reference | oai.Schema, *, process_properties: bool, data_type: oai.DataType | None = None
+) -> Iterator[str]:
+    """Yield the names of the component schemas which must be created before `data` can be created.
+
+    This follows the same decisions as `property_from_data`. Properties of models are only visited when they would
+    be processed, since model properties are otherwise resolved later by `_process_models`.
+    """
+    if isinstance(data, oai.Reference):
+        if data.ref.startswith(_SCHEMA_REF_PREFIX):
+            yield get_reference_simple_name(data.ref)
+        return
+
+    data_type = data_type or (None if isinstance(data.type, list) else data.type)
+    sub_data = data.allOf + data.anyOf + data.oneOf
+    if len(sub_data) == 1 and isinstance(sub_data[0], oai.Reference):
+        yield from _schema_creation_dependencies(sub_data[0], process_properties=process_properties)
+    elif data_type == oai.DataType.BOOLEAN or data.enum:
+        return
+    elif data.anyOf or data.oneOf or (isinstance(data.type, list) and data_type is None):
+        for inner in chain(data.anyOf, data.oneOf):
+            yield from _schema_creation_dependencies(inner, process_properties=True)
+        for inner_type in data.type if isinstance(data.type, list) else []:
+            yield from _schema_creation_dependencies(data, process_properties=True, data_type=inner_type)
+    elif data.const is not None:
+        return
+    elif data_type == oai.DataType.ARRAY:
+        for item in chain(data.prefixItems, [data.items] if data.items else []):
+            yield from _schema_creation_dependencies(item, process_properties=process_properties)
+    elif data_type == oai.DataType.OBJECT or data.allOf or (data_type is None and data.properties):
+        if not process_properties:
+            return
+        for sub_prop in data.allOf:
+            yield from _schema_creation_dependencies(sub_prop, process_properties=True)
+        for prop in (data.properties or {}).values():
+            yield from _schema_creation_dependencies(prop, process_properties=True)
+        if isinstance(data.additionalProperties, oai.Reference | oai.Schema):
+            yield from _schema_creation_dependencies(data.additionalProperties, process_properties=True)
+
+
+def _dependency_order(keys: list[_T], dependencies: dict[_T, set[_T]]) -> tuple[list[_T], dict[_T, list[_T]]]:
+    """Order `keys` so that everything comes after the keys it depends on.
+
+    Ties are broken the same way as repeatedly passing over `keys` in their original order until everything is
+    processed would break them, so this produces exactly the order that such a retry loop would have, without the
+    quadratic cost. Dependencies which aren't in `keys` are ignored.
+
+    Returns:
+        `(order, cycles)` where `cycles` maps every key which is part of a dependency cycle to the keys in that cycle.
+    """
+    index = {key: i for i, key in enumerate(keys)}
+    rank: dict[_T, int] = {}
+    cycles: dict[_T, list[_T]] = {}
+    for root in keys:
+        if root in rank:
+            continue
+        # Iterative depth-first search, since dependency chains can be much deeper than the recursion limit
+        path: list[_T] = [root]
+        position_in_path = {root: 0}
+        stack = [iter(dependencies.get(root, ()))]
+        while stack:
+            for child in stack[-1]:
+                if child not in index or child in rank:
+                    continue
+                if child in position_in_path:
+                    cycle = [*path[position_in_path[child] :], child]
+                    for member in cycle:
+                        cycles.setdefault(member, cycle)
+                    continue
+                position_in_path[child] = len(path)
+                path.append(child)
+                stack.append(iter(dependencies.get(child, ())))
+                break
+            else:
+                stack.pop()
+                key = path.pop()
+                del position_in_path[key]
+                # A key can be processed in the same pass as a dependency which comes before it, otherwise in the next
+                rank[key] = max(
+                    (rank[child] + (index[child] > index[key]) for child in dependencies.get(key, ()) if child in rank),
+                    default=1,
+                )
+    return sorted(keys, key=lambda key: (rank[key], index[key])), cycles
+
+
+def _component_schema_dependencies(components: Mapping[str, oai.Reference | oai.Schema]) -> dict[str, set[str]]:
+    dependencies: dict[str, set[str]] = {}
+    for name, data in components.items():
+        # Reference schemas are created from the schema they (eventually) refer to
+        schema_data: oai.Reference | oai.Schema | None = data
+        seen = {name}
+        while isinstance(schema_data, oai.Reference):
+            data_ref_schema = get_reference_simple_name(schema_data.ref)
+            if data_ref_schema in seen:
+                break
+            seen.add(data_ref_schema)
+            schema_data = components.get(data_ref_schema)
+        if isinstance(schema_data, oai.Schema):
+            dependencies[name] = set(_schema_creation_dependencies(schema_data, process_properties=False))
+    return dependencies
+
+
 def _create_schemas(
     *,
-    components: dict[str, oai.Reference | oai.Schema],
+    components: Mapping[str, oai.Reference | oai.Schema],
     schemas: Schemas,
     config: Config,
 ) -> Schemas:
-    to_process: Iterable[tuple[str, oai.Reference | oai.Schema]] = components.items()
+    order, cycles = _dependency_order(list(components), _component_schema_dependencies(components))
+    original_index = {name: i for i, name in enumerate(components)}
+
+    to_process: Iterable[tuple[str, oai.Reference | oai.Schema]] = [(name, components[name]) for name in order]
     still_making_progress = True
-    errors: list[PropertyError] = []
+    errors: list[tuple[str, PropertyError]] = []
 
-    # References could have forward References so keep going as long as we are making progress
+    # Processing in dependency order means everything which can be created is created in the first round. Anything left
+    # over is retried as long as we are making progress, which also catches any dependencies that weren't predicted.
     while still_making_progress:
         still_making_progress = False
         errors = []
@@ -344,20 +454,25 @@ def _create_schemas(
                     # use derefenced schema definition for this schema
                     schema_data = components.get(data_ref_schema)
             if isinstance(schema_data, oai.Schema):
-                schemas_or_err = update_schemas_with_data(
-                    ref_path=ref_path, data=schema_data, schemas=schemas, config=config
-                )
+                with profiling.item("schemas", ref_path):
+                    schemas_or_err = update_schemas_with_data(
+                        ref_path=ref_path, data=schema_data, schemas=schemas, config=config
+                    )
             else:
                 schemas.errors.append(PropertyError(detail="Referent schema not found", data=data))
             if isinstance(schemas_or_err, PropertyError):
                 next_round.append((name, data))
-                errors.append(schemas_or_err)
+                errors.append((name, schemas_or_err))
                 continue
             schemas = schemas_or_err
             still_making_progress = True
-        to_process = next_round
+        to_process = sorted(next_round, key=lambda item: original_index[item[0]])
 
-    schemas.errors.extend(errors)
+    for name, error in errors:
+        if name in cycles:
+            error.detail = error.detail or ""
+            error.detail += f"\n\nCircular reference found: {' -> '.join(cycles[name])}"
+    schemas.errors.extend(error for _, error in errors)
     return schemas
 
 
@@ -384,20 +499,64 @@ def _process_model_errors(
     return [error for _, error in model_errors]
 
 
+def _all_of_references(data: oai.Schema) -> Iterator[str]:
+    """Yield the references in `data`'s allOf, and in the allOf of any inline schemas within it.
+
+    Those are the models which must have their properties processed before `data`'s properties can be processed.
+    """
+    for sub_data in data.allOf:
+        if isinstance(sub_data, oai.Reference):
+            yield sub_data.ref
+    inline_schemas = chain(
+        data.allOf,
+        data.anyOf,
+        data.oneOf,
+        data.prefixItems,
+        [data.items] if data.items else [],
+        (data.properties or {}).values(),
+        [data.additionalProperties] if isinstance(data.additionalProperties, oai.Schema) else [],
+    )
+    for inline_schema in inline_schemas:
+        if isinstance(inline_schema, oai.Schema):
+            yield from _all_of_references(inline_schema)
+
+
+def _model_dependencies(models: Sequence[ModelProperty], schemas: Schemas) -> dict[int, set[int]]:
+    """Map the index of each model in `models` to the indices of the models it takes allOf"""
+    index_by_id = {id(model): i for i, model in enumerate(models)}
+    dependencies: dict[int, set[int]] = {}
+    for i, model in enumerate(models):
+        for ref in _all_of_references(model.data):
+            ref_path = parse_reference_path(ref)
+            if isinstance(ref_path, ParseError):
+                continue
+            dependency = index_by_id.get(id(schemas.classes_by_reference.get(ref_path)))
+            if dependency is not None:
+                dependencies.setdefault(i, set()).add(dependency)
+    return dependencies
+
+
 def _process_models(*, schemas: Schemas, config: Config) -> Schemas:
-    to_process = schemas.models_to_process
+    models = schemas.models_to_process
+    # Models which refer to other models in their allOf must be processed after their referenced models
+    order, _ = _dependency_order(list(range(len(models))), _model_dependencies(models, schemas))
+
+    to_process = [models[i] for i in order]
+    original_index = {id(model): i for i, model in enumerate(models)}
     still_making_progress = True
     final_model_errors: list[tuple[ModelProperty, PropertyError]] = []
     latest_model_errors: list[tuple[ModelProperty, PropertyError]] = []
 
-    # Models which refer to other models in their allOf must be processed after their referenced models
+    # In dependency order, everything which can be processed is processed in the first round. Anything left over is
+    # retried as long as we are making progress, which also catches any dependencies that weren't predicted.
     while still_making_progress:
         still_making_progress = False
         # Only accumulate errors from the last round, since we might fix some along the way
         latest_model_errors = []
         next_round = []
         for model_prop in to_process:
-            schemas_or_err = process_model(model_prop, schemas=schemas, config=config)
+            with profiling.item("schemas", model_prop.name):
+                schemas_or_err = process_model(model_prop, schemas=schemas, config=config)
             if isinstance(schemas_or_err, PropertyError):
                 schemas_or_err.header = f"\nUnable to process schema {model_prop.name}:"
                 if isinstance(schemas_or_err.data, oai.Reference) and schemas_or_err.data.ref.endswith(
@@ -412,7 +571,7 @@ def _process_models(*, schemas: Schemas, config: Config) -> Schemas:
                 continue
             schemas = schemas_or_err
             still_making_progress = True
-        to_process = next_round
+        to_process = sorted(next_round, key=lambda model: original_index[id(model)])
 
     final_model_errors.extend(latest_model_errors)
     errors = _process_model_errors(final_model_errors, schemas=schemas)
@@ -421,7 +580,7 @@ def _process_models(*, schemas: Schemas, config: Config) -> Schemas:
 
 def build_schemas(
     *,
-    components: dict[str, oai.Reference | oai.Schema],
+    components: Mapping[str, oai.Reference | oai.Schema],
     schemas: Schemas,
     config: Config,
 ) -> Schemas:
@@ -433,7 +592,7 @@ def build_schemas(
 
 def build_parameters(
     *,
-    components: dict[str, oai.Reference | oai.Parameter],
+    components: Mapping[str, oai.Reference | oai.Parameter],
     parameters: Parameters,
     config: Config,
 ) -> Parameters:
@@ -147,7 +147,7 @@ class LiteralEnumProperty(PropertyProtocol):
             return checked_default, schemas
         prop = evolve(prop, default=checked_default)
 
-        schemas = evolve(schemas, classes_by_name={**schemas.classes_by_name, class_info.name: prop})
+        schemas = evolve(schemas, classes_by_name=schemas.classes_by_name.set(class_info.name, prop))
         return prop, schemas
 
     def convert_value(self, value: Any) -> Value | PropertyError | None:
@@ -120,8 +120,8 @@ class ModelProperty(PropertyProtocol):
 
         schemas = evolve(
             schemas,
-            classes_by_name={**schemas.classes_by_name, class_info.name: prop},
-            models_to_process=[*schemas.models_to_process, prop],
+            classes_by_name=schemas.classes_by_name.set(class_info.name, prop),
+            models_to_process=schemas.models_to_process.appended(prop),
         )
         return prop, schemas
 
@@ -0,0 +1,208 @@
+"""Immutable collections which can be updated in constant time.
+
+`Schemas` and `Parameters` are treated as immutable values: every update produces a new instance, and callers rely on
+being able to keep using an older instance (for example, to discard everything done while parsing a property which
+turned out to be invalid). Copying a `dict` or `list` for every update makes building them quadratic, so these
+collections share their contents between versions instead.
+
+Every version is a view of the first `length` entries of a shared, append-only log. Updating the newest version
+appends to the log, which is O(1), and leaves older versions unchanged since they never look past their own length.
+Updating an older version copies the entries it can see into a new log first, which is only needed on error paths.
+"""
+
+from __future__ import annotations
+
+__all__ = ["PersistentList", "PersistentMap", "to_persistent_list", "to_persistent_map"]
+
+from collections.abc import Hashable, Iterable, Iterator, Mapping, Sequence
+from typing import Any, Generic, TypeVar, overload
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+_T = TypeVar("_T")
+
+_REMOVED: Any = object()
+
+
+class _Log(Generic[_T]):
+    """Storage shared by every version of a collection"""
+
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: list[_T]) -> None:
+        self.entries = entries
+
+
+class PersistentList(Sequence[_T]):
+    """An immutable sequence where `appended` returns a new list in O(1) time"""
+
+    __slots__ = ("_length", "_log")
+
+    def __init__(self, items: Iterable[_T] = ()) -> None:
+        entries = list(items)
+        self._log = _Log(entries)
+        self._length = len(entries)
+
+    @classmethod
+    def _view(cls, log: _Log[_T], length: int) -> PersistentList[_T]:
+        view = cls.__new__(cls)
+        view._log = log
+        view._length = length
+        return view
+
+    def appended(self, item: _T) -> PersistentList[_T]:
+        """Get a new list with `item` added to the end, leaving this one unchanged"""
+        if len(self._log.entries) == self._length:
+            self._log.entries.append(item)
+            return self._view(self._log, self._length + 1)
+        return PersistentList([*self, item])
+
+    @overload
+    def __getitem__(self, index: int) -> _T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[_T]: ...
+
+    def __getitem__(self, index: int | slice) -> _T | list[_T]:
+        return self._log.entries[: self._length][index] if isinstance(index, slice) else self._item(index)
+
+    def _item(self, index: int) -> _T:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PersistentList index out of range")
+        return self._log.entries[index]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[_T]:
+        entries = self._log.entries
+        return (entries[i] for i in range(self._length))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PersistentList | list | tuple):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PersistentList({list(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return PersistentList, (list(self),)
+
+
+class _MapLog(_Log[tuple[_K, _V]]):
+    """A log of `(key, value)` writes along with the positions in it that each key was written at"""
+
+    __slots__ = ("positions",)
+
+    def __init__(self, entries: list[tuple[_K, _V]]) -> None:
+        super().__init__(entries)
+        self.positions: dict[_K, list[int]] = {}
+        for position, (key, _) in enumerate(entries):
+            self.positions.setdefault(key, []).append(position)
+
+
+class PersistentMap(Mapping[_K, _V]):
+    """An immutable mapping where `set` returns a new mapping in O(1) time.
+
+    Keys are iterated in the order they were first added, like a `dict`.
+    """
+
+    __slots__ = ("_length", "_log", "_size")
+
+    def __init__(self, items: Mapping[_K, _V] | Iterable[tuple[_K, _V]] = ()) -> None:
+        entries = list(dict(items).items())
+        self._log = _MapLog(entries)
+        self._length = len(entries)
+        self._size = len(entries)
+
+    def _lookup(self, key: _K) -> _V:
+        """Get the value of `key` in this version, which is `_REMOVED` if it has no value"""
+        positions = self._log.positions.get(key)
+        if positions is not None:
+            for position in reversed(positions):
+                if position < self._length:
+                    return self._log.entries[position][1]
+        return _REMOVED
+
+    def _write(self, key: _K, value: _V) -> tuple[_MapLog[_K, _V], int]:
+        """Record `value` for `key` after this version, returning the log and length of the new version"""
+        if len(self._log.entries) == self._length:
+            self._log.positions.setdefault(key, []).append(self._length)
+            self._log.entries.append((key, value))
+            return self._log, self._length + 1
+        log = _MapLog([*self.items(), (key, value)])
+        return log, len(log.entries)
+
+    def set(self, key: _K, value: _V) -> PersistentMap[_K, _V]:
+        """Get a new mapping with `key` set to `value`, leaving this one unchanged"""
+        was_present = self._lookup(key) is not _REMOVED
+        log, length = self._write(key, value)
+        new = PersistentMap.__new__(PersistentMap)
+        new._log = log
+        new._length = length
+        new._size = self._size if was_present else self._size + 1
+        return new
+
+    def __getitem__(self, key: _K) -> _V:
+        value = self._lookup(key)
+        if value is _REMOVED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self._lookup(key) is not _REMOVED  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[_K]:
+        for key in list(self._log.positions):
+            if key in self:
+                yield key
+
+    def __delitem__(self, key: _K) -> None:
+        """Remove `key` from this mapping in place. Other versions are unaffected."""
+        if key not in self:
+            raise KeyError(key)
+        self._log, self._length = self._write(key, _REMOVED)
+        self._size -= 1
+
+    _MISSING: Any = object()
+
+    def pop(self, key: _K, default: Any = _MISSING) -> Any:
+        """Remove `key` from this mapping in place and return its value. Other versions are unaffected."""
+        value = self._lookup(key)
+        if value is _REMOVED:
+            if default is self._MISSING:
+                raise KeyError(key)
+            return default
+        del self[key]
+        return value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Mapping):
+            return len(self) == len(other) and all(key in other and other[key] == value for key, value in self.items())
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return PersistentMap, (dict(self),)
+
+
+def to_persistent_list(items: Iterable[Any]) -> PersistentList[Any]:
+    """Convert `items` to a `PersistentList`, without copying it if it already is one"""
+    return items if isinstance(items, PersistentList) else PersistentList(items)
+
+
+def to_persistent_map(items: Mapping[Any, Any]) -> PersistentMap[Any, Any]:
+    """Convert `items` to a `PersistentMap`, without copying it if it already is one"""
+    return items if isinstance(items, PersistentMap) else PersistentMap(items)
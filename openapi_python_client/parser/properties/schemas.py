@@ -20,6 +20,7 @@ from ... import schema as oai
 from ...schema.openapi_schema_pydantic import Parameter
 from ...utils import ClassName, PythonIdentifier
 from ..errors import ParameterError, ParseError, PropertyError
+from .persistent import PersistentList, PersistentMap, to_persistent_list, to_persistent_map
 
 if TYPE_CHECKING:  # pragma: no cover
     from .model_property import ModelProperty
@@ -83,10 +84,12 @@ class Class:
 class Schemas:
     """Structure for containing all defined, shareable, and reusable schemas (attr classes and Enums)"""
 
-    classes_by_reference: dict[ReferencePath, Property] = field(factory=dict)
+    classes_by_reference: PersistentMap[ReferencePath, Property] = field(
+        factory=PersistentMap, converter=to_persistent_map
+    )
     dependencies: dict[ReferencePath, set[ReferencePath | ClassName]] = field(factory=dict)
-    classes_by_name: dict[ClassName, Property] = field(factory=dict)
-    models_to_process: list[ModelProperty] = field(factory=list)
+    classes_by_name: PersistentMap[ClassName, Property] = field(factory=PersistentMap, converter=to_persistent_map)
+    models_to_process: PersistentList[ModelProperty] = field(factory=PersistentList, converter=to_persistent_list)
     errors: list[ParseError] = field(factory=list)
 
     def add_dependencies(self, ref_path: ReferencePath, roots: set[ReferencePath | ClassName]) -> None:
@@ -142,7 +145,8 @@ def update_schemas_with_data(
             )
         return prop
 
-    schemas = evolve(schemas, classes_by_reference={ref_path: prop, **schemas.classes_by_reference})
+    if ref_path not in schemas.classes_by_reference:
+        schemas = evolve(schemas, classes_by_reference=schemas.classes_by_reference.set(ref_path, prop))
     return schemas
 
 
@@ -150,8 +154,10 @@ def update_schemas_with_data(
 class Parameters:
     """Structure for containing all defined, shareable, and reusable parameters"""
 
-    classes_by_reference: dict[ReferencePath, Parameter] = field(factory=dict)
-    classes_by_name: dict[ClassName, Parameter] = field(factory=dict)
+    classes_by_reference: PersistentMap[ReferencePath, Parameter] = field(
+        factory=PersistentMap, converter=to_persistent_map
+    )
+    classes_by_name: PersistentMap[ClassName, Parameter] = field(factory=PersistentMap, converter=to_persistent_map)
     errors: list[ParseError] = field(factory=list)
 
 
@@ -179,7 +185,7 @@ def parameter_from_data(
         param_in=data.param_in,
     )
     parameters = evolve(
-        parameters, classes_by_name={**parameters.classes_by_name, ClassName(name, config.field_prefix): new_param}
+        parameters, classes_by_name=parameters.classes_by_name.set(ClassName(name, config.field_prefix), new_param)
     )
     return new_param, parameters
 
@@ -213,7 +219,8 @@ def update_parameters_with_data(
             )
         return param
 
-    parameters = evolve(parameters, classes_by_reference={ref_path: param, **parameters.classes_by_reference})
+    if ref_path not in parameters.classes_by_reference:
+        parameters = evolve(parameters, classes_by_reference=parameters.classes_by_reference.set(ref_path, param))
     return parameters
 
 
@@ -1,6 +1,6 @@
 __all__ = ["HTTPStatusPattern", "Response", "Responses", "response_from_data"]
 
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping
 from typing import TypedDict
 
 from attrs import define
@@ -175,7 +175,7 @@ def response_from_data(  # noqa: PLR0911
     status_code: HTTPStatusPattern,
     data: oai.Response | oai.Reference,
     schemas: Schemas,
-    responses: dict[str, oai.Response | oai.Reference],
+    responses: Mapping[str, oai.Response | oai.Reference],
     parent_name: str,
     config: Config,
 ) -> tuple[Response | ParseError, Schemas]:
@@ -0,0 +1,126 @@
+"""Selecting which operations of an OpenAPI document to generate, and which components they use
+
+Large documents often describe far more than any one client needs. Operations can be included or excluded by tag, path,
+or `operationId`, and then every component which none of the remaining operations reference (even indirectly) is left
+out, so it's neither parsed nor generated.
+"""
+
+__all__ = ["select_operations"]
+
+from collections.abc import Iterator
+from fnmatch import fnmatchcase
+from typing import Any
+
+from ..config import Config, OperationFilter
+
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+_COMPONENTS_PREFIX = "#/components/"
+# Components which are only used by name (rather than referenced), so they're always kept
+_UNREFERENCED_COMPONENTS = frozenset({"securitySchemes"})
+
+
+def select_operations(document: dict[str, Any], *, config: Config) -> dict[str, Any]:
+    """A copy of `document` with only the operations selected by `config`, and the components that those use.
+
+    An operation is kept if it matches `config.include` (when set) and doesn't match `config.exclude`. Components are
+    pruned whenever either is set, or `config.prune_components` is enabled. `document` itself is left unchanged, and
+    anything which isn't valid OpenAPI is kept as is, so it's reported when the document is validated.
+    """
+    filtering = config.include is not None or config.exclude is not None
+    paths = document.get("paths")
+    if filtering and isinstance(paths, dict):
+        document = {**document, "paths": _select_paths(paths, include=config.include, exclude=config.exclude)}
+    components = document.get("components")
+    if (filtering or config.prune_components) and isinstance(components, dict):
+        document = {**document, "components": _used_components(components, document.get("paths"))}
+    return document
+
+
+def _select_paths(
+    paths: dict[str, Any], *, include: OperationFilter | None, exclude: OperationFilter | None
+) -> dict[str, Any]:
+    selected = {}
+    for path, path_item in paths.items():
+        if not isinstance(path_item, dict):
+            selected[path] = path_item
+            continue
+        kept = {
+            key: value
+            for key, value in path_item.items()
+            if key not in _METHODS
+            or not isinstance(value, dict)
+            or (
+                (include is None or _matches(include, path, value))
+                and (exclude is None or not _matches(exclude, path, value))
+            )
+        }
+        if any(method in kept for method in _METHODS) or "$ref" in kept:
+            selected[path] = kept
+    return selected
+
+
+def _matches(operation_filter: OperationFilter, path: str, operation: dict[str, Any]) -> bool:
+    """Whether the `operation` at `path` has any of the tags, paths, or operation IDs in `operation_filter`"""
+    tags = operation.get("tags") or ["default"]
+    return (
+        any(tag in operation_filter.tags for tag in tags if isinstance(tag, str))
+        or any(fnmatchcase(path, pattern) for pattern in operation_filter.paths)
+        or operation.get("operationId") in operation_filter.operation_ids
+    )
+
+
+def _used_components(components: dict[str, Any], paths: Any) -> dict[str, Any]:
+    """Only the `components` which `paths` reference, or which are referenced by those (and so on)"""
+    used: set[tuple[str, str]] = set()
+    to_visit = list(_references(paths))
+    while to_visit:
+        kind, name = to_visit.pop()
+        if (kind, name) in used:
+            continue
+        used.add((kind, name))
+        values = components.get(kind)
+        if isinstance(values, dict) and name in values:
+            to_visit.extend(_references(values[name]))
+
+    pruned: dict[str, Any] = {}
+    for kind, values in components.items():
+        if kind in _UNREFERENCED_COMPONENTS or kind.startswith("x-") or not isinstance(values, dict):
+            pruned[kind] = values
+        else:
+            pruned[kind] = {name: value for name, value in values.items() if (kind, name) in used}
+    return pruned
+
+
+def _references(data: Any) -> Iterator[tuple[str, str]]:
+    """The kind and name of every component referenced anywhere in `data`"""
+    to_visit = [data]
+    while to_visit:
+        value = to_visit.pop()
+        if isinstance(value, list):
+            to_visit.extend(value)
+        elif isinstance(value, dict):
+            reference = value.get("$ref")
+            if isinstance(reference, str) and reference.startswith(_COMPONENTS_PREFIX):
+                yield _component(reference)
+            discriminator = value.get("discriminator")
+            mapping = discriminator.get("mapping") if isinstance(discriminator, dict) else None
+            if isinstance(mapping, dict):
+                yield from _mapped_schemas(mapping)
+            to_visit.extend(value.values())
+
+
+def _component(reference: str) -> tuple[str, str]:
+    """The kind and name of the component which `reference` (starting with `#/components/`) is to"""
+    kind, _, rest = reference.removeprefix(_COMPONENTS_PREFIX).partition("/")
+    return kind, rest.split("/", 1)[0].replace("~1", "/").replace("~0", "~")
+
+
+def _mapped_schemas(mapping: dict[str, Any]) -> Iterator[tuple[str, str]]:
+    """Every schema which a discriminator's `mapping` refers to, either by reference or by name"""
+    for target in mapping.values():
+        if not isinstance(target, str):
+            continue
+        if target.startswith(_COMPONENTS_PREFIX):
+            yield _component(target)
+        elif "/" not in target and "#" not in target:
+            yield "schemas", target
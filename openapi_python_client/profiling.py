@@ -0,0 +1,121 @@
+"""Measuring where the time and memory of a generation run goes
+
+Code which does a significant part of the work marks it with `phase` (for the steps of generation) or `item` (for each
+schema, endpoint, or template), which do nothing unless a run is being profiled with `profile`.
+"""
+
+__all__ = ["Profiler", "is_active", "item", "phase", "profile"]
+
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+_ACTIVE: ContextVar["Profiler | None"] = ContextVar("profiler", default=None)
+
+
+class Profiler:
+    """Collects the wall time and peak traced memory of each phase, and the time taken by each item within them.
+
+    Phases can be nested, in which case time and memory used by the inner phase don't count towards the outer one.
+    Entering a phase which was already entered before adds to its totals.
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._phases: dict[str, dict[str, float]] = {}
+        self._stack: list[str] = []
+        self._resumed = self._start
+        self._items: dict[str, dict[str, list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _pause(self) -> None:
+        """Add the time and memory used since the last phase change to the innermost phase"""
+        now = time.perf_counter()
+        if self._stack:
+            totals = self._phases[self._stack[-1]]
+            totals["seconds"] += now - self._resumed
+            if tracemalloc.is_tracing():
+                totals["peak_memory_bytes"] = max(totals["peak_memory_bytes"], tracemalloc.get_traced_memory()[1])
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._resumed = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._pause()
+        self._phases.setdefault(name, {"seconds": 0.0, "peak_memory_bytes": 0})
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._pause()
+            self._stack.pop()
+
+    @contextmanager
+    def item(self, kind: str, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:  # Items can be measured from multiple threads at once
+                self._items.setdefault(kind, {}).setdefault(name, []).append(seconds)
+
+    def report(self, *, top: int) -> dict[str, Any]:
+        """Everything measured so far, with the `top` slowest items of each kind"""
+        slowest: dict[str, list[dict[str, Any]]] = {}
+        for kind, items in self._items.items():
+            totals = sorted(((sum(times), name, len(times)) for name, times in items.items()), reverse=True)
+            slowest[kind] = [
+                {"name": name, "seconds": seconds, "count": count} for seconds, name, count in totals[:top]
+            ]
+        return {
+            "seconds": time.perf_counter() - self._start,
+            "peak_memory_bytes": max((phase["peak_memory_bytes"] for phase in self._phases.values()), default=0),
+            "phases": self._phases,
+            "slowest": slowest,
+        }
+
+
+def is_active() -> bool:
+    """Whether the current run is being profiled"""
+    return _ACTIVE.get() is not None
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+    """Measure everything until exiting as part of the phase `name`"""
+    profiler = _ACTIVE.get()
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def item(kind: str, name: str) -> AbstractContextManager[None]:
+    """Measure how long it takes to process `name`, a `kind` (like "schemas") of item"""
+    profiler = _ACTIVE.get()
+    return profiler.item(kind, name) if profiler is not None else nullcontext()
+
+
+@contextmanager
+def profile(report_path: Path, *, top: int) -> Iterator[Profiler]:
+    """Profile everything until exiting, then write a JSON report to `report_path`.
+
+    Memory is traced with `tracemalloc`, which makes everything a lot slower, so only relative times are meaningful.
+    """
+    profiler = Profiler()
+    token = _ACTIVE.set(profiler)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield profiler
+    finally:
+        report = profiler.report(top=top)
+        if started_tracing:
+            tracemalloc.stop()
+        _ACTIVE.reset(token)
+        report_path.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,116 @@
+"""Splitting a generated client into a package per tag (or group of tags), which can each be imported on their own
+
+Each shard is a subpackage of the generated package, holding the endpoints of its tags in `api/` and the models which
+only those endpoints use in `models/`. Models used by more than one shard (or by none) stay in the top-level `models/`,
+along with the client, types, and errors which every shard shares.
+
+Modules are rendered by the same templates as when the client isn't sharded, as if they were where they'd be then, and
+their relative imports are rewritten afterwards to point at where everything actually is.
+"""
+
+__all__ = ["Shard", "plan_shards", "relocate_imports"]
+
+import re
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+
+from .config import Config
+from .parser import GeneratorData
+from .parser.errors import GeneratorError
+from .utils import PythonIdentifier
+
+# Modules and packages at the top of a sharded package, which shards can't be named
+_RESERVED_NAMES = frozenset({"api", "client", "errors", "models", "types"})
+_MODEL_IMPORT = re.compile(r"from \.+models\.(\w+) import ")
+_RELATIVE_IMPORT = re.compile(r"^(?P<indent>[ \t]*)from (?P<dots>\.+)(?P<module>[\w.]*) import ", re.MULTILINE)
+
+
+@dataclass
+class Shard:
+    """A subpackage of a sharded client"""
+
+    name: PythonIdentifier
+    tags: list[PythonIdentifier]
+    models: set[str] = field(default_factory=set)
+    """The module names of the models (and enums) which only this shard uses"""
+
+
+def plan_shards(openapi: GeneratorData, config: Config) -> list[Shard] | GeneratorError:
+    """Decide which tags go into each shard, and which models are only used by one shard (so are generated in it)"""
+    group_by_tag = {
+        PythonIdentifier(value=tag, prefix="tag"): PythonIdentifier(value=group, prefix="shard")
+        for group, tags in config.shard_groups.items()
+        for tag in tags
+    }
+    shards: dict[str, Shard] = {}
+    for tag in openapi.endpoint_collections_by_tag:
+        name = group_by_tag.get(tag, tag)
+        shards.setdefault(name, Shard(name=name, tags=[])).tags.append(tag)
+    reserved = sorted(name for name in shards if name in _RESERVED_NAMES)
+    if reserved:
+        return GeneratorError(
+            header="Shards can't be named like the modules they share",
+            detail=f"Rename {', '.join(reserved)} with shard_groups, since {', '.join(sorted(_RESERVED_NAMES))} "
+            "are generated at the top of a sharded package.",
+        )
+
+    imports_by_model: dict[str, set[str]] = {
+        model.class_info.module_name: _imported_models([*(model.relative_imports or ()), *(model.lazy_imports or ())])
+        for model in openapi.models
+    }
+    used_by: dict[str, set[str]] = {}
+    for shard in shards.values():
+        imports = _imported_models(
+            relative_import
+            for tag in shard.tags
+            for endpoint in openapi.endpoint_collections_by_tag[tag].endpoints
+            for relative_import in endpoint.relative_imports
+        )
+        for model in _imported_closure(imports, imports_by_model):
+            used_by.setdefault(model, set()).add(shard.name)
+    # Models which no shard uses are generated in the shared package, so anything they import has to be as well
+    unused = [model for model in imports_by_model if model not in used_by]
+    shared = _imported_closure(unused, imports_by_model)
+    for model, users in used_by.items():
+        if len(users) == 1 and model not in shared:
+            shards[next(iter(users))].models.add(model)
+    return list(shards.values())
+
+
+def _imported_models(imports: Iterable[str]) -> set[str]:
+    return {match for relative_import in imports for match in _MODEL_IMPORT.findall(relative_import)}
+
+
+def _imported_closure(models: Iterable[str], imports_by_model: dict[str, set[str]]) -> set[str]:
+    """`models` and every model they import, directly or indirectly"""
+    closure: set[str] = set()
+    to_visit = list(models)
+    while to_visit:
+        model = to_visit.pop()
+        if model not in closure:
+            closure.add(model)
+            to_visit.extend(imports_by_model.get(model, ()))
+    return closure
+
+
+def relocate_imports(content: str, *, module: tuple[str, ...], shard: str, models: Collection[str]) -> str:
+    """Rewrite the relative imports of a module rendered as if it were `module` (within the package) for `shard`.
+
+    The module, everything in `api/`, and the models in `models` are moved into the shard, everything else stays where
+    it is. Imports of what's in the shard stay relative to the shard, like they were relative to the package before.
+    """
+    package = module[:-1]
+    new_package = (shard, *package)
+
+    def relocate(match: re.Match[str]) -> str:
+        level = len(match["dots"])
+        if level > len(package) + 1:
+            return match[0]
+        target = [*package[: len(package) - level + 1], *filter(None, match["module"].split("."))]
+        if target[:1] == ["api"] or (target[:1] == ["models"] and len(target) > 1 and target[1] in models):
+            dots = len(new_package)
+        else:
+            dots = len(new_package) + 1
+        return f"{match['indent']}from {'.' * dots}{'.'.join(target)} import "
+
+    return _RELATIVE_IMPORT.sub(relocate, content)
@@ -0,0 +1,440 @@
+"""Cleaning up the imports of generated modules without running external tools
+
+Templates import everything a module might need (and properties add imports of their own), which leaves unused,
+duplicated, and unsorted imports behind. Removing them with `ruff check --fix` is much slower than formatting, so this
+does the same for generated code before it is written: unused imports are removed, imports from the same module are
+merged, and each block of imports is sorted the way Ruff's isort rules (with their default settings) would sort it.
+
+Parsing generated modules (which can be huge) takes longer than running Ruff, so this searches them with regular
+expressions instead. That only covers the imports which templates write: each takes up a single line, imports a single
+module or members of one, and only has a comment when it's the only import in its statement. Anything else (like an
+import split across lines, or a comment on the line above one) is left alone for post hooks to take care of.
+"""
+
+__all__ = ["ruff_line_length", "tidy_imports"]
+
+import re
+import sys
+import tomllib
+from bisect import bisect_right
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+_DOTTED_NAME = r"[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*"
+_ALIASES = rf"{_DOTTED_NAME}(?: as [A-Za-z_]\w*)?(?:, {_DOTTED_NAME}(?: as [A-Za-z_]\w*)?)*"
+_IMPORT = re.compile(
+    rf"(?P<indent> *)(?:import (?P<name>{_DOTTED_NAME})|from (?P<module>\.*(?:{_DOTTED_NAME})?) import (?P<members>{_ALIASES}))"
+    r" *(?P<comment>#[^\n]*)?(?:\n|\Z)"
+)
+# Searching for line breaks is much faster than searching for the start of lines with `re.MULTILINE`
+_IMPORT_START = re.compile(r"\n *(?:import|from) ")
+_WRAPPED_IMPORT = re.compile(rf"^ *from \.*(?:{_DOTTED_NAME})? import \(", re.MULTILINE)
+_BLANK_LINES = re.compile(r"(?: *\n)*")
+_DEFINITION = re.compile(r"(?:async +)?def |class |@")
+_FUNCTION = re.compile(r" *(?:async +)?def ")
+_TRIPLE_QUOTES = re.compile("\"\"\"|'''")
+_SINGLE_LINE_STRING = re.compile(r""""(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'""")
+_NUMBERS = re.compile(r"(\d+)")
+_INDENT = " " * 4
+_DEFAULT_LINE_LENGTH = 88
+
+
+class _Section(IntEnum):
+    FUTURE = 0
+    STANDARD_LIBRARY = 1
+    THIRD_PARTY = 2
+    LOCAL_FOLDER = 3
+
+
+class _MemberType(IntEnum):
+    CONSTANT = 0
+    CLASS = 1
+    VARIABLE = 2
+
+
+@lru_cache(maxsize=4096)
+def _natural(value: str) -> tuple[str | int, ...]:
+    """Sort key comparing runs of digits by their value"""
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(_NUMBERS.split(value)))
+
+
+def _text_key(value: str) -> tuple[tuple[str | int, ...], tuple[str | int, ...]]:
+    return _natural(value.lower()), _natural(value)
+
+
+def _member_key(name: str, asname: str | None) -> tuple[object, ...]:
+    if len(name) > 1 and name.upper() == name and name.lower() != name:
+        member_type = _MemberType.CONSTANT
+    elif name[0].isupper():
+        member_type = _MemberType.CLASS
+    else:
+        member_type = _MemberType.VARIABLE
+    return member_type, _text_key(name), _natural(asname or "")
+
+
+def _section(module: str, level: int) -> _Section:
+    if level > 0:
+        return _Section.LOCAL_FOLDER
+    if module == "__future__":
+        return _Section.FUTURE
+    if module.split(".", maxsplit=1)[0] in sys.stdlib_module_names:
+        return _Section.STANDARD_LIBRARY
+    return _Section.THIRD_PARTY
+
+
+def ruff_line_length(directory: Path) -> int:
+    """The line length Ruff would use for files in `directory`, from the closest config file Ruff would find"""
+    for parent in [directory, *directory.parents]:
+        for name, table in ((".ruff.toml", ()), ("ruff.toml", ()), ("pyproject.toml", ("tool", "ruff"))):
+            try:
+                config: Any = tomllib.loads((parent / name).read_text())
+            except (OSError, tomllib.TOMLDecodeError):
+                continue
+            for key in table:
+                config = config.get(key)
+                if not isinstance(config, dict):
+                    break
+            else:
+                line_length = config.get("line-length", _DEFAULT_LINE_LENGTH)
+                return line_length if isinstance(line_length, int) else _DEFAULT_LINE_LENGTH
+    return _DEFAULT_LINE_LENGTH
+
+
+class _Code:
+    """Code which might use imported names"""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._uses: dict[str, bool] = {}
+
+    def __contains__(self, name: str) -> bool:
+        # Only a handful of names are imported, so searching for each of them is faster than finding every name
+        if name not in self._uses:
+            self._uses[name] = self._find(name)
+        return self._uses[name]
+
+    def _find(self, name: str) -> bool:
+        text = self.text
+        position = text.find(name)
+        while position != -1:
+            end = position + len(name)
+            if not _is_name_character(text[position - 1 : position], dot=True) and not _is_name_character(
+                text[end : end + 1]
+            ):
+                return True
+            position = text.find(name, position + 1)
+        return False
+
+
+def _is_name_character(character: str, *, dot: bool = False) -> bool:
+    return character.isalnum() or character == "_" or (dot and character == ".")
+
+
+def _is_used(name: str, asname: str | None, module: str | None, used: _Code) -> bool:
+    # `from module import name as name` is how a name is explicitly re-exported
+    binding = asname or name.split(".", maxsplit=1)[0]
+    return module == "__future__" or name == asname or binding in used
+
+
+@dataclass
+class _Import:
+    """A single import statement, as Ruff would write it"""
+
+    section: _Section
+    key: tuple[object, ...]
+    module: str
+    level: int
+    members: list[tuple[str, str | None]]  # Empty for straight imports (`import module`)
+    comment: str = ""
+
+    def lines(self, indent: str, line_length: int) -> list[str]:
+        """The lines of this import, without line endings"""
+        if not self.members:
+            return [f"{indent}import {self.module}"]
+        source = "." * self.level + self.module
+        names = [f"{name} as {asname}" if asname else name for name, asname in self.members]
+        comment = f"  {self.comment}" if self.comment else ""
+        line = f"{indent}from {source} import {', '.join(names)}{comment}"
+        if len(line) <= line_length:
+            return [line]
+        wrapped = [f"{indent}{_INDENT}{name}," for name in names]
+        wrapped[0] += comment
+        return [f"{indent}from {source} import (", *wrapped, f"{indent})"]
+
+
+def _straight_import(name: str) -> _Import:
+    return _Import(section=_section(name, 0), key=(0, 0, _text_key(name)), module=name, level=0, members=[])
+
+
+def _from_import(level: int, module: str, members: list[tuple[str, str | None]], comment: str = "") -> _Import:
+    members = sorted(members, key=lambda member: _member_key(*member))
+    return _Import(
+        section=_section(module, level),
+        key=(1, -level, _text_key(module), _member_key(*members[0])),
+        module=module,
+        level=level,
+        members=members,
+        comment=comment,
+    )
+
+
+def _sorted_imports(imports: list[_Import]) -> list[_Import]:
+    """What Ruff's isort rules would turn `imports` into: merged and sorted"""
+    straight: dict[str, _Import] = {}
+    from_members: dict[tuple[int, str], dict[tuple[str, str | None], None]] = {}
+    comments: dict[tuple[int, str], str] = {}
+    for import_ in imports:
+        if not import_.members:
+            straight.setdefault(import_.module, import_)
+            continue
+        from_members.setdefault((import_.level, import_.module), {}).update(dict.fromkeys(import_.members))
+        if import_.comment:
+            comments[(import_.level, import_.module)] = import_.comment
+    sorted_imports = list(straight.values())
+    for (level, module), members in from_members.items():
+        combined = [member for member in members if member[1] is None]
+        separate = [[member] for member in members if member[1] is not None]
+        comment = comments.get((level, module), "")
+        sorted_imports.extend(_from_import(level, module, group, comment) for group in [combined, *separate] if group)
+    sorted_imports.sort(key=lambda import_: (import_.section, import_.key))
+    return sorted_imports
+
+
+def _render(imports: list[_Import], indent: str, line_length: int) -> list[str]:
+    new_lines: list[str] = []
+    for i, import_ in enumerate(imports):
+        if i and import_.section != imports[i - 1].section:
+            new_lines.append("\n")
+        new_lines.extend(f"{line}\n" for line in import_.lines(indent, line_length))
+    return new_lines
+
+
+class _Source:
+    """A module, along with where its multi-line strings and import statements are"""
+
+    def __init__(self, text: str, strings: list[tuple[int, int]]) -> None:
+        self.text = text
+        self.strings = strings
+        self._string_starts = [start for start, _ in strings]
+        # With a line break in front, where each match starts in the new text is where its line starts in `text`
+        starts = (match.start() for match in _IMPORT_START.finditer(f"\n{text}"))
+        self.import_starts = {start for start in starts if not self.in_string(start)}
+        self.imports = [
+            match for start in sorted(self.import_starts) if (match := _IMPORT.match(text, start)) is not None
+        ]
+        # Names in imports and docstrings aren't uses of imports
+        self._excluded = sorted([*strings, *((match.start(), match.end()) for match in self.imports)])
+        self._excluded_starts = [start for start, _ in self._excluded]
+
+    @staticmethod
+    def parse(text: str) -> "_Source | None":
+        """Find the multi-line strings in `text`, or return `None` if they aren't all closed"""
+        strings: list[tuple[int, int]] = []
+        position = 0
+        while (quotes := _TRIPLE_QUOTES.search(text, position)) is not None:
+            line_start = max(text.rfind("\n", 0, quotes.start()) + 1, position)
+            before = _SINGLE_LINE_STRING.sub("", text[line_start : quotes.start()])
+            if "#" in before or '"' in before or "'" in before:
+                position = quotes.end()  # In a comment or a single-line string
+                continue
+            end = text.find(quotes.group(), quotes.end())
+            if end == -1:
+                return None
+            position = end + len(quotes.group())
+            strings.append((quotes.start(), position))
+        return _Source(text, strings)
+
+    def in_string(self, position: int) -> bool:
+        index = bisect_right(self._string_starts, position) - 1
+        return index >= 0 and position < self.strings[index][1]
+
+    def code(self, start: int, end: int) -> _Code:
+        """The code between `start` and `end`. Strings might be annotations, so names in them count as used."""
+        parts: list[str] = []
+        position = start
+        for excluded_start, excluded_end in self._excluded[max(bisect_right(self._excluded_starts, start) - 1, 0) :]:
+            if excluded_start >= end:
+                break
+            if excluded_end <= position:
+                continue
+            parts.append(self.text[position:excluded_start])
+            position = excluded_end
+        parts.append(self.text[position:end])
+        return _Code("\n".join(parts))
+
+    def line_at(self, position: int) -> tuple[int, int]:
+        """The start and end (after the line break) of the line that `position` is in"""
+        end = self.text.find("\n", position)
+        return self.text.rfind("\n", 0, position) + 1, len(self.text) if end == -1 else end + 1
+
+    def previous_line(self, position: int) -> tuple[int, int] | None:
+        """The closest line before the one starting at `position` which isn't blank or in a multi-line string"""
+        while position > 0:
+            start, end = self.line_at(position - 1)
+            if self.text[start:end].strip() and not self.in_string(start):
+                return start, end
+            position = start
+        return None
+
+    def next_line(self, position: int) -> tuple[int, int] | None:
+        """The closest line from `position` onwards which isn't blank or in a multi-line string"""
+        while position < len(self.text):
+            start, end = self.line_at(position)
+            if self.text[start:end].strip() and not self.in_string(start):
+                return start, end
+            position = end
+        return None
+
+
+def _indent(text: str) -> int:
+    return len(text) - len(text.lstrip(" "))
+
+
+def tidy_imports(source: str, *, line_length: int = _DEFAULT_LINE_LENGTH, keep_unused: bool = False) -> str:
+    """Remove unused imports from `source` and sort the rest of them.
+
+    With `keep_unused`, imports are only merged and sorted. Modules which re-export what they import (like `__init__.py`
+    modules without an `__all__`) need that, since re-exported names are never used in the module itself.
+    """
+    if _WRAPPED_IMPORT.search(source):
+        return source
+    parsed = _Source.parse(source)
+    if parsed is None:
+        return source
+    module_code: _Code | None = None
+    parts: list[str] = []
+    position = 0
+    imports = parsed.imports
+    index = 0
+    while index < len(imports):
+        block = [imports[index]]
+        index += 1
+        while (
+            index < len(imports)
+            and _BLANK_LINES.fullmatch(source, block[-1].end(), imports[index].start())
+            and imports[index]["indent"] == block[0]["indent"]
+        ):
+            block.append(imports[index])
+            index += 1
+        if block[0].start() < position or not _is_separate(parsed, block[0].start(), block[-1].end()):
+            continue
+
+        scope = _function_scope(parsed, block[0].start())
+        if scope is None:
+            if module_code is None:
+                module_code = parsed.code(0, len(source))
+            used = module_code
+        else:
+            used = parsed.code(*scope)
+        replacement, end = _tidy_block(parsed, block, used, line_length, keep_unused=keep_unused)
+        parts.extend((source[position : block[0].start()], replacement))
+        position = end
+    parts.append(source[position:])
+    return "".join(parts)
+
+
+def _is_separate(source: _Source, start: int, end: int) -> bool:
+    """Whether the block of imports from `start` to `end` has no comments or other imports right next to it"""
+    previous = source.previous_line(start)
+    if previous is not None and source.text[previous[0] : previous[1]].strip().startswith("#"):
+        return False
+    following = source.next_line(end)
+    if following is not None:
+        text = source.text[following[0] : following[1]].strip()
+        if text.startswith("#") or following[0] in source.import_starts:
+            return False
+    return True
+
+
+def _function_scope(source: _Source, position: int) -> tuple[int, int] | None:
+    """The start and end of the function that `position` is in, or `None` if it's not in a function"""
+    line = source.line_at(position)
+    indent = _indent(source.text[line[0] : line[1]])
+    while indent > 0 and (previous := source.previous_line(line[0])) is not None:
+        line = previous
+        text = source.text[line[0] : line[1]]
+        if _indent(text) >= indent:
+            continue
+        indent = _indent(text)
+        if _FUNCTION.match(text):
+            # The body ends at the first line indented no more than `def`, except for the end of its signature
+            end_of_body = re.compile(rf"\n {{0,{indent}}}[^ \n)]")
+            search_from = line[1] - 1
+            while (end := end_of_body.search(source.text, search_from)) is not None and source.in_string(end.start()):
+                search_from = end.end()
+            return line[0], len(source.text) if end is None else end.start() + 1
+    return None
+
+
+def _tidy_block(
+    source: _Source, block: list[re.Match[str]], used: _Code, line_length: int, *, keep_unused: bool
+) -> tuple[str, int]:
+    """What to replace the block of imports with, and where the replaced text ends"""
+    start, end = block[0].start(), block[-1].end()
+    imports = _parse_block(block)
+    if imports is None:
+        return source.text[start:end], end
+    indent = block[0]["indent"]
+
+    # Like Ruff, unused imports are removed before what's left is sorted
+    kept: list[_Import] = []
+    for import_ in imports:
+        if keep_unused:
+            kept.append(import_)
+        elif import_.members:
+            import_.members = [member for member in import_.members if _is_used(*member, import_.module, used)]
+            if import_.members:
+                kept.append(import_)
+        elif _is_used(import_.module, None, None, used):
+            kept.append(import_)
+    new_lines = _render(_sorted_imports(kept), indent, line_length)
+
+    previous = source.previous_line(start)
+    following = source.next_line(end)
+    is_whole_body = (
+        previous is not None
+        and _indent(source.text[previous[0] : previous[1]]) < len(indent)
+        and source.text[previous[0] : previous[1]].rstrip().endswith(":")
+        and (following is None or _indent(source.text[following[0] : following[1]]) < len(indent))
+    )
+    if not new_lines and is_whole_body:
+        new_lines = [f"{indent}pass\n"]
+    if new_lines and not indent and following is not None and not source.text[end : following[0]].strip():
+        # Ruff leaves two blank lines between imports and a definition, and one before anything else
+        new_lines.extend(["\n"] * (2 if _DEFINITION.match(source.text, following[0]) else 1))
+        end = following[0]
+    return "".join(new_lines), end
+
+
+def _parse_block(statements: list[re.Match[str]]) -> list[_Import] | None:
+    """Every import in a block of import statements, or `None` if its comments can't be kept with their imports"""
+    imports: list[_Import] = []
+    commented_modules: set[tuple[int, str]] = set()
+    modules: set[tuple[int, str]] = set()
+    for statement in statements:
+        comment = statement["comment"] or ""
+        if statement["name"] is not None:
+            if comment:
+                return None
+            imports.append(_straight_import(statement["name"]))
+            continue
+        source = statement["module"]
+        module_name = source.lstrip(".")
+        level = len(source) - len(module_name)
+        members = [_alias(member) for member in statement["members"].split(", ")]
+        module = (level, module_name)
+        if (comment and len(members) > 1) or module in commented_modules or (comment and module in modules):
+            return None  # Comments would have to be moved around when merging statements
+        if comment:
+            commented_modules.add(module)
+        modules.add(module)
+        imports.append(_from_import(level, module_name, members, comment))
+    return imports
+
+
+def _alias(text: str) -> tuple[str, str | None]:
+    name, _, asname = text.partition(" as ")
+    return name, asname or None
@@ -3,57 +3,89 @@ from __future__ import annotations
 import builtins
 import re
 from email.message import Message
+from functools import lru_cache
 from keyword import iskeyword
-from typing import Any
+from typing import Any, NamedTuple
 
 from .config import Config
 
 DELIMITERS = r"\. _-"
 
+_NON_WORD = re.compile(rf"[^\w{DELIMITERS}]+")
+_CAPITALIZED_WORD = re.compile("([A-Z]?[a-z]+)")
+_WORD = re.compile(rf"[^{DELIMITERS}]+")
+
+# The same names are transformed over and over (e.g., every time a property with that name is found), so the results
+# of these pure functions are cached. The bound keeps memory in check for huge documents.
+_NAMING_CACHE_SIZE = 16384
+
 
 class PythonIdentifier(str):
     """A snake_case string which has been validated / transformed into a valid identifier for Python"""
 
     def __new__(cls, value: str, prefix: str, skip_snake_case: bool = False) -> PythonIdentifier:
-        new_value = sanitize(value)
-        if not skip_snake_case:
-            new_value = snake_case(new_value)
-        new_value = fix_reserved_words(new_value)
-
-        if not new_value.isidentifier() or value.startswith("_"):
-            new_value = f"{prefix}{new_value}"
-        return str.__new__(cls, new_value)
+        return str.__new__(cls, _python_identifier(value, prefix, skip_snake_case))
 
     def __deepcopy__(self, _: Any) -> PythonIdentifier:
         return self
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The value is already transformed, so restore it as-is instead of passing it through `__new__` again
+        return str.__new__, (type(self), str(self))
+
 
 class ClassName(str):
     """A PascalCase string which has been validated / transformed into a valid class name for Python"""
 
     def __new__(cls, value: str, prefix: str) -> ClassName:
-        new_value = fix_reserved_words(pascal_case(sanitize(value)))
-
-        if not new_value.isidentifier():
-            value = f"{prefix}{new_value}"
-            new_value = fix_reserved_words(pascal_case(sanitize(value)))
-        return str.__new__(cls, new_value)
+        return str.__new__(cls, _class_name(value, prefix))
 
     def __deepcopy__(self, _: Any) -> ClassName:
         return self
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return str.__new__, (type(self), str(self))
+
+
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
+def _python_identifier(value: str, prefix: str, skip_snake_case: bool) -> str:
+    new_value = sanitize(value)
+    if not skip_snake_case:
+        new_value = snake_case(new_value)
+    new_value = fix_reserved_words(new_value)
+
+    if not new_value.isidentifier() or value.startswith("_"):
+        new_value = f"{prefix}{new_value}"
+    return new_value
+
+
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
+def _class_name(value: str, prefix: str) -> str:
+    new_value = fix_reserved_words(pascal_case(sanitize(value)))
+
+    if not new_value.isidentifier():
+        value = f"{prefix}{new_value}"
+        new_value = fix_reserved_words(pascal_case(sanitize(value)))
+    return new_value
+
 
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
 def sanitize(value: str) -> str:
     """Removes every character that isn't 0-9, A-Z, a-z, or a known delimiter"""
-    return re.sub(rf"[^\w{DELIMITERS}]+", "", value)
+    return _NON_WORD.sub("", value)
 
 
 def split_words(value: str) -> list[str]:
     """Split a string on words and known delimiters"""
+    return list(_split_words(value))
+
+
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
+def _split_words(value: str) -> tuple[str, ...]:
     # We can't guess words if there is no capital letter
     if any(c.isupper() for c in value):
-        value = " ".join(re.split("([A-Z]?[a-z]+)", value))
-    return re.findall(rf"[^{DELIMITERS}]+", value)
+        value = " ".join(_CAPITALIZED_WORD.split(value))
+    return tuple(_WORD.findall(value))
 
 
 RESERVED_WORDS = (set(dir(builtins)) | {"self", "true", "false", "datetime"}) - {
@@ -76,25 +108,59 @@ def fix_reserved_words(value: str) -> str:
     return value
 
 
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
 def snake_case(value: str) -> str:
     """Converts to snake_case"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     return "_".join(words).lower()
 
 
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
 def pascal_case(value: str) -> str:
     """Converts to PascalCase"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     capitalized_words = (word.capitalize() if not word.isupper() else word for word in words)
     return "".join(capitalized_words)
 
 
+@lru_cache(maxsize=_NAMING_CACHE_SIZE)
 def kebab_case(value: str) -> str:
     """Converts to kebab-case"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     return "-".join(words).lower()
 
 
+_NAMING_FUNCTIONS = {
+    "PythonIdentifier": _python_identifier,
+    "ClassName": _class_name,
+    "sanitize": sanitize,
+    "split_words": _split_words,
+    "snake_case": snake_case,
+    "pascal_case": pascal_case,
+    "kebab_case": kebab_case,
+}
+
+
+class NamingCacheInfo(NamedTuple):
+    """How well the cache of a naming function is being used"""
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def naming_cache_info() -> dict[str, NamingCacheInfo]:
+    """Get the hits, misses, and size of the cache for each naming function, for profiling"""
+    return {name: NamingCacheInfo(*function.cache_info()) for name, function in _NAMING_FUNCTIONS.items()}
+
+
+def clear_naming_caches() -> None:
+    """Empty the caches of every naming function"""
+    for function in _NAMING_FUNCTIONS.values():
+        function.cache_clear()
+
+
 def remove_string_escapes(value: str) -> str:
     """Used when parsing string-literal defaults to prevent escaping the string to write arbitrary Python
 
@@ -0,0 +1,138 @@
+"""Regenerating a client every time its OpenAPI document or custom templates change"""
+
+__all__ = ["Watcher"]
+
+import hashlib
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from jinja2 import Environment
+
+from . import Project, _get_document_bytes, _parse_document
+from .config import Config
+from .parser import GeneratorData
+from .parser.errors import GeneratorError
+
+_Snapshot = dict[Path, tuple[int, int]]
+
+
+class Watcher:
+    """Generates a client from a local document, keeping what it can between generations.
+
+    The parsed document is only parsed again when the document (or one it references) actually changed, and the
+    template `Environment` is reused so that only templates which changed are compiled again. Files are only rewritten
+    if their content changed, so post hooks using `{files}` only process those.
+    """
+
+    def __init__(self, *, config: Config, custom_template_path: Path | None = None) -> None:
+        if not isinstance(config.document_source, Path):
+            raise ValueError("Only documents read from a path can be watched")
+        self.config = config
+        self.custom_template_path = custom_template_path
+        self.openapi: GeneratorData | GeneratorError | None = None
+        self._document_hash: str | None = None
+        self._referenced_paths: list[Path] = []
+        self._env: Environment | None = None
+        self._templates: set[Path] = set()
+        self._snapshot: _Snapshot = {}
+
+    @property
+    def watched_paths(self) -> list[Path]:
+        """The document, the local documents it references, and every custom template"""
+        assert isinstance(self.config.document_source, Path)
+        return [self.config.document_source, *self._referenced_paths, *sorted(self._templates)]
+
+    def generate(self) -> Sequence[GeneratorError]:
+        """Generate the client, parsing the document again only if it changed since the last generation"""
+        templates = self._find_templates()
+        if templates != self._templates and self._env is not None and self._env.cache is not None:
+            # A new template may override a default one which was already compiled, so compile everything again
+            self._env.cache.clear()
+        self._templates = templates
+        openapi = self._parse()
+        # Changes made from here on are picked up by the next generation
+        self._snapshot = self._take_snapshot()
+        if isinstance(openapi, GeneratorError):
+            return [openapi]
+        project = Project(
+            openapi=openapi, config=self.config, custom_template_path=self.custom_template_path, env=self._env
+        )
+        self._env = project.env
+        return project.build()
+
+    def wait_for_changes(self, *, interval: float = 0.5) -> None:
+        """Block until any of the watched files changes, checking every `interval` seconds.
+
+        Editors often save a file in several steps, so this only returns once the files stopped changing.
+        """
+        while True:
+            time.sleep(interval)
+            snapshot = self._take_snapshot()
+            if snapshot == self._snapshot:
+                continue
+            while True:
+                time.sleep(interval)
+                settled = self._take_snapshot()
+                if settled == snapshot:
+                    return
+                snapshot = settled
+
+    def _parse(self) -> GeneratorData | GeneratorError:
+        assert isinstance(self.config.document_source, Path)
+        try:
+            document = _get_document_bytes(source=self.config.document_source, timeout=self.config.http_timeout)
+        except OSError as err:
+            return GeneratorError(header="Could not read OpenAPI document", detail=str(err))
+        if isinstance(document, GeneratorError):
+            return document
+        content = document[0]
+        if self.openapi is not None and self._hash(content, self._read_referenced()) == self._document_hash:
+            return self.openapi
+
+        referenced: dict[str, bytes] = {}
+        self.openapi = _parse_document(*document, config=self.config, referenced=referenced)
+        local = {path: referenced[uri] for uri in referenced if (path := _local_path(uri)) is not None}
+        self._referenced_paths = sorted(local)
+        self._document_hash = self._hash(content, local)
+        return self.openapi
+
+    def _read_referenced(self) -> dict[Path, bytes]:
+        referenced = {}
+        for path in self._referenced_paths:
+            try:
+                referenced[path] = path.read_bytes()
+            except OSError:
+                continue
+        return referenced
+
+    @staticmethod
+    def _hash(document: bytes, referenced: dict[Path, bytes]) -> str:
+        digest = hashlib.sha256(document)
+        for path, content in sorted(referenced.items()):
+            digest.update(str(path).encode())
+            digest.update(content)
+        return digest.hexdigest()
+
+    def _find_templates(self) -> set[Path]:
+        if self.custom_template_path is None:
+            return set()
+        return {path for path in self.custom_template_path.rglob("*") if path.is_file()}
+
+    def _take_snapshot(self) -> _Snapshot:
+        """The modification time and size of each watched file, including templates added since the last generation"""
+        snapshot: _Snapshot = {}
+        for path in {*self.watched_paths, *self._find_templates()}:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+def _local_path(uri: str) -> Path | None:
+    parsed = urlparse(uri)
+    return Path(url2pathname(parsed.path)) if parsed.scheme == "file" else None
@@ -0,0 +1,175 @@
+"""Writing generated files to disk without touching the ones that haven't changed"""
+
+__all__ = ["MANIFEST_NAME", "OutputWriter", "WriteSummary"]
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+MANIFEST_NAME = ".openapi-python-client.json"
+_MANIFEST_VERSION = 1
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class WriteSummary:
+    """The files that were touched by an `OutputWriter`, relative to its root"""
+
+    added: list[Path] = field(default_factory=list)
+    changed: list[Path] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.added)} files added, {len(self.changed)} changed, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged"
+        )
+
+
+class OutputWriter:
+    """Writes generated files under `root`, skipping any file whose content would not change.
+
+    Post hooks (like `ruff format`) rewrite files after they are generated, so comparing freshly rendered content with
+    what is on disk isn't enough to detect an unchanged file. A manifest stored at `manifest_path` (if there's anywhere
+    to keep one) records, for every generated file, the hash of the rendered content and the hash of the file as it was
+    left after post hooks ran. A file is skipped if it is byte-identical to the rendered content or if both hashes match
+    the previous run.
+
+    The manifest also records the `sources` each file was generated from and the `inputs` of the whole run, so that the
+    next run can `keep` the files whose sources didn't change without generating them again.
+    """
+
+    def __init__(self, *, root: Path, encoding: str, manifest_path: Path | None) -> None:
+        self.root = root
+        self.manifest_path = manifest_path
+        self.encoding = encoding
+        self.summary = WriteSummary()
+        manifest = self._load_manifest()
+        files = manifest.get("files")
+        self._previous: dict[str, dict[str, Any]] = files if isinstance(files, dict) else {}
+        inputs = manifest.get("inputs")
+        self.previous_inputs: dict[str, Any] = inputs if isinstance(inputs, dict) else {}
+        self.inputs: dict[str, Any] = {}
+        self._current: dict[str, dict[str, Any]] = {}
+
+    def _load_manifest(self) -> dict[str, Any]:
+        if self.manifest_path is None:
+            return {}
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def write(self, path: Path, content: str, *, sources: Collection[str] | None = None) -> None:
+        """Write `content` to `path` unless the file already holds the same generated content.
+
+        `sources` are the inputs `content` was generated from, if it can be kept by a later run while they're unchanged.
+        """
+        data = content.replace("\n", os.linesep).encode(self.encoding)
+        rendered_hash = _hash(data)
+        key = self._key(path)
+        try:
+            existing = path.read_bytes()
+        except FileNotFoundError:
+            existing = None
+
+        if existing is not None:
+            existing_hash = _hash(existing)
+            previous = self._previous.get(key, {})
+            if existing == data or (
+                previous.get("rendered") == rendered_hash and previous.get("written") == existing_hash
+            ):
+                self._current[key] = {"rendered": rendered_hash, "written": existing_hash}
+                if sources is not None:
+                    self._current[key]["sources"] = sorted(sources)
+                self.summary.unchanged += 1
+                return
+            self.summary.changed.append(path.relative_to(self.root))
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.summary.added.append(path.relative_to(self.root))
+
+        path.write_bytes(data)
+        self._current[key] = {"rendered": rendered_hash, "written": rendered_hash}
+        if sources is not None:
+            self._current[key]["sources"] = sorted(sources)
+
+    def previous_sources(self, path: Path) -> list[str] | None:
+        """The `sources` of the file at `path` when it was written by the previous run, if they were recorded"""
+        sources = self._previous.get(self._key(path), {}).get("sources")
+        return sources if isinstance(sources, list) else None
+
+    def previous_directories(self, directory: Path) -> set[Path]:
+        """The directories directly within `directory` which the previous run wrote any files into"""
+        prefix = f"{self._key(directory)}/" if directory != self.root else ""
+        return {
+            directory / key.removeprefix(prefix).split("/", 1)[0]
+            for key in self._previous
+            if key.startswith(prefix) and "/" in key.removeprefix(prefix)
+        }
+
+    def keep(self, path: Path) -> bool:
+        """Keep the file at `path` as the previous run left it, if it hasn't been modified since.
+
+        Returns whether the file was kept. If it wasn't, it has to be written again.
+        """
+        key = self._key(path)
+        previous = self._previous.get(key)
+        try:
+            if previous is None or _hash(path.read_bytes()) != previous.get("written"):
+                return False
+        except FileNotFoundError:
+            return False
+        self._current[key] = previous
+        self.summary.unchanged += 1
+        return True
+
+    def remove_stale(self, directory: Path) -> None:
+        """Delete every file in `directory` which was not written during this run, and every directory left empty.
+
+        `__pycache__` directories are left alone so that bytecode for unchanged modules stays valid, unless nothing else
+        is left in the directory containing them.
+        """
+        if not directory.exists():
+            return
+        for path in [*sorted(directory.rglob("*"), reverse=True), directory]:
+            if "__pycache__" in path.relative_to(directory).parts:
+                continue
+            if path.is_dir():
+                children = list(path.iterdir())
+                if all(child.name == "__pycache__" for child in children):
+                    for child in children:
+                        shutil.rmtree(child)
+                    path.rmdir()
+            elif self._key(path) not in self._current:
+                path.unlink()
+                self.summary.removed.append(path.relative_to(self.root))
+
+    def save_manifest(self) -> None:
+        """Record what was generated, including the effect of post hooks on the files that were just written"""
+        if self.manifest_path is None:
+            return
+        for relative_path in [*self.summary.added, *self.summary.changed]:
+            path = self.root / relative_path
+            if path.exists():
+                self._current[self._key(path)]["written"] = _hash(path.read_bytes())
+        manifest: dict[str, Any] = {"version": _MANIFEST_VERSION, "files": dict(sorted(self._current.items()))}
+        if self.inputs:
+            manifest["inputs"] = self.inputs
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
@@ -1,9 +1,24 @@
-from unittest.mock import MagicMock
+import threading
+from filecmp import dircmp
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 import pytest
+from attrs import evolve
 
-from openapi_python_client import Config, ErrorLevel, Project
-from openapi_python_client.config import ConfigFile
+from openapi_python_client import (
+    Config,
+    ErrorLevel,
+    GeneratorData,
+    GeneratorError,
+    Project,
+    _load_yaml_or_json,
+    _parse_document,
+    _quote_arguments,
+)
+from openapi_python_client.config import ConfigFile, MetaType, PostHookGroup
+from openapi_python_client.writer import MANIFEST_NAME
 
 default_http_timeout = ConfigFile.model_json_schema()["properties"]["http_timeout"]["default"]
 
@@ -60,3 +75,417 @@ class TestProject:
         assert error.level == ErrorLevel.ERROR
         assert error.header == "python3 failed"
         assert "some exception" in error.detail
+
+    def test__run_post_hooks_only_passes_written_python_files(self, project_with_dir: Project) -> None:
+        summary = project_with_dir.writer.summary
+        summary.added = [Path("new.py"), Path("README.md")]
+        summary.changed = [Path("api/changed.py")]
+        summary.unchanged = 10
+        project_with_dir.config.post_hooks = ['python3 -c "import sys; print(sys.argv[1:])" {files} > hook.txt']
+
+        project_with_dir._run_post_hooks()
+
+        hook_output = project_with_dir.project_dir / "hook.txt"
+        assert hook_output.read_text().strip() == "['new.py', 'api/changed.py']"
+        hook_output.unlink()
+        assert project_with_dir.errors == []
+        assert list(project_with_dir.post_hook_seconds) == project_with_dir.config.post_hooks
+
+    def test__run_post_hooks_quotes_files_for_the_shell(self, project_with_dir: Project) -> None:
+        summary = project_with_dir.writer.summary
+        summary.added = [Path("it's new.py"), Path("$HOME.py")]
+        summary.unchanged = 10
+        project_with_dir.config.post_hooks = ['python3 -c "import sys; print(sys.argv[1:])" {files} > hook.txt']
+
+        project_with_dir._run_post_hooks()
+
+        hook_output = project_with_dir.project_dir / "hook.txt"
+        assert hook_output.read_text().strip() == repr(["it's new.py", "$HOME.py"])
+        hook_output.unlink()
+        assert project_with_dir.errors == []
+
+    def test__run_post_hooks_passes_files_as_arguments_without_a_shell(self, project_with_dir: Project) -> None:
+        summary = project_with_dir.writer.summary
+        summary.added = [Path("it's new.py"), Path("a b.py")]
+        summary.unchanged = 10
+        hook = [
+            "python3",
+            "-c",
+            "import pathlib, sys; pathlib.Path('hook.txt').write_text(repr(sys.argv[1:]))",
+            "{files}",
+        ]
+        project_with_dir.config.post_hooks = [hook]
+
+        project_with_dir._run_post_hooks()
+
+        hook_output = project_with_dir.project_dir / "hook.txt"
+        assert hook_output.read_text() == repr(["it's new.py", "a b.py"])
+        hook_output.unlink()
+        assert project_with_dir.errors == []
+        assert list(project_with_dir.post_hook_seconds) == [" ".join(hook)]
+
+    def test__run_post_hooks_skips_file_hooks_given_as_arguments_when_nothing_was_written(
+        self, project_with_dir: Project
+    ) -> None:
+        project_with_dir.writer.summary.unchanged = 10
+        project_with_dir.config.post_hooks = [["blahblahdoesntexist", "{files}"]]
+
+        project_with_dir._run_post_hooks()
+
+        assert project_with_dir.errors == []
+        assert project_with_dir.post_hook_seconds == {}
+
+    def test__quote_arguments_for_windows(self, mocker) -> None:
+        mocker.patch("os.name", "nt")
+
+        assert _quote_arguments(["a b.py", "c.py"]) == '"a b.py" c.py'
+
+    def test__run_post_hooks_passes_whole_project_when_every_file_was_written(self, project_with_dir: Project) -> None:
+        project_with_dir.writer.summary.added = [Path("new.py")]
+
+        assert project_with_dir._post_hook_files() == ["."]
+
+    def test__run_post_hooks_skips_file_hooks_when_nothing_was_written(self, project_with_dir: Project) -> None:
+        project_with_dir.writer.summary.unchanged = 10
+        project_with_dir.config.post_hooks = ["blahblahdoesntexist {files}"]
+
+        project_with_dir._run_post_hooks()
+
+        assert project_with_dir.errors == []
+        assert project_with_dir.post_hook_seconds == {}
+
+    def test__run_post_hooks_runs_groups_concurrently(self, project_with_dir: Project, tmp_path: Path) -> None:
+        # Each command waits for the other to start, so they only succeed if they run at the same time
+        script = tmp_path / "wait_for.py"
+        script.write_text(
+            "import pathlib, sys, time\n"
+            "pathlib.Path(sys.argv[1]).touch()\n"
+            "deadline = time.monotonic() + 10\n"
+            "while not pathlib.Path(sys.argv[2]).exists():\n"
+            "    assert time.monotonic() < deadline\n"
+            "    time.sleep(0.01)\n"
+        )
+        project_with_dir.config.post_hooks = [
+            PostHookGroup(concurrently=[f"python3 {script} a b", ["python3", str(script), "b", "a"]])
+        ]
+
+        project_with_dir._run_post_hooks()
+
+        for name in ("a", "b"):
+            (project_with_dir.project_dir / name).unlink()
+        assert project_with_dir.errors == []
+        assert len(project_with_dir.post_hook_seconds) == 2
+
+    @pytest.mark.parametrize("workers", (1, 4))
+    def test__render_modules_writes_every_job(self, config, tmp_path, mocker, workers) -> None:
+        mocker.patch("os.cpu_count", return_value=4)
+        project = make_project(evolve(config, workers=workers, output_path=tmp_path))
+        template = project.env.from_string("{{ value }}\n")
+        jobs = [(tmp_path / f"module_{i}.py", template, {"value": i}, None) for i in range(20)]
+
+        project._render_modules(jobs)
+
+        assert [path.read_text() for path, _, _, _ in jobs] == [f"{i}\n" for i in range(20)]
+
+    def test__render_modules_takes_jobs_a_chunk_at_a_time(self, config, tmp_path, mocker) -> None:
+        mocker.patch("os.cpu_count", return_value=2)
+        mocker.patch("openapi_python_client._RENDER_CHUNK_SIZE", 4)
+        project = make_project(evolve(config, workers=2, output_path=tmp_path))
+        template = project.env.from_string("{{ value }}\n")
+        paths = [tmp_path / f"module_{i}.py" for i in range(20)]
+
+        def jobs():
+            for i, path in enumerate(paths):
+                # Only one chunk of jobs is rendered ahead of what's been written
+                assert i < 4 or paths[i - 4].exists()
+                yield path, template, {"value": i}, None
+
+        project._render_modules(jobs())
+
+        assert [path.read_text() for path in paths] == [f"{i}\n" for i in range(20)]
+
+    @pytest.mark.parametrize(
+        "platform, cpus, other_thread", [("linux", 1, False), ("darwin", 4, False), ("linux", 4, True)]
+    )
+    def test__render_modules_in_this_process_unless_forking_is_safe(
+        self, config, tmp_path, mocker, platform, cpus, other_thread
+    ) -> None:
+        mocker.patch("os.cpu_count", return_value=cpus)
+        mocker.patch("sys.platform", platform)
+        executor = mocker.patch("openapi_python_client.ProcessPoolExecutor")
+        project = make_project(evolve(config, workers=4, output_path=tmp_path))
+        template = project.env.from_string("{{ value }}\n")
+        stop = threading.Event()
+        if other_thread:
+            threading.Thread(target=stop.wait).start()
+
+        try:
+            project._render_modules([(tmp_path / f"module_{i}.py", template, {"value": i}, None) for i in range(4)])
+        finally:
+            stop.set()
+
+        executor.assert_not_called()
+        assert (tmp_path / "module_3.py").read_text() == "3\n"
+
+    def test_streaming_cannot_be_sharded(self, config, tmp_path) -> None:
+        config = evolve(config, streaming=True, shard_by_tag=True, output_path=tmp_path / "client")
+        openapi = GeneratorData.from_dict(
+            {"openapi": "3.1.0", "info": {"title": "API", "version": "1"}, "paths": {}}, config=config
+        )
+        assert isinstance(openapi, GeneratorData)
+
+        (error,) = Project(openapi=openapi, config=config).build()
+
+        assert error.header == "streaming can't be used with shard_by_tag"
+
+    def test__tidy_is_off_by_default(self, config) -> None:
+        content = "import os\nimport sys\n\nprint(sys.argv)\n"
+
+        assert make_project(config)._tidy(Path("module.py"), content) == content
+
+    def test__tidy_keeps_imports_of_init_modules(self, config) -> None:
+        project = make_project(evolve(config, tidy_imports=True))
+        content = "from .client import Client\nimport os\n"
+
+        assert project._tidy(Path("module.py"), content) == ""
+        assert project._tidy(Path("__init__.py"), content) == "import os\n\nfrom .client import Client\n"
+
+    def test_property_templates_are_loaded_once(self, config, mocker) -> None:
+        project = make_project(config)
+        get_template = mocker.spy(project.env, "get_template")
+        property_templates = project.env.globals["property_templates"]
+
+        first = property_templates["int_property.py.jinja"]
+        second = property_templates["int_property.py.jinja"]
+
+        assert first is second
+        get_template.assert_called_once_with("property_templates/int_property.py.jinja")
+
+
+class TestLoadYamlOrJson:
+    @pytest.mark.parametrize("content_type", ["application/json", None, "application/yaml"])
+    def test_json(self, content_type) -> None:
+        assert _load_yaml_or_json(b'\n  {"openapi": "3.1.0", "big": 123456789012345678901234567890}', content_type) == {
+            "openapi": "3.1.0",
+            "big": 123456789012345678901234567890,
+        }
+
+    def test_yaml_which_looks_like_json(self) -> None:
+        assert _load_yaml_or_json(b"{openapi: 3.1.0}", None) == {"openapi": "3.1.0"}
+
+    def test_yaml(self) -> None:
+        assert _load_yaml_or_json(b"openapi: 3.1.0\ninfo:\n  title: API\n", None) == {
+            "openapi": "3.1.0",
+            "info": {"title": "API"},
+        }
+
+    def test_invalid_json(self) -> None:
+        result = _load_yaml_or_json(b"{openapi: 3.1.0}", "application/json")
+
+        assert isinstance(result, GeneratorError)
+        assert result.header.startswith("Invalid JSON")
+
+    def test_invalid_yaml(self) -> None:
+        result = _load_yaml_or_json(b"{openapi: [}", None)
+
+        assert isinstance(result, GeneratorError)
+        assert result.header.startswith("Invalid YAML")
+
+    def test_slow_loads_are_reported(self, config, mocker, capsys) -> None:
+        mocker.patch("openapi_python_client._REPORT_LOAD_SECONDS", 0)
+
+        _parse_document(
+            b'{"openapi": "3.1.0", "info": {"title": "API", "version": "1"}, "paths": {}}', None, config=config
+        )
+
+        assert "Loaded OpenAPI document" in capsys.readouterr().out
+
+
+class TestParseDocument:
+    DOCUMENT = (
+        b'{"openapi": "3.1.0", "info": {"title": "API", "version": "1"}, "paths": {}, '
+        b'"components": {"schemas": {"Pet": {"$ref": "models.json#/Pet"}}}}'
+    )
+
+    def test_references_to_other_documents(self, config, tmp_path) -> None:
+        (tmp_path / "models.json").write_text('{"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}}')
+
+        openapi = _parse_document(self.DOCUMENT, None, config=evolve(config, document_source=tmp_path / "api.json"))
+
+        assert isinstance(openapi, GeneratorData)
+        assert [model.class_info.name for model in openapi.models] == ["Pet"]
+
+    def test_referenced_documents_are_part_of_the_cache_key(self, config, tmp_path) -> None:
+        models = tmp_path / "models.json"
+        models.write_text('{"Pet": {"type": "object"}}')
+        config = evolve(config, document_source=tmp_path / "api.json", cache_dir=tmp_path / "cache")
+        first = _parse_document(self.DOCUMENT, None, config=config)
+
+        models.write_text('{"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}}')
+        second = _parse_document(self.DOCUMENT, None, config=config)
+
+        assert isinstance(first, GeneratorData)
+        assert isinstance(second, GeneratorData)
+        assert [len(model.optional_properties or []) for model in second.models] == [1]
+
+    def test_unloadable_references(self, config, tmp_path) -> None:
+        result = _parse_document(self.DOCUMENT, None, config=evolve(config, document_source=tmp_path / "api.json"))
+
+        assert isinstance(result, GeneratorError)
+        assert result.header == f"Could not load referenced document {(tmp_path / 'models.json').as_uri()}"
+
+
+def _different_files(compared: dircmp) -> list[str]:
+    different = [*compared.diff_files, *compared.left_only, *compared.right_only]
+    for subdirectory in compared.subdirs.values():
+        different.extend(_different_files(subdirectory))
+    return different
+
+
+class TestPartialRegeneration:
+    @staticmethod
+    def _document(pet_name_type: str) -> dict[str, Any]:
+        return {
+            "openapi": "3.1.0",
+            "info": {"title": "API", "version": "1"},
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "operationId": "getPets",
+                        "responses": {
+                            "200": {
+                                "description": "OK",
+                                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+                            }
+                        },
+                    }
+                },
+                "/owners": {"get": {"operationId": "getOwners", "responses": {"204": {"description": "None"}}}},
+            },
+            "components": {
+                "schemas": {
+                    "Pet": {"type": "object", "properties": {"name": {"type": pet_name_type}}},
+                    "Owner": {"type": "object", "properties": {"pet": {"$ref": "#/components/schemas/Pet"}}},
+                    "Unrelated": {"type": "object", "properties": {"tag": {"type": "object"}}},
+                }
+            },
+        }
+
+    def _generate(
+        self, config: Config, output_path: Path, document: dict[str, Any], custom_template_path: Path | None = None
+    ) -> list[str]:
+        """Generate a client into `output_path`, returning the name of each module which was rendered"""
+        rendered: list[str] = []
+        original_render = Project._render
+
+        def render(project: Project, job: Any) -> str:
+            rendered.append(job[0].name)
+            return original_render(project, job)
+
+        openapi = GeneratorData.from_dict(document, config=config)
+        assert isinstance(openapi, GeneratorData)
+        project = Project(
+            openapi=openapi,
+            config=evolve(config, output_path=output_path, overwrite=True),
+            custom_template_path=custom_template_path,
+        )
+        with patch.object(Project, "_render", render):
+            assert project.build() == []
+        return sorted(rendered)
+
+    @pytest.mark.parametrize("streaming", (False, True))
+    def test_only_affected_modules_are_rendered(self, config, tmp_path, streaming) -> None:
+        config = evolve(config, post_hooks=[], streaming=streaming)
+        self._generate(config, tmp_path / "client", self._document("string"))
+
+        rendered = self._generate(config, tmp_path / "client", self._document("integer"))
+
+        assert rendered == ["get_pets.py", "owner.py", "pet.py"]
+        self._generate(config, tmp_path / "expected", self._document("integer"))
+        assert _different_files(dircmp(tmp_path / "client", tmp_path / "expected", ignore=[MANIFEST_NAME])) == []
+
+    @pytest.mark.parametrize("streaming", (False, True))
+    def test_models_are_rendered_when_they_become_multipart_bodies(self, config, tmp_path, streaming) -> None:
+        config = evolve(config, post_hooks=[], streaming=streaming)
+        self._generate(config, tmp_path / "client", self._document("string"))
+        document = self._document("string")
+        document["paths"]["/owners"]["post"] = {
+            "operationId": "addOwner",
+            "requestBody": {"content": {"multipart/form-data": {"schema": {"$ref": "#/components/schemas/Owner"}}}},
+            "responses": {"204": {"description": "None"}},
+        }
+
+        rendered = self._generate(config, tmp_path / "client", document)
+
+        assert "owner.py" in rendered
+        assert "pet.py" not in rendered
+        self._generate(config, tmp_path / "expected", document)
+        assert _different_files(dircmp(tmp_path / "client", tmp_path / "expected", ignore=[MANIFEST_NAME])) == []
+
+    def test_manifest_is_kept_in_the_cache_dir_without_meta(self, config, tmp_path) -> None:
+        config = evolve(config, post_hooks=[], meta_type=MetaType.NONE, cache_dir=tmp_path / "cache")
+        (tmp_path / "out").mkdir()
+        self._generate(config, tmp_path / "out" / "api_client", self._document("string"))
+
+        rendered = self._generate(config, tmp_path / "out" / "api_client", self._document("string"))
+
+        assert rendered == []
+        assert [path.name for path in (tmp_path / "out").iterdir()] == ["api_client"]
+        assert not (tmp_path / "out" / "api_client" / MANIFEST_NAME).exists()
+        assert len(list((tmp_path / "cache" / "manifests").iterdir())) == 1
+
+    def test_everything_is_rendered_when_config_changes(self, config, tmp_path) -> None:
+        config = evolve(config, post_hooks=[])
+        self._generate(config, tmp_path / "client", self._document("string"))
+
+        rendered = self._generate(
+            evolve(config, docstrings_on_attributes=True), tmp_path / "client", self._document("string")
+        )
+
+        assert rendered == ["get_owners.py", "get_pets.py", "owner.py", "pet.py", "unrelated.py", "unrelated_tag.py"]
+
+    def test_sharded_modules_are_rendered_when_models_move(self, config, tmp_path) -> None:
+        config = evolve(config, post_hooks=[], shard_by_tag=True)
+
+        def document(owners_tag: str) -> dict[str, Any]:
+            document = self._document("string")
+            del document["components"]["schemas"]["Unrelated"]
+            document["paths"]["/pets"]["get"]["tags"] = ["pets"]
+            document["paths"]["/owners"]["get"]["tags"] = [owners_tag]
+            document["paths"]["/owners"]["get"]["responses"] = {
+                "200": {
+                    "description": "OK",
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Owner"}}},
+                }
+            }
+            return document
+
+        self._generate(config, tmp_path / "client", document("owners"))
+        assert (tmp_path / "client" / "api_client" / "models" / "pet.py").exists()
+        assert (tmp_path / "client" / "api_client" / "owners" / "models" / "owner.py").exists()
+
+        # Every model is now only used by the `pets` shard, and the `owners` shard is gone
+        rendered = self._generate(config, tmp_path / "client", document("pets"))
+
+        assert rendered == ["get_owners.py", "get_pets.py", "owner.py", "pet.py"]
+        self._generate(config, tmp_path / "expected", document("pets"))
+        assert _different_files(dircmp(tmp_path / "client", tmp_path / "expected", ignore=[MANIFEST_NAME])) == []
+        assert not (tmp_path / "client" / "api_client" / "owners").exists()
+
+    def test_only_modules_using_changed_templates_are_rendered(self, config, tmp_path) -> None:
+        config = evolve(config, post_hooks=[])
+        templates = tmp_path / "templates"
+        (templates / "property_templates").mkdir(parents=True)
+        self._generate(config, tmp_path / "client", self._document("string"), templates)
+        default_templates = Path(__file__).parent.parent / "openapi_python_client" / "templates"
+
+        date_template = "property_templates/date_property.py.jinja"
+        (templates / date_template).write_text((default_templates / date_template).read_text() + "{# Unused #}\n")
+        unused = self._generate(config, tmp_path / "client", self._document("string"), templates)
+        (templates / "endpoint_macros.py.jinja").write_text(
+            (default_templates / "endpoint_macros.py.jinja").read_text() + "{# Imported #}\n"
+        )
+        imported = self._generate(config, tmp_path / "client", self._document("string"), templates)
+
+        assert unused == []
+        assert imported == ["get_owners.py", "get_pets.py"]
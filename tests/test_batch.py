@@ -0,0 +1,130 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from attrs import evolve
+
+from openapi_python_client import Config, MetaType, _print, profiling
+from openapi_python_client.batch import BatchManifest, generate_batch
+from openapi_python_client.config import ConfigFile
+
+
+def _config(document_path: Path, output_path: Path) -> Config:
+    return Config.from_sources(
+        ConfigFile(post_hooks=[]), MetaType.NONE, document_path, "utf-8", overwrite=True, output_path=output_path
+    )
+
+
+def _document(title: str) -> str:
+    return json.dumps(
+        {
+            "openapi": "3.1.0",
+            "info": {"title": title, "version": "1.0"},
+            "paths": {},
+            "components": {"schemas": {"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}}},
+        }
+    )
+
+
+class TestBatchManifest:
+    def test_paths_are_relative_to_the_manifest(self, tmp_path: Path):
+        manifest_path = tmp_path / "manifest.yml"
+        manifest_path.write_text(
+            "clients:\n"
+            "  - path: specs/pets.yaml\n"
+            "    config: pets.config.yml\n"
+            "    output_path: clients/pets\n"
+            "  - url: https://example.com/openapi.json\n"
+            "    output_path: /absolute/client\n"
+        )
+
+        manifest = BatchManifest.load_from_path(manifest_path)
+
+        pets, remote = manifest.clients
+        assert pets.path == tmp_path / "specs" / "pets.yaml"
+        assert pets.config == tmp_path / "pets.config.yml"
+        assert pets.output_path == tmp_path / "clients" / "pets"
+        assert remote.path is None
+        assert remote.url == "https://example.com/openapi.json"
+        assert remote.output_path == Path("/absolute/client")
+
+
+class TestGenerateBatch:
+    def test_generates_every_client(self, tmp_path: Path):
+        configs = []
+        for name in ("pets", "stores"):
+            document_path = tmp_path / f"{name}.json"
+            document_path.write_text(_document(name))
+            configs.append(_config(document_path, tmp_path / name))
+
+        assert generate_batch(configs, workers=2) == []
+
+        for name in ("pets", "stores"):
+            assert (tmp_path / name / "models" / "pet.py").exists()
+
+    def test_clients_rendering_modules_in_processes_do_not_hang(self, tmp_path: Path, mocker):
+        mocker.patch("os.cpu_count", return_value=4)
+        configs = []
+        for name in ("pets", "stores"):
+            document_path = tmp_path / f"{name}.json"
+            document_path.write_text(_document(name))
+            configs.append(evolve(_config(document_path, tmp_path / name), workers=4))
+        batch = threading.Thread(target=generate_batch, args=(configs,), kwargs={"workers": 2}, daemon=True)
+
+        batch.start()
+        batch.join(timeout=60)
+
+        assert not batch.is_alive()
+        for name in ("pets", "stores"):
+            assert (tmp_path / name / "models" / "pet.py").exists()
+
+    def test_errors_are_labelled_with_their_client(self, tmp_path: Path):
+        document_path = tmp_path / "pets.json"
+        document_path.write_text(_document("pets"))
+        invalid_path = tmp_path / "invalid.json"
+        invalid_path.write_text(json.dumps({"openapi": "3.1.0"}))
+        configs = [_config(invalid_path, tmp_path / "invalid"), _config(document_path, tmp_path / "pets")]
+
+        (error,) = generate_batch(configs, workers=2)
+
+        assert error.header == f"{tmp_path / 'invalid'}: Failed to parse OpenAPI document"
+        assert (tmp_path / "pets" / "models" / "pet.py").exists()
+
+    def test_output_of_each_client_is_printed_together(self, tmp_path: Path, mocker, capsys):
+        # Both clients are halfway through generating at the same time, so their output would be mixed up if printed
+        halfway = threading.Barrier(2, timeout=10)
+
+        stdout = sys.stdout
+
+        def build(name: str) -> list:
+            _print(f"{name} started")
+            halfway.wait()
+            _print(f"{name} done")
+            # Only what the clients report is collected, so anything else can keep printing as usual
+            assert sys.stdout is stdout
+            return []
+
+        mocker.patch(
+            "openapi_python_client.batch._get_project_for_url_or_path",
+            side_effect=lambda config, *_, **__: mocker.MagicMock(build=lambda: build(config.output_path.name)),
+        )
+        configs = [_config(tmp_path / "unused.json", tmp_path / name) for name in ("pets", "stores")]
+
+        assert generate_batch(configs, workers=2) == []
+
+        output = capsys.readouterr().out
+        assert output in (
+            "pets started\npets done\nstores started\nstores done\n",
+            "stores started\nstores done\npets started\npets done\n",
+        )
+
+    def test_clients_are_not_generated_concurrently_while_profiling(self, tmp_path: Path):
+        configs = [_config(tmp_path / "unused.json", tmp_path / name) for name in ("pets", "stores")]
+
+        with profiling.profile(tmp_path / "profile.json", top=1), pytest.raises(ValueError):
+            generate_batch(configs, workers=2)
+
+    def test_no_clients(self):
+        assert generate_batch([]) == []
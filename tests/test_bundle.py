@@ -0,0 +1,207 @@
+import json
+import threading
+from collections.abc import Iterator
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from openapi_python_client import _load_referenced_document
+from openapi_python_client.parser.bundle import bundle_references, has_external_references
+from openapi_python_client.parser.errors import GeneratorError
+
+
+def _write(path: Path, document: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document))
+
+
+def _bundle(document: dict[str, Any], uri: str) -> tuple[GeneratorError | None, list[str]]:
+    """Bundle `document`, returning any error and the URI of each document loaded"""
+    loaded: list[str] = []
+
+    def load(uri: str) -> Any:
+        loaded.append(uri)
+        return _load_referenced_document(uri, timeout=5, loaded={})
+
+    return bundle_references(document, uri=uri, load=load), loaded
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[str]:
+    """Serve the files in `tmp_path / "remote"` over HTTP, returning the base URL"""
+    directory = tmp_path / "remote"
+    directory.mkdir()
+    handler = partial(SimpleHTTPRequestHandler, directory=str(directory))
+    handler.log_message = lambda *args: None  # type: ignore[attr-defined]
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    thread.join()
+
+
+@pytest.mark.parametrize(
+    "document,expected",
+    (
+        (b'{"$ref": "#/components/schemas/A"}', False),
+        (b"$ref: '#/components/schemas/A'", False),
+        (b'{"$ref": "common.json#/components/schemas/A"}', True),
+        (b"$ref: common.yaml", True),
+        (b"$ref: 'https://example.com/common.yaml'", True),
+    ),
+)
+def test_has_external_references(document, expected):
+    assert has_external_references(document) == expected
+
+
+class TestBundleReferences:
+    def test_components_are_copied_from_files(self, tmp_path: Path):
+        _write(
+            tmp_path / "common" / "models.json",
+            {
+                "components": {
+                    "schemas": {
+                        "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+                        "Owner": {"type": "object", "properties": {"pets": {"$ref": "#/components/schemas/Pet"}}},
+                    }
+                }
+            },
+        )
+        document = {
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "responses": {
+                            "200": {
+                                "content": {
+                                    "application/json": {
+                                        "schema": {"$ref": "common/models.json#/components/schemas/Pet"}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+
+        error, _ = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is None
+        schema = document["paths"]["/pets"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": "#/components/schemas/Pet"}
+        assert document["components"]["schemas"] == {
+            "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+            "Owner": {"type": "object", "properties": {"pets": {"$ref": "#/components/schemas/Pet"}}},
+        }
+
+    def test_kind_and_name_of_other_references(self, tmp_path: Path):
+        _write(tmp_path / "error.json", {"type": "object"})
+        _write(tmp_path / "parameters.json", {"page": {"name": "page", "in": "query"}})
+        document = {
+            "paths": {
+                "/": {
+                    "get": {
+                        "parameters": [{"$ref": "parameters.json#/page"}],
+                        "responses": {"default": {"$ref": "error.json"}},
+                    }
+                }
+            },
+            "components": {"responses": {"error": {"description": "Already taken"}}},
+        }
+
+        error, _ = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is None
+        operation = document["paths"]["/"]["get"]
+        assert operation["parameters"] == [{"$ref": "#/components/parameters/page"}]
+        assert operation["responses"] == {"default": {"$ref": "#/components/responses/error2"}}
+        assert document["components"]["parameters"] == {"page": {"name": "page", "in": "query"}}
+        assert document["components"]["responses"]["error2"] == {"type": "object"}
+
+    def test_path_items_are_copied_in_place(self, tmp_path: Path):
+        _write(tmp_path / "paths" / "pets.json", {"get": {"responses": {"200": {"$ref": "../responses.json#/Ok"}}}})
+        _write(tmp_path / "responses.json", {"Ok": {"description": "OK"}})
+        document = {"paths": {"/pets": {"$ref": "paths/pets.json"}}}
+
+        error, _ = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is None
+        assert document["paths"]["/pets"] == {"get": {"responses": {"200": {"$ref": "#/components/responses/Ok"}}}}
+        assert document["components"]["responses"] == {"Ok": {"description": "OK"}}
+
+    def test_references_back_to_the_main_document(self, tmp_path: Path):
+        _write(tmp_path / "pet.json", {"properties": {"tag": {"$ref": "openapi.json#/components/schemas/Tag"}}})
+        document = {"components": {"schemas": {"Tag": {"type": "string"}, "Pet": {"$ref": "pet.json"}}}}
+
+        error, loaded = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is None
+        assert loaded == [(tmp_path / "pet.json").as_uri()]
+        assert document["components"]["schemas"]["Pet"] == {"properties": {"tag": {"$ref": "#/components/schemas/Tag"}}}
+
+    def test_each_document_is_loaded_once(self, tmp_path: Path):
+        _write(tmp_path / "a.json", {"A": {"type": "string"}, "B": {"type": "integer"}})
+        _write(tmp_path / "b.json", {"C": {"$ref": "a.json#/A"}})
+        document = {
+            "components": {
+                "schemas": {
+                    "First": {"$ref": "a.json#/A"},
+                    "Second": {"$ref": "a.json#/B"},
+                    "Third": {"$ref": "b.json#/C"},
+                }
+            }
+        }
+
+        error, loaded = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is None
+        assert sorted(loaded) == [(tmp_path / "a.json").as_uri(), (tmp_path / "b.json").as_uri()]
+        assert document["components"]["schemas"] == {
+            "First": {"type": "string"},
+            "Second": {"type": "integer"},
+            "Third": {"$ref": "#/components/schemas/First"},
+        }
+
+    def test_remote_documents(self, tmp_path: Path, server: str):
+        _write(tmp_path / "remote" / "schemas.json", {"Pet": {"$ref": "tags.json#/Tag"}})
+        _write(tmp_path / "remote" / "tags.json", {"Tag": {"type": "string"}})
+        document = {"components": {"schemas": {"Pets": {"type": "array", "items": {"$ref": "schemas.json#/Pet"}}}}}
+
+        error, loaded = _bundle(document, f"{server}openapi.json")
+
+        assert error is None
+        assert loaded == [f"{server}schemas.json", f"{server}tags.json"]
+        assert document["components"]["schemas"]["Pet"] == {"$ref": "#/components/schemas/Tag"}
+        assert document["components"]["schemas"]["Tag"] == {"type": "string"}
+
+    def test_remote_documents_cannot_reference_files(self, tmp_path: Path, server: str):
+        _write(tmp_path / "remote" / "schemas.json", {"Pet": {"$ref": (tmp_path / "secret.json").as_uri()}})
+        document = {"components": {"schemas": {"Pet": {"$ref": f"{server}schemas.json#/Pet"}}}}
+
+        error, loaded = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is not None
+        assert error.detail == "Remote documents can't reference local files"
+        assert loaded == [f"{server}schemas.json"]
+
+    def test_missing_document(self, tmp_path: Path, server: str):
+        document = {"components": {"schemas": {"Pet": {"$ref": "missing.json"}}}}
+
+        error, _ = _bundle(document, f"{server}openapi.json")
+
+        assert error is not None
+        assert error.header == f"Could not load referenced document {server}missing.json"
+
+    def test_missing_pointer(self, tmp_path: Path):
+        _write(tmp_path / "a.json", {"A": {"type": "string"}})
+        document = {"components": {"schemas": {"Pet": {"$ref": "a.json#/B"}}}}
+
+        error, _ = _bundle(document, (tmp_path / "openapi.json").as_uri())
+
+        assert error is not None
+        assert error.header == "Could not resolve reference a.json#/B"
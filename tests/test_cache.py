@@ -0,0 +1,134 @@
+from pathlib import Path
+
+from attrs import evolve
+from jinja2 import DictLoader, Environment
+
+from openapi_python_client import GeneratorData, _load_yaml_or_json, cache
+from openapi_python_client.utils import ClassName, PythonIdentifier
+
+DOCUMENT = b"""
+openapi: 3.1.0
+info:
+  title: Cached API
+  version: 1.0.0
+paths: {}
+components:
+  schemas:
+    Pet:
+      type: object
+      properties:
+        name:
+          type: string
+"""
+
+
+class TestParseCacheKey:
+    def test_depends_on_document(self, config) -> None:
+        assert cache.parse_cache_key(DOCUMENT, config) != cache.parse_cache_key(DOCUMENT + b"\n", config)
+
+    def test_depends_on_parsing_config(self, config) -> None:
+        other_config = evolve(config, field_prefix="other_")
+
+        assert cache.parse_cache_key(DOCUMENT, config) != cache.parse_cache_key(DOCUMENT, other_config)
+
+    def test_ignores_output_config(self, config, tmp_path: Path) -> None:
+        other_config = evolve(config, output_path=tmp_path, overwrite=True, workers=4, cache_dir=tmp_path)
+
+        assert cache.parse_cache_key(DOCUMENT, config) == cache.parse_cache_key(DOCUMENT, other_config)
+
+
+class TestGeneratorDataCache:
+    def test_round_trip(self, config, tmp_path: Path) -> None:
+        data = GeneratorData.from_dict(_load_yaml_or_json(DOCUMENT, None), config=config)
+        key = cache.parse_cache_key(DOCUMENT, config)
+
+        cache.store_generator_data(tmp_path, key, data)
+        loaded = cache.load_generator_data(tmp_path, key)
+
+        assert loaded is not None
+        assert loaded.title == "Cached API"
+        model = loaded.models[0]
+        assert model.class_info.name == "Pet"
+        assert isinstance(model.class_info.name, ClassName)
+        assert isinstance(model.optional_properties[0].python_name, PythonIdentifier)
+
+    def test_missing_entry(self, tmp_path: Path) -> None:
+        assert cache.load_generator_data(tmp_path, "missing") is None
+
+    def test_corrupt_entry(self, tmp_path: Path) -> None:
+        path = tmp_path / "parsed" / "corrupt.pickle"
+        path.parent.mkdir()
+        path.write_bytes(b"not a pickle")
+
+        assert cache.load_generator_data(tmp_path, "corrupt") is None
+
+
+class TestTemplateBytecodeCache:
+    def test_compiled_templates_are_stored_in_cache_dir(self, tmp_path: Path) -> None:
+        bytecode_cache = cache.template_bytecode_cache(tmp_path)
+        env = Environment(loader=DictLoader({"a.jinja": "{{ 1 + 1 }}"}), bytecode_cache=bytecode_cache)
+
+        assert env.get_template("a.jinja").render() == "2"
+        assert list((tmp_path / "templates").iterdir())
+
+    def test_unwritable_cache_dir_is_ignored(self, tmp_path: Path) -> None:
+        cache_dir = tmp_path / "file"
+        cache_dir.write_text("not a directory")
+
+        assert cache.template_bytecode_cache(cache_dir) is None
+
+    def test_failure_to_store_is_ignored(self, tmp_path: Path) -> None:
+        bytecode_cache = cache.template_bytecode_cache(tmp_path)
+        (tmp_path / "templates").rmdir()
+        env = Environment(loader=DictLoader({"a.jinja": "{{ 1 + 1 }}"}), bytecode_cache=bytecode_cache)
+
+        assert env.get_template("a.jinja").render() == "2"
+
+
+class TestSharedTemplateBytecodeCache:
+    def test_templates_are_compiled_once(self, mocker) -> None:
+        bytecode_cache = cache.shared_template_bytecode_cache(None)
+        loader = DictLoader({"a.jinja": "{{ value }}"})
+        first = Environment(loader=loader, bytecode_cache=bytecode_cache)
+        second = Environment(loader=loader, bytecode_cache=bytecode_cache)
+        second.globals["value"] = "second"
+
+        assert first.get_template("a.jinja").render(value="first") == "first"
+        compile_ = mocker.spy(second, "compile")
+
+        assert second.get_template("a.jinja").render() == "second"
+        compile_.assert_not_called()
+
+    def test_changed_templates_are_compiled_again(self) -> None:
+        bytecode_cache = cache.shared_template_bytecode_cache(None)
+        Environment(loader=DictLoader({"a.jinja": "old"}), bytecode_cache=bytecode_cache).get_template("a.jinja")
+
+        env = Environment(loader=DictLoader({"a.jinja": "new"}), bytecode_cache=bytecode_cache)
+
+        assert env.get_template("a.jinja").render() == "new"
+
+    def test_compiled_templates_are_also_stored(self, tmp_path: Path) -> None:
+        bytecode_cache = cache.shared_template_bytecode_cache(cache.template_bytecode_cache(tmp_path))
+        env = Environment(loader=DictLoader({"a.jinja": "{{ 1 + 1 }}"}), bytecode_cache=bytecode_cache)
+
+        assert env.get_template("a.jinja").render() == "2"
+        assert list((tmp_path / "templates").iterdir())
+
+
+class TestManifestPath:
+    def test_is_in_cache_dir_and_unique_to_the_output(self, tmp_path: Path) -> None:
+        pets = cache.manifest_path(tmp_path / "cache", tmp_path / "pets")
+        stores = cache.manifest_path(tmp_path / "cache", tmp_path / "stores")
+
+        assert pets is not None and stores is not None
+        assert pets.parent == stores.parent == tmp_path / "cache" / "manifests"
+        assert pets != stores
+
+    def test_falls_back_to_a_temporary_directory_for_the_user(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+        path = cache.manifest_path(None, tmp_path / "pets")
+
+        assert path is not None
+        assert path.parent.parent.parent == tmp_path
+        assert path.parent.parent.stat().st_mode & 0o077 == 0
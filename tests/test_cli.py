@@ -41,3 +41,27 @@ class TestGenerate:
 
         assert result.exit_code == 1
         assert result.output == f"Unknown encoding : {file_encoding}\n"
+
+
+def test_generate_workers_override_config(mocker, tmp_path) -> None:
+    generate = mocker.patch("openapi_python_client.generate", return_value=[])
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("workers: 2\n")
+
+    result = runner.invoke(app, ["generate", "--path=openapi.json", f"--config={config_path}", "--workers=4"])
+
+    assert result.exit_code == 0, result.output
+    assert generate.call_args.kwargs["config"].workers == 4
+
+
+def test_watch_requires_path() -> None:
+    result = runner.invoke(app, ["watch"])
+
+    assert result.exit_code == 2
+
+
+def test_generate_batch_bad_manifest() -> None:
+    result = runner.invoke(app, ["generate-batch", "--manifest=manifest/path"])
+
+    assert result.exit_code == 2
+    assert "Unable to parse manifest" in result.output
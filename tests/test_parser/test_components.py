@@ -0,0 +1,81 @@
+from attrs import evolve
+
+from openapi_python_client import schema as oai
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.components import LazyComponents
+from openapi_python_client.parser.errors import GeneratorError
+
+DOCUMENT = {
+    "openapi": "3.1.0",
+    "info": {"title": "API", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "getPets",
+                "responses": {"200": {"$ref": "#/components/responses/Pets"}},
+            }
+        }
+    },
+    "components": {
+        "schemas": {"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}},
+        "responses": {
+            "Pets": {
+                "description": "Pets",
+                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+            },
+            "Unused": {"description": ["not", "a", "string"]},
+        },
+        "examples": {"Unused": {"summary": 1}},
+        "x-extension": "allowed",
+    },
+}
+
+
+class TestLazyComponents:
+    def test_entries_are_validated_when_used(self):
+        components = LazyComponents.from_data(DOCUMENT["components"])
+        assert isinstance(components, LazyComponents)
+
+        assert components.responses
+        assert components.errors == []
+        assert isinstance(components.responses["Pets"], oai.Response)
+        assert components.responses.get("Missing") is None
+        assert components.errors == []
+
+    def test_invalid_entries_are_reported_and_ignored(self):
+        components = LazyComponents.from_data(DOCUMENT["components"])
+        assert isinstance(components, LazyComponents)
+
+        assert components.responses.get("Unused") is None
+        assert list(components.responses) == ["Pets"]
+        assert len(components.errors) == 1
+        assert components.errors[0].header.startswith("Invalid component responses/Unused")
+
+    def test_sections_must_be_objects(self):
+        assert isinstance(LazyComponents.from_data({"schemas": []}), GeneratorError)
+
+
+class TestGeneratorDataWithLazyComponents:
+    def test_unused_invalid_components_are_ignored(self, config):
+        eager = GeneratorData.from_dict(DOCUMENT, config=config)
+        lazy = GeneratorData.from_dict(DOCUMENT, config=evolve(config, lazy_components=True))
+
+        assert isinstance(eager, GeneratorError)
+        assert isinstance(lazy, GeneratorData)
+        assert lazy.errors == []
+        assert [model.class_info.name for model in lazy.models] == ["Pet"]
+        (endpoint,) = lazy.endpoint_collections_by_tag["default"].endpoints
+        assert endpoint.responses.patterns[0].prop.class_info.name == "Pet"
+
+    def test_unused_schemas_are_still_validated(self, config):
+        schemas = {**DOCUMENT["components"]["schemas"], "Unused": {"type": 1}}
+        document = {**DOCUMENT, "components": {**DOCUMENT["components"], "schemas": schemas}}
+
+        lazy = GeneratorData.from_dict(document, config=evolve(config, lazy_components=True))
+        pruned = GeneratorData.from_dict(document, config=evolve(config, lazy_components=True, prune_components=True))
+
+        assert isinstance(lazy, GeneratorData)
+        assert [error.header for error in lazy.errors] == ["Invalid component schemas/Unused, it will be ignored"]
+        assert isinstance(pruned, GeneratorData)
+        assert pruned.errors == []
+        assert [model.class_info.name for model in pruned.models] == ["Pet"]
@@ -0,0 +1,75 @@
+from openapi_python_client.parser.inputs import ALL_PATHS, DocumentInputs, path_input
+
+
+def _document(pet_type: str = "string", title: str = "API") -> dict:
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": title, "version": "1"},
+        "paths": {
+            "/pets/{id}": {"get": {"responses": {"200": {"$ref": "#/components/responses/Pet"}}}},
+            "/owners": {"get": {"responses": {"204": {"description": "Nothing"}}}},
+        },
+        "components": {
+            "schemas": {
+                "Pet": {"type": "object", "properties": {"name": {"type": pet_type}}},
+                "Owner": {
+                    "type": "object",
+                    "properties": {"pet": {"$ref": "#/components/schemas/Pet/properties/name"}},
+                },
+                "Unrelated": {"type": "string"},
+            },
+            "responses": {
+                "Pet": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+            },
+        },
+    }
+
+
+class TestDocumentInputs:
+    def test_from_dict(self):
+        inputs = DocumentInputs.from_dict(_document())
+
+        assert set(inputs.hashes) == {
+            "/paths/~1pets~1{id}",
+            "/paths/~1owners",
+            "/components/schemas/Pet",
+            "/components/schemas/Owner",
+            "/components/schemas/Unrelated",
+            "/components/responses/Pet",
+        }
+        assert inputs.references["/components/schemas/Owner"] == {"/components/schemas/Pet"}
+        assert inputs.references[path_input("/pets/{id}")] == {"/components/responses/Pet"}
+
+    def test_shared_hash_excludes_paths_and_components(self):
+        assert (
+            DocumentInputs.from_dict(_document()).shared_hash == DocumentInputs.from_dict(_document("int")).shared_hash
+        )
+        assert (
+            DocumentInputs.from_dict(_document()).shared_hash
+            != DocumentInputs.from_dict(_document(title="Other")).shared_hash
+        )
+
+    def test_changes_are_propagated_to_what_references_them(self):
+        previous = DocumentInputs.from_dict(_document())
+
+        changed = DocumentInputs.from_dict(_document("integer")).changed_since(previous.hashes)
+
+        assert changed == {
+            "/components/schemas/Pet",
+            "/components/schemas/Owner",
+            "/components/responses/Pet",
+            "/paths/~1pets~1{id}",
+            ALL_PATHS,
+        }
+
+    def test_removed_inputs_are_changed(self):
+        document = _document()
+        previous = DocumentInputs.from_dict(document)
+        del document["paths"]["/owners"]
+
+        assert DocumentInputs.from_dict(document).changed_since(previous.hashes) == {"/paths/~1owners", ALL_PATHS}
+
+    def test_nothing_changed(self):
+        assert (
+            DocumentInputs.from_dict(_document()).changed_since(DocumentInputs.from_dict(_document()).hashes) == set()
+        )
@@ -1,15 +1,20 @@
+import tracemalloc
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pydantic
 import pytest
+from attrs import evolve
 
 import openapi_python_client.schema as oai
-from openapi_python_client.parser.errors import ParseError
+from openapi_python_client import GeneratorData, _load_yaml_or_json
+from openapi_python_client.parser.errors import GeneratorError, ParseError
 from openapi_python_client.parser.openapi import Endpoint, EndpointCollection, import_string_from_class
 from openapi_python_client.parser.properties import Class, IntProperty, Parameters, Schemas
 from openapi_python_client.schema import DataType
 
 MODULE_NAME = "openapi_python_client.parser.openapi"
+END_TO_END_TESTS = Path(__file__).parent.parent.parent / "end_to_end_tests"
 
 
 class TestEndpoint:
@@ -244,6 +249,23 @@ class TestEndpoint:
             else:
                 assert not param.required
 
+    def test_add_parameters_updates_endpoint_in_place(self, config):
+        endpoint = self.make_endpoint()
+        data = oai.Operation.model_construct(
+            parameters=[
+                oai.Parameter.model_construct(
+                    name="param", param_schema=oai.Schema.model_construct(type="string"), param_in="query"
+                ),
+            ]
+        )
+
+        (result, _, _) = endpoint.add_parameters(
+            endpoint=endpoint, data=data, schemas=Schemas(), parameters=Parameters(), config=config
+        )
+
+        assert result is endpoint
+        assert [param.name for param in endpoint.query_parameters] == ["param"]
+
     def test_add_parameters_duplicate_properties(self, config):
         endpoint = self.make_endpoint()
         param = oai.Parameter.model_construct(
@@ -661,3 +683,106 @@ class TestEndpointCollection:
         )
         collection: EndpointCollection = collections["default"]
         assert isinstance(collection.endpoints[0].query_parameters[0], IntProperty)
+
+
+def _streamed(data, config):
+    """Parse `data` with `Config.streaming`, collecting the endpoints as they'd be if they weren't streamed"""
+    streaming = GeneratorData.from_dict(data, config=evolve(config, streaming=True))
+    assert isinstance(streaming, GeneratorData)
+    assert streaming.pending_endpoints is not None
+    assert streaming.endpoint_collections_by_tag == {}
+    for endpoint, tags in streaming.parse_pending_endpoints():
+        for tag in tags:
+            streaming.endpoint_collections_by_tag[tag].endpoints.append(endpoint)
+    return streaming
+
+
+class TestGeneratorDataStreaming:
+    @pytest.mark.parametrize("document", ("baseline_openapi_3.0.json", "baseline_openapi_3.1.yaml"))
+    def test_parse_pending_endpoints_matches_from_dict(self, config, document):
+        data = _load_yaml_or_json((END_TO_END_TESTS / document).read_bytes(), None)
+        config = evolve(config, generate_all_tags=True)
+
+        eager = GeneratorData.from_dict(data, config=config)
+        streaming = _streamed(data, config)
+
+        assert isinstance(eager, GeneratorData)
+        assert _summarize(streaming) == _summarize(eager)
+
+    def test_parsing_again_starts_over(self, config):
+        data = _load_yaml_or_json((END_TO_END_TESTS / "baseline_openapi_3.0.json").read_bytes(), None)
+        streaming = GeneratorData.from_dict(data, config=evolve(config, streaming=True))
+        assert isinstance(streaming, GeneratorData)
+
+        first = [endpoint.name for endpoint, _ in streaming.parse_pending_endpoints()]
+        errors = streaming.errors
+        second = [endpoint.name for endpoint, _ in streaming.parse_pending_endpoints()]
+
+        assert second == first
+        assert streaming.errors == errors
+
+    def test_invalid_path_items_are_reported_upfront(self, config):
+        data = {
+            "openapi": "3.1.0",
+            "info": {"title": "Invalid", "version": "1.0.0"},
+            "paths": {"/things": {"get": {"responses": "not responses"}}},
+        }
+
+        result = GeneratorData.from_dict(data, config=evolve(config, streaming=True))
+
+        assert isinstance(result, GeneratorError)
+        assert result.header == "Failed to parse OpenAPI document"
+
+    def test_uses_less_memory(self, config):
+        def operation(i):
+            return {
+                "get": {
+                    "operationId": f"get_thing{i}",
+                    "parameters": [{"name": f"p{p}", "in": "query", "schema": {"type": "string"}} for p in range(5)],
+                    "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {}}}}},
+                }
+            }
+
+        data = {
+            "openapi": "3.1.0",
+            "info": {"title": "Many operations", "version": "1.0.0"},
+            "paths": {f"/things{i}": operation(i) for i in range(100)},
+        }
+
+        def peak_memory(parse):
+            tracemalloc.start()
+            try:
+                parse()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        def stream():
+            streaming = GeneratorData.from_dict(data, config=evolve(config, streaming=True))
+            assert isinstance(streaming, GeneratorData)
+            for _ in streaming.parse_pending_endpoints():
+                pass
+
+        eager_peak = peak_memory(lambda: GeneratorData.from_dict(data, config=config))
+        streaming_peak = peak_memory(stream)
+
+        assert streaming_peak < eager_peak / 2
+
+
+def _summarize(data: GeneratorData):
+    """What's generated from `data`, without comparing models (which can reference each other) directly"""
+    return (
+        [
+            (model.class_info, [prop.name for prop in model.required_properties + model.optional_properties])
+            for model in data.models
+        ],
+        [(enum.class_info, enum.values) for enum in data.enums],
+        {
+            tag: (
+                [(endpoint.method, endpoint.path, endpoint.name) for endpoint in collection.endpoints],
+                collection.parse_errors,
+            )
+            for tag, collection in data.endpoint_collections_by_tag.items()
+        },
+        data.errors,
+    )
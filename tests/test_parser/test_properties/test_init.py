@@ -10,13 +10,16 @@ from openapi_python_client.parser.properties import (
     ReferencePath,
     Schemas,
     _create_schemas,
+    _dependency_order,
     _process_model_errors,
     _process_models,
     _propogate_removal,
     build_parameters,
     build_schemas,
+    model_property,
     property_from_data,
 )
+from openapi_python_client.parser.properties.schemas import update_schemas_with_data
 from openapi_python_client.schema import Parameter, Reference, Schema
 from openapi_python_client.utils import ClassName, PythonIdentifier
 
@@ -286,6 +289,54 @@ class TestCreateSchemas:
         assert update_schemas_with_data.call_count == 3
         assert result.errors == [PropertyError()]
 
+    def test_creates_forward_references_in_one_pass(self, mocker, config):
+        components = {
+            f"Link{i}": Schema(type="array", items=Reference(ref=f"#/components/schemas/Link{i + 1}")) for i in range(5)
+        }
+        components["Link5"] = Schema(type="object")
+        create = mocker.patch(f"{MODULE_NAME}.update_schemas_with_data", wraps=update_schemas_with_data)
+
+        result = _create_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert result.errors == []
+        assert create.call_count == len(components)
+        created = [update_call.kwargs["ref_path"] for update_call in create.call_args_list]
+        assert created == [f"/components/schemas/Link{i}" for i in reversed(range(6))]
+
+    def test_reports_circular_references(self, config):
+        components = {
+            "A": Schema(type="array", items=Reference(ref="#/components/schemas/B")),
+            "B": Schema(type="array", items=Reference(ref="#/components/schemas/A")),
+        }
+
+        result = _create_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert len(result.errors) == 2
+        assert all("Circular reference found: " in (error.detail or "") for error in result.errors)
+
+
+class TestDependencyOrder:
+    def test_matches_order_of_repeated_passes(self):
+        # Passing over these repeatedly would create C and E in the first pass, then A, then B
+        dependencies = {"A": {"C"}, "B": {"A"}, "D": {"missing"}}
+
+        order, cycles = _dependency_order(["A", "B", "C", "D", "E"], dependencies)
+
+        assert order == ["C", "D", "E", "A", "B"]
+        assert cycles == {}
+
+    def test_dependencies_earlier_in_the_same_pass(self):
+        order, _ = _dependency_order(["A", "B", "C"], {"B": {"A"}, "C": {"B"}})
+
+        assert order == ["A", "B", "C"]
+
+    def test_detects_cycles(self):
+        order, cycles = _dependency_order(["A", "B", "C"], {"A": {"B"}, "B": {"A"}})
+
+        assert sorted(order) == ["A", "B", "C"]
+        assert set(cycles) == {"A", "B"}
+        assert cycles["A"][0] == cycles["A"][-1]
+
 
 class TestProcessModels:
     def test_detect_recursive_allof_reference_no_retry(self, mocker, model_property_factory, config):
@@ -368,6 +419,34 @@ class TestProcessModels:
         # Verify that Model3 extended the properties from Model1
         assert [p.name for p in result.classes_by_name["Model3"].optional_properties] == ["prop1", "prop2"]
 
+    def test_processes_models_after_the_models_they_take_all_of(self, mocker, config):
+        components = {
+            "Child": oai.Schema(
+                allOf=[
+                    oai.Reference(ref="#/components/schemas/Parent"),
+                    oai.Schema(type="object", properties={"child": oai.Schema(type="string")}),
+                ]
+            ),
+            "Holder": oai.Schema(
+                type="object",
+                properties={
+                    "inline": oai.Schema(allOf=[oai.Reference(ref="#/components/schemas/Child"), oai.Schema()]),
+                },
+            ),
+            "Parent": oai.Schema(type="object", properties={"parent": oai.Schema(type="string")}),
+        }
+        process_model = mocker.patch(f"{MODULE_NAME}.process_model", wraps=model_property.process_model)
+
+        result = build_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert result.errors == []
+        assert [update_call.args[0].class_info.name for update_call in process_model.call_args_list] == [
+            "Parent",
+            "Child",
+            "Holder",
+        ]
+        assert [p.name for p in result.classes_by_name["Child"].optional_properties] == ["parent", "child"]
+
 
 class TestPropogateRemoval:
     def test_propogate_removal_class_name(self):
@@ -0,0 +1,85 @@
+import pickle
+
+import pytest
+
+from openapi_python_client.parser.properties.persistent import (
+    PersistentList,
+    PersistentMap,
+    to_persistent_list,
+    to_persistent_map,
+)
+
+
+class TestPersistentMap:
+    def test_set_leaves_earlier_versions_unchanged(self):
+        first = PersistentMap({"a": 1})
+
+        second = first.set("b", 2)
+        third = second.set("a", 3)
+
+        assert first == {"a": 1}
+        assert second == {"a": 1, "b": 2}
+        assert third == {"a": 3, "b": 2}
+        assert list(third) == ["a", "b"]
+        assert len(third) == 2
+
+    def test_branching_from_an_earlier_version(self):
+        first = PersistentMap({"a": 1})
+        first.set("b", 2)
+
+        branch = first.set("c", 3)
+
+        assert branch == {"a": 1, "c": 3}
+        assert "b" not in branch
+
+    def test_deletion_only_affects_one_version(self):
+        first = PersistentMap({"a": 1, "b": 2})
+        second = first.set("c", 3)
+
+        del second["a"]
+        assert second.pop("b") == 2
+        assert second.pop("b", None) is None
+
+        assert first == {"a": 1, "b": 2}
+        assert second == {"c": 3}
+        assert second.set("a", 4) == {"c": 3, "a": 4}
+        with pytest.raises(KeyError):
+            del second["a"]
+        with pytest.raises(KeyError):
+            second.pop("a")
+
+    def test_pickle(self):
+        persistent_map = PersistentMap({"a": 1}).set("b", 2)
+
+        assert pickle.loads(pickle.dumps(persistent_map)) == {"a": 1, "b": 2}
+
+    def test_converter_does_not_copy(self):
+        persistent_map = PersistentMap({"a": 1})
+
+        assert to_persistent_map(persistent_map) is persistent_map
+        assert to_persistent_map({"a": 1}) == persistent_map
+
+
+class TestPersistentList:
+    def test_appended_leaves_earlier_versions_unchanged(self):
+        first = PersistentList([1])
+
+        second = first.appended(2)
+        branch = first.appended(3)
+
+        assert first == [1]
+        assert second == [1, 2]
+        assert branch == [1, 3]
+        assert second[-1] == 2
+        assert second[:1] == [1]
+        with pytest.raises(IndexError):
+            first[1]
+
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(PersistentList([1]).appended(2))) == [1, 2]
+
+    def test_converter_does_not_copy(self):
+        persistent_list = PersistentList([1])
+
+        assert to_persistent_list(persistent_list) is persistent_list
+        assert to_persistent_list((1,)) == persistent_list
@@ -0,0 +1,163 @@
+from attrs import evolve
+
+from openapi_python_client.config import OperationFilter
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.selection import select_operations
+
+
+def _operation(operation_id, *, tags=None, schema="Pet"):
+    return {
+        "operationId": operation_id,
+        **({"tags": tags} if tags is not None else {}),
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{schema}"}}},
+            }
+        },
+    }
+
+
+DOCUMENT = {
+    "openapi": "3.1.0",
+    "info": {"title": "Selected API", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": _operation("list_pets", tags=["pets"]),
+            "post": _operation("create_pet", tags=["pets", "admin"]),
+        },
+        "/pets/{id}/owner": {
+            "parameters": [{"$ref": "#/components/parameters/Id"}],
+            "get": _operation("get_owner", tags=["owners"], schema="Owner"),
+        },
+        "/stores": {"get": _operation("list_stores", schema="Store")},
+    },
+    "components": {
+        "schemas": {
+            "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+            "Owner": {"type": "object", "properties": {"address": {"$ref": "#/components/schemas/Address"}}},
+            "Address": {"type": "object", "properties": {"street": {"type": "string"}}},
+            "Store": {
+                "type": "object",
+                "properties": {"pets": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}},
+            },
+            "Unused": {"type": "object"},
+            "Weird~Name/Here": {"type": "object"},
+        },
+        "parameters": {"Id": {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}},
+        "securitySchemes": {"token": {"type": "http", "scheme": "bearer"}},
+    },
+}
+
+
+def _operation_ids(document):
+    return [
+        operation["operationId"]
+        for path_item in document["paths"].values()
+        for operation in path_item.values()
+        if isinstance(operation, dict) and "operationId" in operation
+    ]
+
+
+class TestSelectOperations:
+    def test_unchanged_by_default(self, config):
+        assert select_operations(DOCUMENT, config=config) is DOCUMENT
+
+    def test_include_by_tag(self, config):
+        selected = select_operations(DOCUMENT, config=evolve(config, include=OperationFilter(tags=["admin"])))
+
+        assert _operation_ids(selected) == ["create_pet"]
+        assert list(selected["paths"]) == ["/pets"]
+
+    def test_untagged_operations_are_in_the_default_tag(self, config):
+        selected = select_operations(DOCUMENT, config=evolve(config, include=OperationFilter(tags=["default"])))
+
+        assert _operation_ids(selected) == ["list_stores"]
+
+    def test_include_by_path_pattern_or_operation_id(self, config):
+        include = OperationFilter(paths=["/pets/*"], operation_ids=["list_stores"])
+
+        selected = select_operations(DOCUMENT, config=evolve(config, include=include))
+
+        assert _operation_ids(selected) == ["get_owner", "list_stores"]
+
+    def test_exclude(self, config):
+        selected = select_operations(
+            DOCUMENT,
+            config=evolve(config, include=OperationFilter(tags=["pets"]), exclude=OperationFilter(tags=["admin"])),
+        )
+
+        assert _operation_ids(selected) == ["list_pets"]
+
+    def test_keeps_only_reachable_components(self, config):
+        selected = select_operations(DOCUMENT, config=evolve(config, include=OperationFilter(paths=["/pets/*"])))
+
+        assert list(selected["components"]["schemas"]) == ["Owner", "Address"]
+        assert list(selected["components"]["parameters"]) == ["Id"]
+        assert selected["components"]["securitySchemes"] == DOCUMENT["components"]["securitySchemes"]
+
+    def test_follows_references_between_components(self, config):
+        selected = select_operations(
+            DOCUMENT, config=evolve(config, include=OperationFilter(operation_ids=["list_stores"]))
+        )
+
+        assert list(selected["components"]["schemas"]) == ["Pet", "Owner", "Address", "Store"]
+        assert selected["components"]["parameters"] == {}
+
+    def test_prune_components_without_filtering(self, config):
+        selected = select_operations(DOCUMENT, config=evolve(config, prune_components=True))
+
+        assert selected["paths"] is DOCUMENT["paths"]
+        assert list(selected["components"]["schemas"]) == ["Pet", "Owner", "Address", "Store"]
+
+    def test_escaped_references(self, config):
+        document = {
+            **DOCUMENT,
+            "paths": {"/weird": {"get": _operation("weird", schema="Weird~0Name~1Here")}},
+        }
+
+        selected = select_operations(document, config=evolve(config, prune_components=True))
+
+        assert list(selected["components"]["schemas"]) == ["Weird~Name/Here"]
+
+    def test_follows_discriminator_mappings(self, config):
+        document = {
+            **DOCUMENT,
+            "paths": {"/pets": {"get": _operation("list_pets", schema="Animal")}},
+            "components": {
+                "schemas": {
+                    "Animal": {
+                        "oneOf": [{"$ref": "#/components/schemas/Cat"}],
+                        "discriminator": {
+                            "propertyName": "kind",
+                            "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"},
+                        },
+                    },
+                    "Cat": {"type": "object"},
+                    "Dog": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+                    "Owner": {"type": "object"},
+                    "Unused": {"type": "object"},
+                }
+            },
+        }
+
+        selected = select_operations(document, config=evolve(config, prune_components=True))
+
+        assert list(selected["components"]["schemas"]) == ["Animal", "Cat", "Dog", "Owner"]
+
+    def test_document_is_unchanged(self, config):
+        paths = dict(DOCUMENT["paths"])
+
+        select_operations(DOCUMENT, config=evolve(config, include=OperationFilter(tags=["owners"])))
+
+        assert DOCUMENT["paths"] == paths
+        assert "Unused" in DOCUMENT["components"]["schemas"]
+
+
+def test_generator_data_only_has_selected_models(config):
+    data = GeneratorData.from_dict(DOCUMENT, config=evolve(config, include=OperationFilter(tags=["owners"])))
+
+    assert isinstance(data, GeneratorData)
+    assert data.errors == []
+    assert [model.class_info.name for model in data.models] == ["Owner", "Address"]
+    assert list(data.endpoint_collections_by_tag) == ["owners"]
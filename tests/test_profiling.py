@@ -0,0 +1,58 @@
+import json
+import time
+from pathlib import Path
+
+from openapi_python_client import profiling
+from openapi_python_client.profiling import Profiler
+
+
+class TestProfiler:
+    def test_nested_phases_are_exclusive(self):
+        profiler = Profiler()
+
+        with profiler.phase("outer"):
+            time.sleep(0.01)
+            with profiler.phase("inner"):
+                time.sleep(0.05)
+
+        phases = profiler.report(top=1)["phases"]
+        assert phases["inner"]["seconds"] >= 0.05
+        assert 0.01 <= phases["outer"]["seconds"] < 0.05
+
+    def test_repeated_phases_are_added_up(self):
+        profiler = Profiler()
+
+        for _ in range(2):
+            with profiler.phase("write"):
+                time.sleep(0.01)
+
+        assert profiler.report(top=1)["phases"]["write"]["seconds"] >= 0.02
+
+    def test_slowest_items(self):
+        profiler = Profiler()
+
+        for name, seconds in (("fast", 0), ("slow", 0.02), ("repeated", 0.015), ("repeated", 0.015)):
+            with profiler.item("schemas", name):
+                time.sleep(seconds)
+
+        slowest = profiler.report(top=2)["slowest"]["schemas"]
+        assert [(item["name"], item["count"]) for item in slowest] == [("repeated", 2), ("slow", 1)]
+
+
+def test_profile_writes_report(tmp_path: Path):
+    report_path = tmp_path / "profile.json"
+
+    with profiling.profile(report_path, top=5):
+        with profiling.phase("render"):
+            with profiling.item("templates", "model.py.jinja"):
+                _ = [0] * 100_000
+
+    report = json.loads(report_path.read_text())
+    assert report["phases"]["render"]["peak_memory_bytes"] > 0
+    assert report["peak_memory_bytes"] == report["phases"]["render"]["peak_memory_bytes"]
+    assert report["slowest"]["templates"][0]["name"] == "model.py.jinja"
+
+
+def test_nothing_is_measured_without_profile():
+    with profiling.phase("render"), profiling.item("templates", "model.py.jinja"):
+        pass
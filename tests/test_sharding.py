@@ -0,0 +1,111 @@
+from attrs import evolve
+
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.errors import GeneratorError
+from openapi_python_client.sharding import plan_shards, relocate_imports
+
+
+def _get(operation_id, tag, schema):
+    return {
+        "get": {
+            "operationId": operation_id,
+            "tags": [tag],
+            "responses": {
+                "200": {
+                    "description": "OK",
+                    "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{schema}"}}},
+                }
+            },
+        }
+    }
+
+
+def _object(**properties):
+    return {"type": "object", "properties": properties}
+
+
+DOCUMENT = {
+    "openapi": "3.1.0",
+    "info": {"title": "Sharded API", "version": "1.0.0"},
+    "paths": {
+        "/pets": _get("list_pets", "pets", "Pet"),
+        "/owners": _get("list_owners", "owners", "Owner"),
+        "/stores": _get("list_stores", "stores", "Store"),
+    },
+    "components": {
+        "schemas": {
+            "Pet": _object(kind={"$ref": "#/components/schemas/Kind"}),
+            "Kind": {"type": "string", "enum": ["cat", "dog"]},
+            "Owner": _object(
+                pet={"$ref": "#/components/schemas/Pet"}, address={"$ref": "#/components/schemas/Address"}
+            ),
+            "Address": _object(street={"type": "string"}),
+            "Store": _object(name={"type": "string"}),
+            "Unused": _object(store={"$ref": "#/components/schemas/Store"}),
+        }
+    },
+}
+
+
+def _plan(config):
+    openapi = GeneratorData.from_dict(DOCUMENT, config=config)
+    assert isinstance(openapi, GeneratorData)
+    return plan_shards(openapi, config)
+
+
+class TestPlanShards:
+    def test_models_used_by_one_shard_are_in_it(self, config):
+        shards = _plan(config)
+
+        assert [(shard.name, shard.tags, sorted(shard.models)) for shard in shards] == [
+            ("pets", ["pets"], []),
+            ("owners", ["owners"], ["address", "owner"]),
+            # Also imported by a model no shard uses, which is generated in the shared package
+            ("stores", ["stores"], []),
+        ]
+
+    def test_groups_of_tags(self, config):
+        shards = _plan(evolve(config, shard_groups={"Pet Store": ["pets", "owners"]}))
+
+        assert [(shard.name, shard.tags, sorted(shard.models)) for shard in shards] == [
+            ("pet_store", ["pets", "owners"], ["address", "kind", "owner", "pet"]),
+            ("stores", ["stores"], []),
+        ]
+
+    def test_names_of_shared_modules_are_reserved(self, config):
+        assert isinstance(_plan(evolve(config, shard_groups={"models": ["pets"]})), GeneratorError)
+
+
+class TestRelocateImports:
+    def test_model(self):
+        content = (
+            "from .. import types\n"
+            "from ..types import UNSET, Unset\n"
+            "from ..models.kind import Kind\n"
+            "if TYPE_CHECKING:\n"
+            "    from ..models.pet import Pet\n"
+        )
+
+        relocated = relocate_imports(content, module=("models", "owner"), shard="owners", models={"owner", "pet"})
+
+        assert relocated == (
+            "from ... import types\n"
+            "from ...types import UNSET, Unset\n"
+            "from ...models.kind import Kind\n"
+            "if TYPE_CHECKING:\n"
+            "    from ..models.pet import Pet\n"
+        )
+
+    def test_endpoint(self):
+        content = "from ... import errors\nfrom ...client import Client\nfrom ...models.owner import Owner\n"
+
+        relocated = relocate_imports(content, module=("api", "owners", "get_owner"), shard="owners", models={"owner"})
+
+        assert (
+            relocated == "from .... import errors\nfrom ....client import Client\nfrom ...models.owner import Owner\n"
+        )
+
+    def test_absolute_imports_are_unchanged(self):
+        content = "from typing import Any\nimport httpx\n"
+
+        assert relocate_imports(content, module=("api", "pets", "list_pets"), shard="pets", models=set()) == content
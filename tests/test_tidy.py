@@ -0,0 +1,139 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from openapi_python_client.tidy import ruff_line_length, tidy_imports
+
+
+def _ruff(source: str, *, line_length: int) -> str:
+    """What `ruff check --fix-only` (with the rules that tidying imports replaces) turns `source` into"""
+    return subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "ruff",
+            "check",
+            "--isolated",
+            "--select=I,F401",
+            "--fix-only",
+            f"--line-length={line_length}",
+            "--stdin-filename=module.py",
+            "-",
+        ],
+        input=source,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+class TestTidyImports:
+    @pytest.mark.parametrize(
+        "source, line_length",
+        (
+            pytest.param("import os\nimport sys\nfrom typing import Any, cast\n\nx: Any = sys.argv\n", 88, id="unused"),
+            pytest.param(
+                "from .models import b\n"
+                "from typing import cast\n"
+                "import httpx\n"
+                "from typing import Any\n"
+                "from __future__ import annotations\n"
+                "\n"
+                "print(b, cast, httpx, Any)\n",
+                88,
+                id="merged and sorted",
+            ),
+            pytest.param(
+                "from a import value, Model, CONSTANT, Model10, Model9\n\nprint(value, Model, CONSTANT, Model10, Model9)\n",
+                88,
+                id="members ordered by type",
+            ),
+            pytest.param(
+                "from attrs import define as _attrs_define\n"
+                "from attrs import field as _attrs_field\n"
+                "from attrs import define\n"
+                "\n"
+                "print(_attrs_define, _attrs_field, define)\n",
+                88,
+                id="aliases kept separate",
+            ),
+            pytest.param(
+                "from package.module import first_name, second_name\n\nprint(first_name, second_name)\n",
+                40,
+                id="long imports wrapped",
+            ),
+            pytest.param(
+                "from package.module import first_name, second_name, third_name\n\nprint(first_name, second_name)\n",
+                60,
+                id="unused removed before wrapping",
+            ),
+            pytest.param(
+                "import os\nimport sys\ndef main():\n    return sys.argv\n", 88, id="blank lines before definitions"
+            ),
+            pytest.param(
+                "def first():\n"
+                "    from .b import B  # noqa: PLC0415\n"
+                "    from .c import C  # noqa: PLC0415\n"
+                "\n"
+                "    return C\n"
+                "\n"
+                "\n"
+                "def second():\n"
+                "    return B\n",
+                88,
+                id="lazy imports checked against their function",
+            ),
+            pytest.param(
+                "from typing import TYPE_CHECKING\n\nif TYPE_CHECKING:\n    from .a import A\n", 88, id="emptied body"
+            ),
+            pytest.param('from .a import A\n\nx: "A | None" = None\n', 88, id="annotation strings"),
+            pytest.param('import os\n\n\ndef f():\n    """Uses\n    os\n    """\n', 88, id="docstrings"),
+            pytest.param('x = """\nimport os\n"""\n', 88, id="imports in strings"),
+            pytest.param("from __future__ import annotations\n\nfrom b import c as c\n", 88, id="re-exports"),
+        ),
+    )
+    def test_same_as_ruff(self, source, line_length):
+        assert tidy_imports(source, line_length=line_length) == _ruff(source, line_length=line_length)
+
+    def test_unused_imports_can_be_kept(self):
+        source = '"""Package"""\nfrom .client import Client, AuthenticatedClient\nfrom .client import Client\n'
+
+        assert tidy_imports(source, keep_unused=True) == (
+            '"""Package"""\nfrom .client import AuthenticatedClient, Client\n'
+        )
+
+    @pytest.mark.parametrize(
+        "source",
+        (
+            "# A comment\nimport os\n",
+            "import os\n# A comment\n",
+            "from os import path, sep  # A comment\n",
+            "from a import (\n    b,\n)\nimport os\n",
+            "import os, sys\n",
+            "import os as operating_system\n",
+            "from a import *\n",
+            'x = """\n',
+        ),
+    )
+    def test_imports_templates_do_not_write_are_left_alone(self, source):
+        assert tidy_imports(source) == source
+
+
+class TestRuffLineLength:
+    def test_defaults_to_ruff_default(self, tmp_path: Path):
+        assert ruff_line_length(tmp_path) == 88
+
+    def test_reads_parent_pyproject(self, tmp_path: Path):
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\nline-length = 100\n")
+        child = tmp_path / "child"
+        child.mkdir()
+
+        assert ruff_line_length(child) == 100
+
+    def test_ruff_toml_takes_precedence(self, tmp_path: Path):
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\nline-length = 100\n")
+        (tmp_path / "ruff.toml").write_text("line-length = 110\n")
+
+        assert ruff_line_length(tmp_path) == 110
@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 
 from openapi_python_client import utils
@@ -134,3 +136,39 @@ def test_pascalcase(before, after):
 )
 def test_get_content_type(content_type: str, expected: str, config) -> None:
     assert utils.get_content_type(content_type, config) == expected
+
+
+@pytest.mark.parametrize("value", (utils.PythonIdentifier("for", "field_"), utils.ClassName("1", "field_")))
+def test_identifiers_survive_pickling(value):
+    restored = pickle.loads(pickle.dumps(value))
+
+    assert restored == value
+    assert type(restored) is type(value)
+
+
+def test_naming_cache_info_counts_hits_and_misses():
+    utils.clear_naming_caches()
+
+    utils.ClassName("someName", "field_")
+    utils.ClassName("someName", "field_")
+    utils.ClassName("someName", "other_")
+
+    info = utils.naming_cache_info()["ClassName"]
+    assert isinstance(info, utils.NamingCacheInfo)
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    assert info.maxsize == utils._NAMING_CACHE_SIZE
+
+
+def test_clear_naming_caches():
+    utils.snake_case("SomeName")
+
+    utils.clear_naming_caches()
+
+    assert all(info.currsize == 0 for info in utils.naming_cache_info().values())
+
+
+def test_split_words_returns_a_new_list():
+    words = utils.split_words("someName")
+    words.append("changed")
+
+    assert utils.split_words("someName") == ["some", "Name"]
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from openapi_python_client import Config, MetaType
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.watch import Watcher
+
+
+def _document(*schemas: str) -> dict[str, Any]:
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Watched", "version": "1.0"},
+        "paths": {},
+        "components": {"schemas": {name: {"type": "object"} for name in schemas}},
+    }
+
+
+@pytest.fixture
+def document_path(tmp_path: Path) -> Path:
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(_document("Pet")))
+    return path
+
+
+def _watcher(document_path: Path, custom_template_path: Path | None = None) -> Watcher:
+    config = Config.from_sources(
+        ConfigFile(post_hooks=[]),
+        MetaType.NONE,
+        document_path,
+        "utf-8",
+        overwrite=True,
+        output_path=document_path.parent / "client",
+    )
+    return Watcher(config=config, custom_template_path=custom_template_path)
+
+
+class TestWatcher:
+    def test_unchanged_document_is_not_parsed_again(self, document_path: Path):
+        watcher = _watcher(document_path)
+        assert watcher.generate() == []
+        openapi = watcher.openapi
+
+        document_path.touch()
+        assert watcher.generate() == []
+
+        assert watcher.openapi is openapi
+
+    def test_changed_document_is_parsed_again(self, document_path: Path):
+        watcher = _watcher(document_path)
+        watcher.generate()
+
+        document_path.write_text(json.dumps(_document("Pet", "Owner")))
+        watcher.generate()
+
+        assert (document_path.parent / "client" / "models" / "owner.py").exists()
+
+    def test_changed_template_is_rendered_again(self, document_path: Path, tmp_path: Path):
+        templates = tmp_path / "templates"
+        templates.mkdir()
+        watcher = _watcher(document_path, templates)
+        watcher.generate()
+        openapi = watcher.openapi
+
+        (templates / "types.py.jinja").write_text("# Custom types\n")
+        watcher.generate()
+
+        assert (document_path.parent / "client" / "types.py").read_text() == "# Custom types\n"
+        assert watcher.openapi is openapi
+        assert templates / "types.py.jinja" in watcher.watched_paths
+
+    def test_wait_for_changes(self, document_path: Path):
+        watcher = _watcher(document_path)
+        watcher.generate()
+
+        document_path.write_text(json.dumps(_document("Pet", "Owner")))
+
+        watcher.wait_for_changes(interval=0.01)
+
+    def test_documents_from_urls_cannot_be_watched(self):
+        config = Config.from_sources(
+            ConfigFile(), MetaType.NONE, "https://example.com/openapi.json", "utf-8", False, None
+        )
+
+        with pytest.raises(ValueError):
+            Watcher(config=config)
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+from openapi_python_client.writer import MANIFEST_NAME, OutputWriter
+
+
+def _write_all(root: Path, files: dict[str, str]) -> OutputWriter:
+    writer = OutputWriter(root=root, encoding="utf-8", manifest_path=root / MANIFEST_NAME)
+    for name, content in files.items():
+        writer.write(root / name, content)
+    writer.remove_stale(root / "models")
+    writer.save_manifest()
+    return writer
+
+
+class TestOutputWriter:
+    def test_new_files_are_added(self, tmp_path: Path) -> None:
+        writer = _write_all(tmp_path, {"models/a.py": "a = 1\n", "client.py": "client = 1\n"})
+
+        assert writer.summary.added == [Path("models/a.py"), Path("client.py")]
+        assert (tmp_path / "models" / "a.py").read_text() == "a = 1\n"
+        assert (tmp_path / MANIFEST_NAME).exists()
+
+    def test_identical_files_are_not_rewritten(self, tmp_path: Path) -> None:
+        _write_all(tmp_path, {"models/a.py": "a = 1\n"})
+        path = tmp_path / "models" / "a.py"
+        mtime = path.stat().st_mtime_ns
+
+        writer = _write_all(tmp_path, {"models/a.py": "a = 1\n"})
+
+        assert writer.summary.unchanged == 1
+        assert writer.summary.added == writer.summary.changed == []
+        assert path.stat().st_mtime_ns == mtime
+
+    def test_files_modified_by_post_hooks_are_not_rewritten(self, tmp_path: Path) -> None:
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME)
+        path = tmp_path / "a.py"
+        writer.write(path, "a=1\n")
+        path.write_text("a = 1\n")  # Like a formatter would
+        writer.save_manifest()
+
+        writer = _write_all(tmp_path, {"a.py": "a=1\n"})
+
+        assert writer.summary.unchanged == 1
+        assert path.read_text() == "a = 1\n"
+
+    def test_changed_files_are_rewritten(self, tmp_path: Path) -> None:
+        _write_all(tmp_path, {"models/a.py": "a = 1\n"})
+
+        writer = _write_all(tmp_path, {"models/a.py": "a = 2\n"})
+
+        assert writer.summary.changed == [Path("models/a.py")]
+        assert (tmp_path / "models" / "a.py").read_text() == "a = 2\n"
+
+    def test_stale_files_are_removed(self, tmp_path: Path) -> None:
+        _write_all(tmp_path, {"models/a.py": "a = 1\n", "models/nested/b.py": "b = 1\n"})
+        pycache = tmp_path / "models" / "__pycache__"
+        pycache.mkdir()
+        (pycache / "a.cpython.pyc").write_bytes(b"")
+
+        writer = _write_all(tmp_path, {"models/a.py": "a = 1\n"})
+
+        assert writer.summary.removed == [Path("models/nested/b.py")]
+        assert not (tmp_path / "models" / "nested").exists()
+        assert (pycache / "a.cpython.pyc").exists()
+
+    def test_previous_directories(self, tmp_path: Path) -> None:
+        _write_all(tmp_path, {"models/a.py": "a = 1\n", "shard/api/b.py": "b = 1\n", "client.py": "client = 1\n"})
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME)
+
+        assert writer.previous_directories(tmp_path) == {tmp_path / "models", tmp_path / "shard"}
+        assert writer.previous_directories(tmp_path / "shard") == {tmp_path / "shard" / "api"}
+
+        writer.remove_stale(tmp_path / "shard")
+        assert not (tmp_path / "shard").exists()
+
+    def test_unmodified_files_are_kept(self, tmp_path: Path) -> None:
+        models = tmp_path / "models"
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME)
+        writer.write(models / "a.py", "a = 1\n", sources=["/components/schemas/A"])
+        writer.write(models / "b.py", "b = 1\n", sources=["/components/schemas/B"])
+        writer.save_manifest()
+        (models / "b.py").write_text("b = 2\n")
+
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME)
+
+        assert writer.previous_sources(models / "a.py") == ["/components/schemas/A"]
+        assert writer.keep(models / "a.py")
+        assert not writer.keep(models / "b.py")
+        assert not writer.keep(models / "c.py")
+        writer.remove_stale(models)
+        assert writer.summary.unchanged == 1
+        assert writer.summary.removed == [Path("models/b.py")]
+
+    def test_inputs_are_saved(self, tmp_path: Path) -> None:
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME)
+        writer.inputs = {"key": "abc"}
+        writer.save_manifest()
+
+        assert OutputWriter(
+            root=tmp_path, encoding="utf-8", manifest_path=tmp_path / MANIFEST_NAME
+        ).previous_inputs == {"key": "abc"}
+
+    def test_nothing_is_recorded_without_a_manifest_path(self, tmp_path: Path) -> None:
+        writer = OutputWriter(root=tmp_path, encoding="utf-8", manifest_path=None)
+        writer.write(tmp_path / "a.py", "a = 1\n")
+        writer.save_manifest()
+
+        assert [path.name for path in tmp_path.iterdir()] == ["a.py"]
+        assert writer.summary.added == [Path("a.py")]